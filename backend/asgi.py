@@ -10,14 +10,18 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 import os
 from channels.routing import ProtocolTypeRouter, URLRouter
 from django.core.asgi import get_asgi_application
-from channels.auth import AuthMiddlewareStack
-from pages.messaging.routing import *
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
 
+# Set up Django before importing the consumers, which import models
+django_asgi_app = get_asgi_application()
+
+from pages.messaging.middleware import JWTAuthMiddleware
+from pages.messaging.routing import *
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "http": django_asgi_app,
+    "websocket": JWTAuthMiddleware(
         URLRouter(
             websocket_urlpatterns
         )
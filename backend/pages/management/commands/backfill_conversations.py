@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from pages.models import Message
+from pages.utils.conversation_utils import upsert_conversations
+
+
+class Command(BaseCommand):
+    help = "Build the Conversation inbox rows from existing Message rows"
+
+    def handle(self, *args, **options):
+        # Latest message per (sender, receiver) direction; upsert_conversations folds the two
+        # directions of a pair together, so it gets every direction in one call. Unread
+        # counts aren't touched (and nothing is pushed), so running this again is harmless.
+        latest_per_direction = Message.objects.filter(sender__isnull=False, receiver__isnull=False) \
+            .order_by('sender', 'receiver', '-created_at') \
+            .distinct('sender', 'receiver') \
+            .only('id', 'sender', 'receiver', 'created_at')
+
+        messages = list(latest_per_direction.iterator())
+        upsert_conversations(messages)
+
+        pairs = len({frozenset((m.sender_id, m.receiver_id)) for m in messages if m.sender_id != m.receiver_id})
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {pairs} conversation(s)"))
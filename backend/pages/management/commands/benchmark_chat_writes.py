@@ -0,0 +1,63 @@
+import itertools
+import time
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pages.models import User, Message, Conversation
+from pages.messaging.write_behind import MessageWriteBuffer
+from pages.utils.conversation_utils import record_message
+
+
+class Command(BaseCommand):
+    help = "Messages/second persisted by one worker: one transaction per message (before) vs the write-behind buffer (after). Seed data is deleted afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=5000, help="Messages written per mode")
+        parser.add_argument("--conversations", type=int, default=20, help="Distinct conversations the messages are spread over")
+        parser.add_argument("--batch-size", type=int, default=500, help="Write-behind max batch")
+
+    def handle(self, *args, **options):
+        total, conversations = options["messages"], options["conversations"]
+        users = User.objects.bulk_create([
+            User(username=f"bench_chat_{i}", email=f"bench_chat_{i}@example.com") for i in range(conversations * 2)
+        ])
+        pairs = [(users[i], users[i + 1]) for i in range(0, len(users), 2)]
+        # Alternate direction so both participants send, like a real conversation
+        traffic = [(a, b) if n % 2 else (b, a) for n, (a, b) in zip(range(total), itertools.cycle(pairs))]
+
+        try:
+            before = self.time_per_message(traffic)
+            after = self.time_write_behind(traffic, options["batch_size"])
+        finally:
+            Conversation.objects.filter(user__in=users).delete()
+            Message.objects.filter(sender__in=users).delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+        self.stdout.write(f"{'mode':<30}{'messages / s':>14}")
+        self.stdout.write(f"{'transaction per message':<30}{total / before:>14.0f}")
+        self.stdout.write(f"{'write-behind batches':<30}{total / after:>14.0f}")
+
+    def time_per_message(self, traffic):
+        start = time.perf_counter()
+        for sender, receiver in traffic:
+            with transaction.atomic():
+                message = Message.objects.create(sender=sender, receiver=receiver, message="benchmark")
+                record_message(message)
+        return time.perf_counter() - start
+
+    def time_write_behind(self, traffic, batch_size):
+        buffer = MessageWriteBuffer(window=0.05, max_batch=batch_size)
+
+        async def run():
+            for sender, receiver in traffic:
+                buffer.add(sender, receiver, "benchmark")
+            await buffer.flush()
+            # Full batches flush as background tasks; wait for the last of them
+            async with buffer.flush_lock:
+                pass
+
+        start = time.perf_counter()
+        async_to_sync(run)()
+        elapsed = time.perf_counter() - start
+        assert Message.objects.filter(sender__username__startswith="bench_chat_").count() == len(traffic) * 2
+        return elapsed
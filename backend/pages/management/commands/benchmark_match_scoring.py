@@ -0,0 +1,110 @@
+import time
+import numpy as np
+from django.core.management.base import BaseCommand
+from pages.utils.match_utils import MatchIndex, top_matches, INSTRUMENT_WEIGHT, GENRE_WEIGHT
+
+
+class Command(BaseCommand):
+    help = "Time match scoring on synthetic musicians and listings (in memory, nothing is written to the database)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--musicians", type=int, default=100_000)
+        parser.add_argument("--listings", type=int, default=10_000)
+        parser.add_argument("--instruments", type=int, default=60, help="Instrument catalogue size")
+        parser.add_argument("--genres", type=int, default=40, help="Genre catalogue size")
+        parser.add_argument("--repeat", type=int, default=20, help="Lookups timed per measurement")
+        parser.add_argument("--limit", type=int, default=10, help="Matches kept per lookup")
+        parser.add_argument("--all-pairs", action="store_true", help="Also score every listing against every musician (slow)")
+        parser.add_argument("--chunk", type=int, default=256, help="Listings scored together in the all-pairs pass")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options["seed"])
+        musicians, listings = options["musicians"], options["listings"]
+        instruments, genres = options["instruments"], options["genres"]
+        repeat, limit = options["repeat"], options["limit"]
+
+        # 1-3 instruments (1-20 years each) and 1-3 genres per musician; 1-3 of each per listing
+        def entries(rows, catalogue):
+            counts = rng.integers(1, 4, size=rows)
+            row_ids = np.repeat(np.arange(rows), counts)
+            columns = rng.integers(0, catalogue, size=len(row_ids))
+            # Drop repeats of the same (row, column) so each entry appears once
+            unique = np.unique(row_ids * catalogue + columns)
+            return unique // catalogue, unique % catalogue
+
+        rows, columns = entries(musicians, instruments)
+        musician_instruments = (rows, columns, rng.integers(1, 21, size=len(rows)))
+        musician_genres = entries(musicians, genres)
+        listing_instruments = entries(listings, instruments)
+        listing_genres = entries(listings, genres)
+        listing_years = rng.choice([0, 1, 3, 5], size=listings)
+
+        start = time.perf_counter()
+        index = MatchIndex.from_entries(
+            list(range(musicians)), musician_instruments, musician_genres,
+            list(range(listings)), listing_instruments, listing_genres, listing_years,
+            instruments, genres,
+        )
+        build_ms = (time.perf_counter() - start) * 1000
+        self.stdout.write(f"{musicians} musicians x {listings} listings, {instruments} instruments, {genres} genres")
+        self.stdout.write(f"Build matrices: {build_ms:.1f} ms")
+
+        sample_listings = rng.integers(0, listings, size=repeat)
+        start = time.perf_counter()
+        for listing_id in sample_listings:
+            index.recommended_applicants(int(listing_id), limit)
+        applicants_ms = (time.perf_counter() - start) / repeat * 1000
+
+        sample_musicians = rng.integers(0, musicians, size=repeat)
+        start = time.perf_counter()
+        for user_id in sample_musicians:
+            index.recommended_gigs(int(user_id), limit)
+        gigs_ms = (time.perf_counter() - start) / repeat * 1000
+
+        # The same scores, one musician at a time in Python, for comparison
+        years = {}
+        for row, column, played in zip(*musician_instruments):
+            years.setdefault(int(row), {})[int(column)] = int(played)
+        musician_genre_sets = {}
+        for row, column in zip(*musician_genres):
+            musician_genre_sets.setdefault(int(row), set()).add(int(column))
+        wanted_instruments = [set() for _ in range(listings)]
+        for row, column in zip(*listing_instruments):
+            wanted_instruments[row].add(int(column))
+        wanted_genres = [set() for _ in range(listings)]
+        for row, column in zip(*listing_genres):
+            wanted_genres[row].add(int(column))
+
+        def python_score(musician, listing):
+            required = int(listing_years[listing])
+            played = years.get(musician, {})
+            instrument_fit = sum(
+                1.0 if required == 0 else min(1.0, played[column] / required)
+                for column in wanted_instruments[listing] if column in played
+            )
+            genre_fit = len(wanted_genres[listing] & musician_genre_sets.get(musician, set()))
+            return (INSTRUMENT_WEIGHT * instrument_fit / max(len(wanted_instruments[listing]), 1)
+                    + GENRE_WEIGHT * genre_fit / max(len(wanted_genres[listing]), 1))
+
+        loop_repeat = max(1, repeat // 10)
+        start = time.perf_counter()
+        for listing_id in sample_listings[:loop_repeat]:
+            scores = np.fromiter((python_score(musician, int(listing_id)) for musician in range(musicians)), dtype=np.float32, count=musicians)
+            top_matches(scores, index.musician_user_ids, limit)
+        loop_ms = (time.perf_counter() - start) / loop_repeat * 1000
+
+        self.stdout.write(f"Recommended applicants (1 listing vs all musicians): {applicants_ms:.2f} ms, Python loop {loop_ms:.1f} ms")
+        self.stdout.write(f"Recommended gigs (1 musician vs all listings):       {gigs_ms:.2f} ms")
+
+        if options["all_pairs"]:
+            # Every listing against every musician, a chunk of listings per product
+            start = time.perf_counter()
+            for years_required, fit in index.levels.items():
+                at_level = np.flatnonzero(index.listing_years == years_required)
+                for chunk_start in range(0, len(at_level), options["chunk"]):
+                    chunk = at_level[chunk_start:chunk_start + options["chunk"]]
+                    scores = (fit @ index.listings[chunk].T).toarray()
+                    np.argpartition(-scores, limit - 1, axis=0)[:limit]
+            all_pairs_s = time.perf_counter() - start
+            self.stdout.write(f"All pairs, top {limit} musicians per listing:             {all_pairs_s:.1f} s")
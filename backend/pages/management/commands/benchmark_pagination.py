@@ -0,0 +1,67 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from pages.models import User, Message
+from pages.utils.message_utils import pair_key_for
+from pages.views.message_views import GetMessagesView
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Time GetMessagesView pagination for page 1 vs a deep page, page-number vs cursor mode (seed data is rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--page", type=int, default=500, help="Deep page number to compare against page 1")
+        parser.add_argument("--repeat", type=int, default=20, help="Paginations timed per measurement")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["page"], options["repeat"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, deep_page, repeat):
+        page_size = GetMessagesView.page_size
+        sender = User.objects.create_user(username="bench_sender", email="bench_sender@example.com")
+        receiver = User.objects.create_user(username="bench_receiver", email="bench_receiver@example.com")
+
+        total = page_size * (deep_page + 1)
+        self.stdout.write(f"Seeding {total} messages...")
+        Message.objects.bulk_create(
+            [Message(sender=sender, receiver=receiver, message=f"Message {i}") for i in range(total)],
+            batch_size=5000,
+        )
+
+        factory = APIRequestFactory()
+        messages = Message.objects.filter(pair_key=pair_key_for(sender.id, receiver.id)).order_by('-created_at', '-id')
+
+        # Time only the pagination queries (COUNT + OFFSET vs keyset), not serialization
+        def timed(params):
+            request = Request(factory.get("/api/message/get/", params))
+            start = time.perf_counter()
+            for _ in range(repeat):
+                page = GetMessagesView().paginate_queryset(messages, request)
+            elapsed = (time.perf_counter() - start) / repeat * 1000
+            assert len(page) == page_size
+            return elapsed
+
+        # Cursor pointing at the last row of page (deep_page - 1), i.e. the start of the deep page
+        paginator = GetMessagesView()
+        last_row = Message.objects.filter(sender=sender).order_by(*paginator.keyset_ordering)[page_size * (deep_page - 1) - 1]
+        deep_cursor = paginator.encode_cursor(paginator.position_of(last_row))
+
+        rows = [
+            ("page number (before)", timed({"page": 1}), timed({"page": deep_page})),
+            ("cursor (after)", timed({"cursor": ""}), timed({"cursor": deep_cursor})),
+        ]
+
+        self.stdout.write(f"{'mode':<22}{'page 1 (ms)':>14}{f'page {deep_page} (ms)':>18}")
+        for mode, first, deep in rows:
+            self.stdout.write(f"{mode:<22}{first:>14.2f}{deep:>18.2f}")
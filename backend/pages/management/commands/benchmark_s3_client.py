@@ -0,0 +1,56 @@
+import time
+import boto3
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pages.utils.s3_utils import get_s3_client, reset_s3_client
+
+
+class Command(BaseCommand):
+    help = "Time per-request S3 URL signing with a fresh boto3 client (before) vs the shared client (after). Offline: signing needs no network."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Simulated requests per mode")
+        parser.add_argument("--urls", type=int, default=6, help="URLs signed per request (one feed page)")
+
+    def handle(self, *args, **options):
+        requests, urls = options["requests"], options["urls"]
+        bucket = settings.AWS_IMAGE_BUCKET_NAME
+
+        def new_client():
+            return boto3.client(
+                "s3",
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_REGION,
+            )
+
+        def timed(client_for_request):
+            start = time.perf_counter()
+            for request in range(requests):
+                client = client_for_request()
+                for i in range(urls):
+                    client.generate_presigned_url(
+                        "get_object", Params={"Bucket": bucket, "Key": f"bench/{request}/{i}.jpg"}, ExpiresIn=3600
+                    )
+            return (time.perf_counter() - start) / requests * 1000
+
+        reset_s3_client()
+        get_s3_client()  # Warm the shared client once, as a long-lived worker would be
+
+        # The old get_s3_client() built a client for every URL signed
+        before = timed(lambda: _PerCallClient(new_client))
+        after = timed(get_s3_client)
+
+        self.stdout.write(f"{'mode':<28}{'ms / request':>14}")
+        self.stdout.write(f"{'new client per call (before)':<28}{before:>14.2f}")
+        self.stdout.write(f"{'shared client (after)':<28}{after:>14.2f}")
+
+
+class _PerCallClient:
+    """Builds a fresh client for every call, like the pre-pooling get_s3_client()."""
+
+    def __init__(self, factory):
+        self.factory = factory
+
+    def generate_presigned_url(self, *args, **kwargs):
+        return self.factory().generate_presigned_url(*args, **kwargs)
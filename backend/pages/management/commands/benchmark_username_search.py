@@ -0,0 +1,71 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from pages.models import User
+from pages.utils.search_utils import search_usernames
+
+
+class Rollback(Exception):
+    pass
+
+
+# Indexes added for username search; dropped (inside the rolled-back transaction) to time the old plan
+SEARCH_INDEXES = ("user_username_trgm_idx",)
+
+
+class Command(BaseCommand):
+    help = "Time username search (COUNT + first page, as the views paginate) with and without the search indexes (seed data is rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1_000_000, help="Synthetic users to seed")
+        parser.add_argument("--repeat", type=int, default=5, help="Searches timed per measurement")
+        parser.add_argument("--page-size", type=int, default=5)
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options["users"], options["repeat"], options["page_size"])
+                raise Rollback()
+        except Rollback:
+            pass
+
+    def run(self, total, repeat, page_size):
+        self.stdout.write(f"Seeding {total} users...")
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO pages_user (id, username, email, password, is_superuser, first_name, last_name,
+                                        is_staff, is_active, date_joined, role, rating, created_at,
+                                        follower_count, following_count)
+                SELECT gen_random_uuid(), substr(md5(i::text), 1, 8) || i, 'bench' || i || '@example.com', '',
+                       false, '', '', false, true, now(), 'musician', 0, now(), 0, 0
+                FROM generate_series(1, %s) AS i
+            """, [total])
+            cursor.execute("ANALYZE pages_user")
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'pages_user' AND indexname = ANY(%s)", [list(SEARCH_INDEXES)])
+            present = [row[0] for row in cursor.fetchall()]
+        self.stdout.write(f"Search indexes present: {', '.join(present) or 'none'}")
+
+        # A prefix as typed, a common substring and a rare one
+        queries = ["ab", "abc", "9f3e1"]
+
+        def timed(build):
+            results = {}
+            for text in queries:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    queryset = build(text)
+                    queryset.count()
+                    list(queryset[:page_size])
+                results[text] = (time.perf_counter() - start) / repeat * 1000
+            return results
+
+        after = timed(lambda text: search_usernames(User.objects.all(), text).order_by('username_match_rank', 'username'))
+
+        with connection.cursor() as cursor:
+            for index in present:
+                cursor.execute(f'DROP INDEX "{index}"')
+        before = timed(lambda text: User.objects.filter(username__icontains=text))
+
+        self.stdout.write(f"{'query':<10}{'icontains, no index (ms)':>28}{'search_usernames (ms)':>26}")
+        for text in queries:
+            self.stdout.write(f"{text!r:<10}{before[text]:>28.2f}{after[text]:>26.2f}")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pages.models import User, MusicianSearchDocument
+from pages.utils.discover_utils import refresh_musician_search_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the discover search documents (MusicianSearchDocument) from Musician rows, e.g. after admin edits"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users rebuilt per transaction")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        # Musicians, plus users whose document outlived their musician profile
+        user_ids = list(
+            User.objects.filter(musician__isnull=False).values_list('id', flat=True)
+            .union(MusicianSearchDocument.objects.values_list('user_id', flat=True))
+        )
+
+        for start in range(0, len(user_ids), batch_size):
+            with transaction.atomic():
+                refresh_musician_search_documents(user_ids[start:start + batch_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt search documents for {len(user_ids)} user(s)"))
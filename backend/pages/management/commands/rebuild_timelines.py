@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from pages.models import User
+from pages.utils.timeline_utils import rebuild_timeline
+
+
+class Command(BaseCommand):
+    help = "Rebuild the materialized home timelines (TimelineEntry) from posts, hides, reports, bans and blocks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", action="append", dest="usernames", help="Only rebuild these usernames (repeatable)")
+
+    def handle(self, *args, **options):
+        users = User.objects.all().order_by("id")
+        if options["usernames"]:
+            users = users.filter(username__in=options["usernames"])
+
+        rebuilt = 0
+        for user in users.iterator():
+            rebuild_timeline(user)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} timeline(s)"))
@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from pages.models import User, Follower
+
+
+def _actual_count(field):
+    counts = Follower.objects.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(count=Count('*')).values('count')
+    return Coalesce(Subquery(counts), Value(0))
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized User.follower_count/following_count from Follower rows, in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Users checked per transaction")
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many users are out of sync")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        fixed = 0
+        last_id = None
+
+        # Walk users in primary-key order so each batch is a short transaction and
+        # follow/unfollow traffic is only blocked on the rows being rewritten
+        while True:
+            users = User.objects.order_by('id')
+            if last_id is not None:
+                users = users.filter(id__gt=last_id)
+            batch = list(users.values_list('id', flat=True)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1]
+
+            with transaction.atomic():
+                drifted = User.objects.filter(id__in=batch).annotate(
+                    actual_follower_count=_actual_count('following'),
+                    actual_following_count=_actual_count('follower'),
+                ).filter(
+                    ~Q(follower_count=F('actual_follower_count')) | ~Q(following_count=F('actual_following_count'))
+                )
+                drifted_ids = list(drifted.select_for_update(of=('self',)).values_list('id', flat=True))
+                if drifted_ids and not dry_run:
+                    User.objects.filter(id__in=drifted_ids).update(
+                        follower_count=_actual_count('following'),
+                        following_count=_actual_count('follower'),
+                    )
+            fixed += len(drifted_ids)
+
+        verb = "Found" if dry_run else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {fixed} user(s) with stale follow counts"))
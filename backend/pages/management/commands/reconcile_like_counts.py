@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from pages.models import Post, Like
+
+
+class Command(BaseCommand):
+    help = "Recompute the denormalized Post.like_count from Like rows in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report how many posts are out of sync")
+
+    def handle(self, *args, **options):
+        actual = Coalesce(Subquery(
+            Like.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(count=Count('*')).values('count')
+        ), Value(0))
+
+        drifted = Post.objects.annotate(actual_like_count=actual).exclude(like_count=F('actual_like_count'))
+        drifted_count = drifted.count()
+
+        if not options["dry_run"] and drifted_count:
+            Post.objects.filter(id__in=drifted.values('id')).update(like_count=actual)
+
+        verb = "Found" if options["dry_run"] else "Fixed"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {drifted_count} post(s) with a stale like_count"))
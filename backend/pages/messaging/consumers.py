@@ -1,32 +1,130 @@
 from channels.generic.websocket import AsyncWebsocketConsumer
+from channels.db import database_sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from pages.models import User, Message
+from pages.serializers import MessageSerializer
+from pages.utils.conversation_utils import record_message, mark_read, user_group_name
+from pages.utils.message_utils import messages_since, parse_sync_position
+from pages.messaging.write_behind import get_message_buffer
+from pages.messaging.typing import TypingCoalescer
+from pages.messaging.middleware import TOKEN_SUBPROTOCOL
+from pages.utils import presence_utils
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.utils.encoders import JSONEncoder
+import asyncio
 import json
 
-class ChatConsumer(AsyncWebsocketConsumer):
+# Matches the MaxLengthValidator on Message.message
+MAX_MESSAGE_LENGTH = 500
+
+# Close codes for rejected joins (4000-4999 are application-defined)
+CLOSE_UNAUTHENTICATED = 4401
+CLOSE_FORBIDDEN = 4403
+
+def room_name_for(*usernames):
+    """Chat rooms are named after both participants' usernames, sorted and joined by '-'."""
+    return "-".join(sorted(usernames))
+
+def chat_group_name(*user_ids):
+    # Usernames may contain '-', so one room name can fit more than one pair of users
+    # ("a-b-c" is a + b-c and a-b + c); the channel group is keyed on the pair's ids instead
+    return "chat_" + "_".join(sorted(str(user_id) for user_id in user_ids))
+
+def ws_room_partner_cache_key(user_id, room_name):
+    return f"ws_room_partner:{user_id}:{room_name}"
+
+def serialize_message(message):
+    # Round-trip through JSON so UUIDs/datetimes survive the Redis channel layer
+    return json.loads(json.dumps(MessageSerializer(message).data, cls=JSONEncoder))
+
+class PresenceConsumer(AsyncWebsocketConsumer):
+    """Keeps the connected user's presence entry alive for as long as the socket is open."""
+
+    async def start_presence(self):
+        self.presence_user_id = self.scope['user'].id
+        await presence_utils.touch(self.presence_user_id, self.channel_name)
+        self.presence_task = asyncio.create_task(self.heartbeat())
+
+    async def heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.CHAT_PRESENCE_HEARTBEAT)
+            await presence_utils.touch(self.presence_user_id, self.channel_name)
+
+    async def stop_presence(self):
+        if not hasattr(self, 'presence_task'):
+            return
+        self.presence_task.cancel()
+        await presence_utils.leave(self.presence_user_id, self.channel_name)
+
+
+class ChatConsumer(PresenceConsumer):
     async def connect(self):
         self.room_name = self.scope['url_route']['kwargs']['room_name']
-        self.room_group_name = f'chat_{self.room_name}'
+        self.typing_coalescer = TypingCoalescer(self.publish_typing)
+
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+        # The partner must be a real user whose pair with this one gives exactly this room name
+        partner = await self.get_room_partner(user)
+        if partner is None:
+            await self.close(code=CLOSE_FORBIDDEN)
+            return
+        # Resolved once per connection; sends, mark_read and attachment checks all use it
+        self.partner = partner
 
+        self.room_group_name = chat_group_name(user.id, partner.id)
         await self.channel_layer.group_add(
             self.room_group_name,
             self.channel_name
         )
-        await self.accept()
+        # Per-user pushes (unread counts) reach the chat page too
+        self.user_group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.user_group_name, self.channel_name)
+        # Browsers drop the connection unless the server echoes the subprotocol they offered
+        subprotocol = TOKEN_SUBPROTOCOL if TOKEN_SUBPROTOCOL in self.scope.get('subprotocols', []) else None
+        await self.accept(subprotocol=subprotocol)
+        await self.start_presence()
 
     async def disconnect(self, close_code):
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        await self.stop_presence()
+        await self.typing_coalescer.stop_all()
+        if hasattr(self, 'room_group_name'):
+            await self.channel_layer.group_discard(
+                self.room_group_name,
+                self.channel_name
+            )
+        if hasattr(self, 'user_group_name'):
+            await self.channel_layer.group_discard(self.user_group_name, self.channel_name)
 
-    async def receive(self, text_data):
-        text_data = text_data.strip()
-        text_data = text_data.replace('\\"', '"').strip('"')
-        data = json.loads(text_data)
+        buffer = get_message_buffer()
+        if buffer is not None:
+            await buffer.flush()
+
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            # Binary frames arrive with text_data None
+            data = json.loads(text_data) if text_data is not None else None
+        except json.JSONDecodeError:
+            data = None
+        if not isinstance(data, dict):
+            # A bad frame gets an error back; it shouldn't take the socket down
+            await self.send_error("Invalid message format")
+            return
         message_type = data.get('type')
-        print(message_type)
 
-        if message_type == 'chat_message':
-            message_object = data.get('message_object')
+        if message_type == 'send_message':
+            await self.send_text_message(data)
+        elif message_type == 'chat_message':
+            # Attachments are still uploaded over HTTP; the client then announces the saved
+            # message here. Only its id is trusted: the broadcast copy comes from the database.
+            message_object = await self.load_room_message((data.get('message_object') or {}).get('id'))
+            if message_object is None:
+                await self.send_error("Message not found")
+                return
 
             await self.channel_layer.group_send(
                 self.room_group_name,
@@ -36,23 +134,170 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 }
             )
         elif message_type == 'typing':
-            username = data['username']
-            await self.channel_layer.group_send(
-                self.room_group_name,
-                {
-                    'type': 'typing',
-                    'username': username
-                }
+            await self.typing_coalescer.keystroke(self.scope['user'].username)
+        elif message_type == 'mark_read':
+            # The user has this chat open: reset their unread count for it (pushed via unread_update)
+            if not await self.mark_room_read():
+                await self.send_error("Conversation not found")
+        elif message_type == 'sync':
+            # Same as GET /api/message/since/, answered on this socket only
+            position = parse_sync_position(data.get('created_at'), data.get('id'))
+            if position is None:
+                await self.send_error("created_at and id of the last received message are required")
+                return
+            messages, has_more = await self.load_messages_since(position)
+            await self.send(text_data=json.dumps({
+                'type': 'sync',
+                'messages': messages,
+                'has_more': has_more,
+            }, cls=JSONEncoder))
+
+    async def publish_typing(self, event_type, username):
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': event_type,
+                'username': username
+            }
+        )
+
+    async def send_text_message(self, data):
+        user = self.scope['user']
+        text = str(data.get('message') or '').strip()
+        if not text:
+            await self.send_error("Message cannot be empty")
+            return
+        if len(text) > MAX_MESSAGE_LENGTH:
+            await self.send_error(f"Message cannot exceed {MAX_MESSAGE_LENGTH} characters")
+            return
+
+        buffer = get_message_buffer()
+        if buffer is not None:
+            # Write-behind: broadcast now, persist with the rest of this window's messages
+            message_object = serialize_message(buffer.add(user, self.partner, text))
+        else:
+            message_object = await self.create_message(user, self.partner, text)
+
+        await self.typing_coalescer.stop(user.username)
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': 'chat_message',
+                'message_object': message_object,
+                'client_id': data.get('client_id'),
+            }
+        )
+
+    @database_sync_to_async
+    def create_message(self, sender, receiver, text):
+        with transaction.atomic():
+            message = Message.objects.create(sender=sender, receiver=receiver, message=text)
+            record_message(message)
+        return serialize_message(message)
+
+    async def get_room_partner(self, user):
+        # Cached briefly like the socket's user (see middleware), so reconnects cost no query.
+        # A stale entry can only ever point at a pair this user really belongs to.
+        key = ws_room_partner_cache_key(user.id, self.room_name)
+        partner = await cache.aget(key)
+        if partner is None:
+            partner = await database_sync_to_async(self.get_partner)(user)
+            if partner is not None:
+                await cache.aset(key, partner, settings.CHAT_WS_USER_CACHE_TTL)
+        return partner
+
+    def partner_username(self, user):
+        if self.room_name.startswith(f"{user.username}-"):
+            return self.room_name[len(user.username) + 1:]
+        if self.room_name.endswith(f"-{user.username}"):
+            return self.room_name[:-len(user.username) - 1]
+        return None
+
+    def get_partner(self, user):
+        """The other participant of this room, or None if the user isn't one of its two members."""
+        partner_username = self.partner_username(user)
+        if partner_username is None:
+            return None
+
+        partner = User.objects.filter(username=partner_username).first()
+        if partner is None or room_name_for(user.username, partner.username) != self.room_name:
+            return None
+        return partner
+
+    @database_sync_to_async
+    def load_room_message(self, message_id):
+        try:
+            message = Message.objects.select_related('sender', 'receiver').get(
+                id=message_id, sender__isnull=False, receiver__isnull=False
             )
+        except (Message.DoesNotExist, ValidationError):
+            return None
 
-    async def chat_message(self, event):
+        participants = {message.sender_id, message.receiver_id}
+        if participants != {self.scope['user'].id, self.partner.id}:
+            return None
+        return serialize_message(message)
+
+    @database_sync_to_async
+    def mark_room_read(self):
+        return mark_read(self.scope['user'], self.partner.id)
+
+    @database_sync_to_async
+    def load_messages_since(self, position):
+        user = self.scope['user']
+        messages, has_more = messages_since(user, position)
+        return MessageSerializer(messages, many=True, context={'auth_user': user}).data, has_more
+
+    async def send_error(self, error):
         await self.send(text_data=json.dumps({
+            'type': 'error',
+            'error': error,
+        }))
+
+    async def chat_message(self, event):
+        payload = {
             'type': 'chat_message',
             'message_object': event['message_object'],
-        }))
+        }
+        if event.get('client_id'):
+            payload['client_id'] = event['client_id']
+        await self.send(text_data=json.dumps(payload))
 
     async def typing(self, event):
         await self.send(text_data=json.dumps({
             'type': 'typing',
             'username': event['username']
         }))
+
+    async def stop_typing(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'stop_typing',
+            'username': event['username']
+        }))
+
+    async def unread_update(self, event):
+        await self.send(text_data=json.dumps(event))
+
+
+class NotificationConsumer(PresenceConsumer):
+    """Per-user socket for pushes outside a chat room, e.g. the inbox badge."""
+
+    async def connect(self):
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            await self.close(code=CLOSE_UNAUTHENTICATED)
+            return
+
+        self.user_group_name = user_group_name(user.id)
+        await self.channel_layer.group_add(self.user_group_name, self.channel_name)
+        subprotocol = TOKEN_SUBPROTOCOL if TOKEN_SUBPROTOCOL in self.scope.get('subprotocols', []) else None
+        await self.accept(subprotocol=subprotocol)
+        await self.start_presence()
+
+    async def disconnect(self, close_code):
+        await self.stop_presence()
+        if hasattr(self, 'user_group_name'):
+            await self.channel_layer.group_discard(self.user_group_name, self.channel_name)
+
+    async def unread_update(self, event):
+        await self.send(text_data=json.dumps(event))
@@ -0,0 +1,61 @@
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from pages.models import User
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+# Subprotocol clients use to carry the token: new WebSocket(url, ["bearer", token])
+TOKEN_SUBPROTOCOL = "bearer"
+
+def ws_user_cache_key(user_id):
+    return f"ws_user:{user_id}"
+
+def get_token(scope):
+    """The access token from ?token= or the ["bearer", <token>] subprotocol pair, if any."""
+    subprotocols = scope.get("subprotocols") or []
+    if TOKEN_SUBPROTOCOL in subprotocols:
+        index = subprotocols.index(TOKEN_SUBPROTOCOL)
+        if index + 1 < len(subprotocols):
+            return subprotocols[index + 1]
+
+    query = parse_qs(scope.get("query_string", b"").decode())
+    tokens = query.get("token")
+    return tokens[0] if tokens else None
+
+@database_sync_to_async
+def load_user(user_id):
+    return User.objects.filter(id=user_id, is_active=True).first()
+
+async def get_user(user_id):
+    # Short-TTL cache so a reconnect storm doesn't become one user query per socket
+    key = ws_user_cache_key(user_id)
+    user = await cache.aget(key)
+    if user is None:
+        user = await load_user(user_id)
+        if user is None:
+            return AnonymousUser()
+        await cache.aset(key, user, settings.CHAT_WS_USER_CACHE_TTL)
+    return user
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """Populates scope["user"] from a SimpleJWT access token; no session or per-connect DB hit when cached."""
+
+    async def __call__(self, scope, receive, send):
+        scope = dict(scope)
+        scope["user"] = AnonymousUser()
+
+        token = get_token(scope)
+        if token:
+            try:
+                user_id = AccessToken(token)[api_settings.USER_ID_CLAIM]
+            except (TokenError, KeyError):
+                user_id = None
+            if user_id is not None:
+                scope["user"] = await get_user(user_id)
+
+        return await super().__call__(scope, receive, send)
@@ -3,4 +3,5 @@ from . import consumers
 
 websocket_urlpatterns = [
     path("ws/chat/<str:room_name>/", consumers.ChatConsumer.as_asgi()),
+    path("ws/notifications/", consumers.NotificationConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -0,0 +1,44 @@
+import asyncio
+from django.conf import settings
+
+# Server-side typing-indicator coalescing. Keystrokes only update local state: a user's
+# first keystroke publishes "typing", further keystrokes re-publish it at most once per
+# window (so clients can keep the indicator alive), and "stop_typing" is published once
+# the user has been quiet for a full window. Channel-layer traffic is therefore bounded
+# by the window, whatever the keystroke rate.
+
+class TypingCoalescer:
+    def __init__(self, publish, window=None):
+        """`publish(event_type, username)` is awaited to broadcast 'typing'/'stop_typing'."""
+        self.publish = publish
+        self.window = window if window is not None else settings.CHAT_TYPING_WINDOW_MS / 1000
+        self.last_published = {}
+        self.stop_timers = {}
+
+    async def keystroke(self, username):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        timer = self.stop_timers.pop(username, None)
+        if timer is not None:
+            timer.cancel()
+        self.stop_timers[username] = loop.call_later(
+            self.window, lambda: loop.create_task(self.stop(username))
+        )
+
+        last = self.last_published.get(username)
+        if last is None or now - last >= self.window:
+            self.last_published[username] = now
+            await self.publish('typing', username)
+
+    async def stop(self, username):
+        """Publish 'stop_typing' if the user was shown as typing (timeout, message sent, or disconnect)."""
+        timer = self.stop_timers.pop(username, None)
+        if timer is not None:
+            timer.cancel()
+        if self.last_published.pop(username, None) is not None:
+            await self.publish('stop_typing', username)
+
+    async def stop_all(self):
+        for username in list(self.last_published):
+            await self.stop(username)
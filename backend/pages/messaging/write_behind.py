@@ -0,0 +1,120 @@
+import asyncio
+import atexit
+import datetime
+import logging
+import threading
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from pages.models import Message
+from pages.utils.conversation_utils import record_messages
+
+logger = logging.getLogger(__name__)
+
+# Write-behind persistence for socket chat messages. Messages are stamped and broadcast as
+# soon as they arrive, then written with one bulk_create for everything that arrived in
+# the same window (or as soon as max_batch is reached). Each process has a single queue
+# in arrival order and flushes one batch at a time, and created_at is strictly increasing
+# per conversation, so history order always matches the order clients saw.
+
+def write_messages(messages):
+    """Insert a batch of messages and their Conversation rows in one transaction."""
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+        record_messages(messages)
+
+class MessageWriteBuffer:
+    def __init__(self, window=None, max_batch=None):
+        self.window = window if window is not None else settings.CHAT_WRITE_BEHIND_WINDOW_MS / 1000
+        self.max_batch = max_batch or settings.CHAT_WRITE_BEHIND_MAX_BATCH
+        self.pending = []
+        self.last_created_at = {}
+        self.pending_lock = threading.Lock()  # add() runs on the loop, flush_sync() at exit
+        self.flush_lock = None
+        self.flush_timer = None
+        self.loop = None
+        self.lock_loop = None
+
+    def add(self, sender, receiver, text):
+        """Queue a message and return it (unsaved, with its final id and created_at)."""
+        pair = frozenset((sender.id, receiver.id))
+        created_at = timezone.now()
+        last = self.last_created_at.get(pair)
+        if last is not None and created_at <= last:
+            created_at = last + datetime.timedelta(microseconds=1)
+        self.last_created_at[pair] = created_at
+
+        message = Message(sender=sender, receiver=receiver, message=text, created_at=created_at)
+        with self.pending_lock:
+            self.pending.append(message)
+            pending_count = len(self.pending)
+
+        self.schedule_flush(immediately=pending_count >= self.max_batch)
+        return message
+
+    def schedule_flush(self, immediately=False):
+        self.loop = asyncio.get_running_loop()
+        if immediately:
+            self.cancel_timer()
+            self.loop.create_task(self.flush())
+        elif self.flush_timer is None:
+            self.flush_timer = self.loop.call_later(self.window, lambda: self.loop.create_task(self.flush()))
+
+    def cancel_timer(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+
+    def take_batch(self):
+        with self.pending_lock:
+            batch, self.pending = self.pending, []
+        # Older stamps can't collide with new ones any more
+        now = timezone.now()
+        self.last_created_at = {pair: stamp for pair, stamp in self.last_created_at.items() if stamp >= now}
+        return batch
+
+    async def flush(self):
+        loop = asyncio.get_running_loop()
+        if self.lock_loop is not loop:
+            self.flush_lock, self.lock_loop = asyncio.Lock(), loop
+        async with self.flush_lock:
+            self.cancel_timer()
+            batch = self.take_batch()
+            if batch:
+                await database_sync_to_async(self.write)(batch)
+
+    def flush_sync(self):
+        """Flush from outside the event loop, e.g. at interpreter shutdown."""
+        self.cancel_timer()
+        batch = self.take_batch()
+        if batch:
+            self.write(batch)
+
+    def write(self, batch):
+        try:
+            write_messages(batch)
+        except Exception:
+            # Don't let one bad row lose the whole window: retry the rows one by one, in order
+            logger.exception("Bulk write of %d chat messages failed; retrying individually", len(batch))
+            for message in batch:
+                try:
+                    write_messages([message])
+                except Exception:
+                    logger.exception("Dropping chat message %s that could not be saved", message.id)
+
+_buffer = None
+
+def get_message_buffer():
+    """The process-wide buffer, or None when CHAT_WRITE_BEHIND is off."""
+    global _buffer
+    if not settings.CHAT_WRITE_BEHIND:
+        return None
+    if _buffer is None:
+        _buffer = MessageWriteBuffer()
+    return _buffer
+
+@atexit.register
+def flush_on_shutdown():
+    if _buffer is not None:
+        _buffer.flush_sync()
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_likes(apps, schema_editor):
+    Post = apps.get_model('pages', 'Post')
+    Like = apps.get_model('pages', 'Like')
+
+    # Keep the earliest like per (user, post) and recount the posts that had duplicates
+    duplicates = Like.objects.values('user', 'post').annotate(count=Count('id')).filter(count__gt=1)
+    post_ids = set()
+    for duplicate in duplicates:
+        likes = Like.objects.filter(user=duplicate['user'], post=duplicate['post']).order_by('created_at', 'id')
+        Like.objects.filter(id__in=list(likes.values_list('id', flat=True)[1:])).delete()
+        post_ids.add(duplicate['post'])
+
+    if post_ids:
+        counts = Like.objects.filter(post=OuterRef('pk')).order_by().values('post').annotate(count=Count('*')).values('count')
+        Post.objects.filter(id__in=post_ids).update(like_count=Coalesce(Subquery(counts), Value(0)))
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0033_user_follow_counts'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_likes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='like',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_like_user_post'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_existing_conversations_read(apps, schema_editor):
+    # There was no unread state before, so start every conversation as read up to its last message
+    Conversation = apps.get_model('pages', 'Conversation')
+    Conversation.objects.update(last_read_message=F('last_message'), last_read_at=F('last_activity_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0036_message_created_at_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_read_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_read_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='pages.message'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='unread_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(mark_existing_conversations_read, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:30
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0037_conversation_unread'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='pair_key',
+            field=models.GeneratedField(db_persist=True, expression=models.Case(models.When(models.Q(('sender__isnull', True), ('receiver__isnull', True), _connector='OR'), then=models.Value(None, output_field=models.TextField())), models.When(sender__lt=models.F('receiver'), then=django.db.models.functions.text.Concat(django.db.models.functions.comparison.Cast('sender', models.TextField()), models.Value(':'), django.db.models.functions.comparison.Cast('receiver', models.TextField()), output_field=models.TextField())), default=django.db.models.functions.text.Concat(django.db.models.functions.comparison.Cast('receiver', models.TextField()), models.Value(':'), django.db.models.functions.comparison.Cast('sender', models.TextField()), output_field=models.TextField())), output_field=models.TextField()),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['pair_key', '-created_at', '-id'], name='message_pair_created_idx'),
+        ),
+    ]
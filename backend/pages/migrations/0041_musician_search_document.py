@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:48
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+def trigram_available(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def create_trigram_index(apps, schema_editor):
+    if not trigram_available(schema_editor):
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute("CREATE INDEX IF NOT EXISTS musician_doc_username_trgm_idx ON pages_musiciansearchdocument USING gin ((upper(username)) gin_trgm_ops)")
+
+
+def drop_trigram_index(apps, schema_editor):
+    schema_editor.execute("DROP INDEX IF EXISTS musician_doc_username_trgm_idx")
+
+
+def build_search_documents(apps, schema_editor):
+    Musician = apps.get_model('pages', 'Musician')
+    MusicianSearchDocument = apps.get_model('pages', 'MusicianSearchDocument')
+
+    documents = {}
+    musicians = Musician.objects.select_related('user').prefetch_related('genres', 'musicianinstrument_set').order_by('user_id', 'id')
+    for musician in musicians.iterator(chunk_size=1000):
+        document = documents.setdefault(musician.user_id, MusicianSearchDocument(
+            user_id=musician.user_id,
+            username=musician.user.username,
+            stage_name=musician.stage_name,
+            years_played=musician.years_played,
+            instrument_ids=[],
+            genre_ids=[],
+        ))
+        document.instrument_ids += [entry.instrument_id for entry in musician.musicianinstrument_set.all()]
+        document.genre_ids += [genre.id for genre in musician.genres.all()]
+
+    for document in documents.values():
+        document.instrument_ids = sorted(set(document.instrument_ids))
+        document.genre_ids = sorted(set(document.genre_ids))
+    MusicianSearchDocument.objects.bulk_create(documents.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0040_username_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MusicianSearchDocument',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='musician_search_document', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('username', models.CharField(max_length=30)),
+                ('stage_name', models.CharField(blank=True, max_length=255)),
+                ('instrument_ids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), blank=True, default=list, size=None)),
+                ('genre_ids', django.contrib.postgres.fields.ArrayField(base_field=models.UUIDField(), blank=True, default=list, size=None)),
+                ('years_played', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['instrument_ids'], name='musician_doc_instruments_idx'), django.contrib.postgres.indexes.GinIndex(fields=['genre_ids'], name='musician_doc_genres_idx')],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='musiciansearchdocument',
+                    index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('username'), name='gin_trgm_ops'), name='musician_doc_username_trgm_idx'),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_trigram_index, drop_trigram_index),
+            ],
+        ),
+        migrations.RunPython(build_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:54
+
+from django.db import migrations, models
+
+
+def backfill_home_studio(apps, schema_editor):
+    Musician = apps.get_model('pages', 'Musician')
+    MusicianSearchDocument = apps.get_model('pages', 'MusicianSearchDocument')
+    MusicianSearchDocument.objects.filter(
+        user_id__in=Musician.objects.filter(home_studio=True).values('user_id')
+    ).update(home_studio=True)
+
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pages', '0041_musician_search_document'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='musiciansearchdocument',
+            name='home_studio',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(backfill_home_studio, migrations.RunPython.noop),
+    ]
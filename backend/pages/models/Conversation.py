@@ -0,0 +1,27 @@
+from django.db import models
+import uuid
+
+# Inbox summary: one row per participant per conversation, so a user's inbox is an
+# index range scan on (user, last_activity_at). Both rows of a pair are upserted
+# whenever a message is sent (see pages/utils/conversation_utils.py).
+class Conversation(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name="conversations")
+    partner = models.ForeignKey('User', on_delete=models.CASCADE, related_name="+")
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    last_activity_at = models.DateTimeField()
+    # Messages from the partner this user hasn't read, and where they last read up to
+    unread_count = models.PositiveIntegerField(default=0)
+    last_read_message = models.ForeignKey('Message', on_delete=models.SET_NULL, related_name="+", null=True, blank=True)
+    last_read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "partner"], name="unique_conversation_user_partner"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-last_activity_at"], name="conversation_user_activity_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} <-> {self.partner_id}"
@@ -9,3 +9,8 @@ class Like(models.Model):
     post = models.ForeignKey('Post', related_name="likes", on_delete=models.CASCADE)
     comment = models.ForeignKey('Comment', on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_like_user_post"),
+        ]
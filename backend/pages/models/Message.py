@@ -1,14 +1,38 @@
 from django.db import models
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Cast, Concat, Upper
+from django.utils import timezone
 import uuid
 from pages.models import User
 from django.core.validators import MaxLengthValidator
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+
+# Text search configuration of Message.search_vector; queries must use the same one
+SEARCH_CONFIG = "english"
+
+def pair_key_expression():
+    # "<lower id>:<higher id>"; uuids order the same way as their text form (see message_utils.pair_key_for)
+    sender, receiver = Cast('sender', models.TextField()), Cast('receiver', models.TextField())
+    return Case(
+        # Concat treats NULL as '', so messages whose sender or receiver was deleted get no key
+        When(Q(sender__isnull=True) | Q(receiver__isnull=True), then=Value(None, output_field=models.TextField())),
+        When(sender__lt=F('receiver'), then=Concat(sender, Value(':'), receiver, output_field=models.TextField())),
+        default=Concat(receiver, Value(':'), sender, output_field=models.TextField()),
+    )
+
+class MessageManager(models.Manager):
+    def get_queryset(self):
+        # search_vector is only read inside search queries; don't ship it with every message
+        return super().get_queryset().defer('search_vector')
 
 class Message(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     sender = models.ForeignKey(User, on_delete=models.SET_NULL, related_name='sent_messages', null=True, blank=True)
     receiver = models.ForeignKey(User, on_delete=models.SET_NULL, related_name='received_messages', null=True, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # A default rather than auto_now_add so the write-behind buffer can stamp messages when they arrive
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     message = models.TextField(validators=[MaxLengthValidator(500)], blank=True)
     file_keys = ArrayField(
         models.CharField(max_length=255, validators=[MaxLengthValidator(255)]),
@@ -22,4 +46,31 @@ class Message(models.Model):
         verbose_name="File types",
         default=list
     )
+    # Unordered participant pair, computed by Postgres so bulk inserts and SET_NULL keep it right.
+    # A conversation's history is one range scan on (pair_key, created_at) instead of an OR of two directions.
+    pair_key = models.GeneratedField(
+        expression=pair_key_expression(),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
+    # Full-text search (pages/utils/message_utils.search_messages); partial words go through
+    # the trigram index on message instead
+    search_vector = models.GeneratedField(
+        expression=SearchVector('message', config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+
+    objects = MessageManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["pair_key", "-created_at", "-id"], name="message_pair_created_idx"),
+            # Reconnect sync (pages/utils/message_utils.messages_since) reads each direction from its position on
+            models.Index(fields=["sender", "created_at", "id"], name="message_sender_created_idx"),
+            models.Index(fields=["receiver", "created_at", "id"], name="message_receiver_created_idx"),
+            GinIndex(fields=["search_vector"], name="message_search_idx"),
+            # On UPPER(message) because that is what icontains compares on Postgres
+            GinIndex(OpClass(Upper("message"), name="gin_trgm_ops"), name="message_text_trgm_idx"),
+        ]
 
@@ -0,0 +1,29 @@
+from django.db import models
+from django.db.models.functions import Upper
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex, OpClass
+
+# Discover's search document: one row per musician user with everything the discover
+# filters look at, so filtering is a scan of one table (GIN indexes on the id arrays,
+# @> / && operators) instead of IN subqueries over Musician, MusicianInstrument and
+# genres. Rebuilt by pages/utils/discover_utils.py whenever signup or the musician
+# settings view changes a profile.
+class MusicianSearchDocument(models.Model):
+    user = models.OneToOneField('User', on_delete=models.CASCADE, primary_key=True, related_name="musician_search_document")
+    username = models.CharField(max_length=30)
+    stage_name = models.CharField(max_length=255, blank=True)
+    instrument_ids = ArrayField(models.UUIDField(), default=list, blank=True)
+    genre_ids = ArrayField(models.UUIDField(), default=list, blank=True)
+    years_played = models.IntegerField(null=True, blank=True)
+    home_studio = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["instrument_ids"], name="musician_doc_instruments_idx"),
+            GinIndex(fields=["genre_ids"], name="musician_doc_genres_idx"),
+            # Same expression as the pages_user username trigram index (pages/utils/search_utils.py)
+            GinIndex(OpClass(Upper("username"), name="gin_trgm_ops"), name="musician_doc_username_trgm_idx"),
+        ]
+
+    def __str__(self):
+        return self.username
@@ -25,14 +25,20 @@ class Post(models.Model):
     
     tagged_users = models.ManyToManyField('User', related_name="tagged_users")
 
+    # Denormalized count of likes, kept in sync atomically by the Like signal handlers
+    like_count = models.PositiveIntegerField(default=0)
+
     is_banned = models.BooleanField(default=False)
     ban_admin = models.ManyToManyField('User', related_name="banned_posts", blank=True)
     
+    class Meta:
+        indexes = [
+            # The recent-posts window home timelines are drawn from (pages/utils/timeline_utils.py)
+            models.Index(fields=["-created_at", "-id"], name="post_created_idx"),
+        ]
+
     def clean(self):
         if self.is_banned and not self.ban_admin.exists():
             raise ValidationError("A banned post must have at least one ban_admin.")
         if not self.is_banned and self.ban_admin.exists():
-            raise ValidationError("A non-banned post should not have any ban_admins.")
-
-    def like_count(self):
-        return self.likes.count()
\ No newline at end of file
+            raise ValidationError("A non-banned post should not have any ban_admins.")
\ No newline at end of file
@@ -0,0 +1,17 @@
+from django.db import models
+
+# Materialized home feed: one row per (viewer, post) the viewer is allowed to see.
+# Rows are fanned out when a post is created and pruned on hide/report/ban/block,
+# so a feed page is an index range scan on (user, created_at).
+class TimelineEntry(models.Model):
+    user = models.ForeignKey('User', on_delete=models.CASCADE, related_name="timeline_entries")
+    post = models.ForeignKey('Post', on_delete=models.CASCADE, related_name="timeline_entries")
+    created_at = models.DateTimeField()  # Copy of post.created_at
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="unique_timeline_user_post"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="timeline_user_created_idx"),
+        ]
@@ -2,7 +2,8 @@ from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinLengthValidator
 from django.core.validators import RegexValidator
 from django.db import models
-from pages.models.Follower import Follower
+from django.db.models.functions import Upper
+from django.contrib.postgres.indexes import GinIndex, OpClass
 import uuid
  
 class User(AbstractUser):
@@ -33,16 +34,20 @@ class User(AbstractUser):
     rating = models.DecimalField(max_digits=3, decimal_places=2, default=0.0)  # Example: 4.5 rating
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Denormalized from Follower; kept in sync by the signals in pages/signals.py
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+
     hidden_posts = models.ManyToManyField('Post', related_name="hidden_users")
     reported_posts = models.ManyToManyField('Post', related_name="reported_users", through="ReportedPost")
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # username search (pages/utils/search_utils.py) filters on UPPER(username) LIKE '%...%'
+            GinIndex(OpClass(Upper("username"), name="gin_trgm_ops"), name="user_username_trgm_idx"),
+        ]
+
     def set_password(self, raw_password):
         """Hash and securely store the password"""
         super().set_password(raw_password)
         # TODO SN5-81: add password db validation
-        
-    def follower_count(self):
-        return Follower.objects.filter(following=self).count()
-
-    def following_count(self):
-        return Follower.objects.filter(follower=self).count()
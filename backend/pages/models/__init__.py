@@ -16,6 +16,9 @@ from .JobListing import JobListing
 from .Message import Message
 from .JobApplication import JobApplication
 from .Experience import Experience
+from .TimelineEntry import TimelineEntry
+from .Conversation import Conversation
+from .MusicianSearchDocument import MusicianSearchDocument
 
 __all__ = ["User", "Musician", "Business", "Instrument", "Genre", "Post", "Like", "Comment", "Follower", "MusicianInstrument", 
-           "BlockedUser", "TaggedUser", "ReportedPost", "PostStatus", "Subscription", "JobListing", "Message", "JobApplication", "Experience"]
+           "BlockedUser", "TaggedUser", "ReportedPost", "PostStatus", "Subscription", "JobListing", "Message", "JobApplication", "Experience", "TimelineEntry", "Conversation", "MusicianSearchDocument"]
@@ -6,7 +6,7 @@ from .genre_serializers import GenreSerializer
 from .instrument_serializers import InstrumentSerializer
 from .follower_serializers import FollowCountSerializer
 from .signup_serializers import UserSignupSerializer
-from .user_serializers import UserSerializer
+from .user_serializers import UserSerializer, ProfileCardSerializer
 from .message_serializer import MessageSerializer
 
-__all__ = ["PostSerializer", "CommentSerializer", "BusinessSerializer", "MusicianSerializer", "MusicianInstrumentSerializer", "GenreSerializer", "InstrumentSerializer", "FollowCountSerializer", "UserSignupSerializer", "UserSerializer", "MessageSerializer"]
\ No newline at end of file
+__all__ = ["PostSerializer", "CommentSerializer", "BusinessSerializer", "MusicianSerializer", "MusicianInstrumentSerializer", "GenreSerializer", "InstrumentSerializer", "FollowCountSerializer", "UserSignupSerializer", "UserSerializer", "ProfileCardSerializer", "MessageSerializer"]
\ No newline at end of file
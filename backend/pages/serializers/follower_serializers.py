@@ -2,15 +2,9 @@ from rest_framework import serializers
 from pages.models import User
 
 class FollowCountSerializer(serializers.ModelSerializer):
-    follower_count = serializers.SerializerMethodField()
-    following_count = serializers.SerializerMethodField()
+    follower_count = serializers.IntegerField(read_only=True)
+    following_count = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = User
         fields = ['follower_count', 'following_count']
-
-    def get_follower_count(self, obj):
-        return obj.follower_count()
-
-    def get_following_count(self, obj):
-        return obj.following_count()
\ No newline at end of file
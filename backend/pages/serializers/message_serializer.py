@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from pages.serializers.user_serializers import UserSerializer
 from pages.utils.s3_utils import generate_s3_url
-from pages.models import Message
+from pages.models import Message, Follower, BlockedUser
+from django.db.models import Exists, OuterRef, Value
 
 class MessageSerializer(serializers.ModelSerializer):
     s3_urls = serializers.SerializerMethodField()
@@ -13,6 +14,19 @@ class MessageSerializer(serializers.ModelSerializer):
             'id', 'sender', 'created_at', 'receiver', 'message', 's3_urls'
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset, auth_user=None):
+        """Fetch senders and their follow/block flags with the messages instead of per message."""
+        queryset = queryset.select_related('sender')
+
+        if auth_user is None or not auth_user.is_authenticated:
+            return queryset.annotate(sender_is_following=Value(False), sender_is_blocked=Value(False))
+
+        return queryset.annotate(
+            sender_is_following=Exists(Follower.objects.filter(follower=auth_user, following=OuterRef('sender'))),
+            sender_is_blocked=Exists(BlockedUser.objects.filter(blocker=auth_user, blocked=OuterRef('sender'))),
+        )
+
     def get_s3_urls(self, obj):
         return [
             generate_s3_url(file_key, file_type)
@@ -21,7 +35,11 @@ class MessageSerializer(serializers.ModelSerializer):
     
     def get_sender(self, obj):
         auth_user = self.context.get('auth_user')
-        return UserSerializer(obj.sender, context={'auth_user': auth_user}).data
+        sender = obj.sender
+        if sender is not None and hasattr(obj, 'sender_is_following'):
+            sender.isFollowing = obj.sender_is_following
+            sender.isBlocked = obj.sender_is_blocked
+        return UserSerializer(sender, context={'auth_user': auth_user}).data
 
     def get_receiver(self, obj):
         auth_user = self.context.get('auth_user')
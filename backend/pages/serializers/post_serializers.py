@@ -1,14 +1,15 @@
 from pages.serializers.user_serializers import UserSerializer
 from rest_framework import serializers
 from pages.utils.s3_utils import generate_s3_url
-from pages.models import Post, ReportedPost, Like
+from pages.models import Post, ReportedPost, Like, Follower, BlockedUser
+from django.db.models import Exists, OuterRef, Value
 
 class PostSerializer(serializers.ModelSerializer):
     s3_urls = serializers.SerializerMethodField()
     owner = serializers.SerializerMethodField()
     is_reported = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
-    like_count = serializers.SerializerMethodField()
+    like_count = serializers.IntegerField(read_only=True)
     is_banned = serializers.BooleanField(read_only=True)
 
     class Meta:
@@ -19,9 +20,36 @@ class PostSerializer(serializers.ModelSerializer):
             's3_urls', 'is_reported', 'is_banned', 'is_liked', 'like_count'
         ]
 
+    @staticmethod
+    def setup_eager_loading(queryset, auth_user=None):
+        """
+        Annotate everything the serializer reads so a page of posts is fetched in one
+        query (plus the tagged_users prefetch) instead of several queries per post.
+        """
+        queryset = queryset.select_related('owner').prefetch_related('tagged_users').annotate(
+            annotated_is_reported=Exists(ReportedPost.objects.filter(post=OuterRef('pk'))),
+        )
+
+        if auth_user is None or not auth_user.is_authenticated:
+            return queryset.annotate(
+                annotated_is_liked=Value(False),
+                owner_is_following=Value(False),
+                owner_is_blocked=Value(False),
+            )
+
+        return queryset.annotate(
+            annotated_is_liked=Exists(Like.objects.filter(post=OuterRef('pk'), user=auth_user)),
+            owner_is_following=Exists(Follower.objects.filter(follower=auth_user, following=OuterRef('owner'))),
+            owner_is_blocked=Exists(BlockedUser.objects.filter(blocker=auth_user, blocked=OuterRef('owner'))),
+        )
+
     def get_owner(self, obj):
         auth_user = self.context.get('auth_user')
-        return UserSerializer(obj.owner, context={'auth_user': auth_user}).data
+        owner = obj.owner
+        if hasattr(obj, 'owner_is_following'):
+            owner.isFollowing = obj.owner_is_following
+            owner.isBlocked = obj.owner_is_blocked
+        return UserSerializer(owner, context={'auth_user': auth_user}).data
 
     def get_s3_urls(self, obj):
         return [
@@ -31,11 +59,12 @@ class PostSerializer(serializers.ModelSerializer):
 
     def get_is_reported(self, obj):
         # TODO: don't serialize if not admin - so anonymous people can't hit the API and get all reported posts (and who reported)
+        if hasattr(obj, 'annotated_is_reported'):
+            return obj.annotated_is_reported
         return ReportedPost.objects.filter(post=obj).exists()
-    
+
     def get_is_liked(self, obj):
+        if hasattr(obj, 'annotated_is_liked'):
+            return obj.annotated_is_liked
         return Like.objects.filter(post=obj, user=self.context.get('auth_user')).exists()
-    
-    def get_like_count(self, obj):
-        return obj.like_count()
-    
\ No newline at end of file
+
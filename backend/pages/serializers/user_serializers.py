@@ -1,5 +1,7 @@
 from rest_framework import serializers
-from pages.models import User, Follower, BlockedUser
+from django.db.models import Exists, OuterRef, Prefetch, Value
+from pages.models import User, Follower, BlockedUser, Musician, MusicianInstrument
+from pages.serializers.musician_serializers import MusicianSerializer
 
 
 # Serializer for users
@@ -12,6 +14,10 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'role', 'isFollowing', 'isBlocked']
         
     def get_isFollowing(self, obj):
+        # Querysets may annotate this up front to avoid a query per user
+        if hasattr(obj, 'isFollowing'):
+            return obj.isFollowing
+
         auth_user = self.context.get('auth_user')
 
         if not auth_user or not auth_user.is_authenticated:
@@ -20,9 +26,51 @@ class UserSerializer(serializers.ModelSerializer):
         return Follower.objects.filter(follower=auth_user, following=obj).exists()
     
     def get_isBlocked(self, obj):
+        if hasattr(obj, 'isBlocked'):
+            return obj.isBlocked
+
         auth_user = self.context.get('auth_user')
 
         if not auth_user or not auth_user.is_authenticated:
             return False
 
         return BlockedUser.objects.filter(blocker=auth_user, blocked=obj).exists()
+
+
+# Serializer for discover's profile cards: the user, their musician profile and follow counts
+class ProfileCardSerializer(UserSerializer):
+    follower_count = serializers.IntegerField(read_only=True)
+    following_count = serializers.IntegerField(read_only=True)
+    musician = serializers.SerializerMethodField()
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['follower_count', 'following_count', 'musician']
+
+    @staticmethod
+    def setup_eager_loading(queryset, auth_user=None):
+        """
+        Load a batch of cards in a fixed number of queries: the users with their follow/block
+        flags, then one prefetch each for musician profiles, their genres and their instruments.
+        """
+        queryset = queryset.prefetch_related(
+            Prefetch(
+                'musician_set',
+                queryset=Musician.objects.order_by('id').prefetch_related(
+                    'genres',
+                    Prefetch('musicianinstrument_set', queryset=MusicianInstrument.objects.select_related('instrument')),
+                ),
+                to_attr='musician_profiles',
+            )
+        )
+
+        if auth_user is None or not auth_user.is_authenticated:
+            return queryset.annotate(isFollowing=Value(False), isBlocked=Value(False))
+
+        return queryset.annotate(
+            isFollowing=Exists(Follower.objects.filter(follower=auth_user, following=OuterRef('pk'))),
+            isBlocked=Exists(BlockedUser.objects.filter(blocker=auth_user, blocked=OuterRef('pk'))),
+        )
+
+    def get_musician(self, obj):
+        profiles = obj.musician_profiles if hasattr(obj, 'musician_profiles') else obj.musician_set.all()
+        return MusicianSerializer(profiles[0]).data if profiles else None
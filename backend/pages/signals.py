@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from pages.models import User, Post, Like, Follower, ReportedPost, BlockedUser, TimelineEntry
+from pages.messaging.middleware import ws_user_cache_key
+from pages.utils.timeline_utils import (
+    fan_out_post, add_posts_to_timeline, remove_post_from_timelines, remove_owner_from_timeline
+)
+
+# Keep the materialized home timelines (TimelineEntry) in sync with posts and the
+# hide/report/ban/block state that filters them. Copies that touch many rows (fan-out,
+# new-user backfill) run once the triggering transaction commits, outside the write itself.
+
+@receiver(post_save, sender=User)
+def backfill_new_user_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: add_posts_to_timeline(instance))
+
+@receiver(post_save, sender=Post)
+def sync_post_timelines(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        transaction.on_commit(lambda: fan_out_post(instance))
+    elif instance.is_banned:
+        remove_post_from_timelines(instance)
+    else:
+        TimelineEntry.objects.filter(post=instance).exclude(created_at=instance.created_at) \
+            .update(created_at=instance.created_at)
+
+@receiver(post_save, sender=ReportedPost)
+def prune_reported_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and instance.user_id:
+        remove_post_from_timelines(instance.post_id, users=[instance.user_id])
+
+@receiver(m2m_changed, sender=User.hidden_posts.through)
+def sync_hidden_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+
+    # Forward: user.hidden_posts.add(post); reverse: post.hidden_users.add(user)
+    pairs = [(instance.pk, pk) for pk in pk_set] if not reverse else [(pk, instance.pk) for pk in pk_set]
+    for user_id, post_id in pairs:
+        if action == "post_add":
+            remove_post_from_timelines(post_id, users=[user_id])
+        else:
+            add_posts_to_timeline(User.objects.get(id=user_id), posts=[post_id])
+
+@receiver(post_save, sender=BlockedUser)
+def prune_blocked_timelines(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        remove_owner_from_timeline(instance.blocker_id, instance.blocked_id)
+        remove_owner_from_timeline(instance.blocked_id, instance.blocker_id)
+
+# Post.like_count is updated with F() expressions so concurrent likes can't lose
+# increments; post_delete also covers likes removed by cascades (e.g. user deletion).
+
+@receiver(post_save, sender=Like)
+def increment_like_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Post.objects.filter(id=instance.post_id).update(like_count=F('like_count') + 1)
+
+@receiver(post_delete, sender=Like)
+def decrement_like_count(sender, instance, **kwargs):
+    Post.objects.filter(id=instance.post_id, like_count__gt=0).update(like_count=F('like_count') - 1)
+
+# User.follower_count/following_count follow the same pattern. Both rows are updated in
+# primary-key order so that A following B while B follows A can't deadlock; callers
+# wrap the Follower write in transaction.atomic() so row and counters commit together.
+
+def _adjust_follow_counts(follow, delta):
+    updates = sorted([
+        (follow.follower_id, 'following_count'),
+        (follow.following_id, 'follower_count'),
+    ])
+    for user_id, field in updates:
+        users = User.objects.filter(id=user_id)
+        if delta < 0:
+            users = users.filter(**{f"{field}__gt": 0})
+        users.update(**{field: F(field) + delta})
+
+@receiver(post_save, sender=Follower)
+def increment_follow_counts(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _adjust_follow_counts(instance, 1)
+
+@receiver(post_delete, sender=Follower)
+def decrement_follow_counts(sender, instance, **kwargs):
+    _adjust_follow_counts(instance, -1)
+
+# WebSocket auth caches users briefly; drop the entry when the user changes or is deleted
+# so deactivations and username changes apply on the next connect.
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_ws_user_cache(sender, instance, **kwargs):
+    cache.delete(ws_user_cache_key(instance.pk))
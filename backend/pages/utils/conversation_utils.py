@@ -0,0 +1,111 @@
+import logging
+from collections import Counter
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from pages.models import Conversation
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+def user_group_name(user_id):
+    """Channel-layer group every socket of a user joins, for per-user pushes."""
+    return f"user_{user_id}"
+
+def conversation_rows(messages):
+    """One Conversation row per participant for the latest message of each pair."""
+    latest = {}
+    for message in messages:
+        if not message.sender_id or not message.receiver_id or message.sender_id == message.receiver_id:
+            continue
+        pair = frozenset((message.sender_id, message.receiver_id))
+        if pair not in latest or message.created_at >= latest[pair].created_at:
+            latest[pair] = message
+
+    rows = []
+    for message in latest.values():
+        for user_id, partner_id in ((message.sender_id, message.receiver_id), (message.receiver_id, message.sender_id)):
+            rows.append(Conversation(
+                user_id=user_id,
+                partner_id=partner_id,
+                last_message_id=message.id,
+                last_activity_at=message.created_at,
+            ))
+
+    # A fixed row order keeps concurrent upserts for A->B and B->A from deadlocking
+    return sorted(rows, key=lambda row: (str(row.user_id), str(row.partner_id)))
+
+# bulk_create(update_conflicts=True) can't put a WHERE on its DO UPDATE. This one only
+# moves a row forward, so a write-behind batch or a slow attachment message committed after
+# a newer message can't point the inbox back at an older one.
+UPSERT_SQL = """
+    INSERT INTO pages_conversation (id, user_id, partner_id, last_message_id, last_activity_at, unread_count)
+    VALUES {values}
+    ON CONFLICT (user_id, partner_id) DO UPDATE
+    SET last_message_id = EXCLUDED.last_message_id, last_activity_at = EXCLUDED.last_activity_at
+    WHERE EXCLUDED.last_activity_at >= pages_conversation.last_activity_at
+"""
+
+def upsert_conversations(messages):
+    """Point the senders' and receivers' inbox rows at these messages, leaving unread counts alone."""
+    rows = conversation_rows(messages)
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), BATCH_SIZE):
+            batch = rows[start:start + BATCH_SIZE]
+            params = []
+            for row in batch:
+                params += [row.id, row.user_id, row.partner_id, row.last_message_id, row.last_activity_at]
+            cursor.execute(UPSERT_SQL.format(values=", ".join(["(%s, %s, %s, %s, %s, 0)"] * len(batch))), params)
+
+def record_messages(messages):
+    """Upsert the senders' and receivers' inbox rows for newly saved messages and bump unread counts."""
+    upsert_conversations(messages)
+
+    # New rows start at 0, so incrementing after the upsert is right for new and existing rows
+    unread = Counter(
+        (message.receiver_id, message.sender_id) for message in messages
+        if message.sender_id and message.receiver_id and message.sender_id != message.receiver_id
+    )
+    for (user_id, partner_id), count in sorted(unread.items(), key=lambda item: (str(item[0][0]), str(item[0][1]))):
+        Conversation.objects.filter(user_id=user_id, partner_id=partner_id).update(unread_count=F('unread_count') + count)
+
+    if unread:
+        transaction.on_commit(lambda: push_unread_counts(list(unread)))
+
+def record_message(message):
+    record_messages([message])
+
+def mark_read(user, partner_id):
+    """Reset the user's unread count with partner_id and move their read cursor to the last message."""
+    updated = Conversation.objects.filter(user=user, partner_id=partner_id).update(
+        unread_count=0,
+        last_read_message=F('last_message'),
+        last_read_at=F('last_activity_at'),
+    )
+    if updated:
+        transaction.on_commit(lambda: push_unread_counts([(user.id, partner_id)]))
+    return bool(updated)
+
+def total_unread(user_id):
+    return Conversation.objects.filter(user_id=user_id, unread_count__gt=0) \
+        .aggregate(total=Sum('unread_count'))['total'] or 0
+
+def push_unread_counts(pairs):
+    """Send each (user, partner) pair's current unread count, and the user's total, to the user's sockets."""
+    try:
+        channel_layer = get_channel_layer()
+        for user_id, partner_id in pairs:
+            conversation = Conversation.objects.filter(user_id=user_id, partner_id=partner_id).first()
+            if conversation is None:
+                continue
+            async_to_sync(channel_layer.group_send)(user_group_name(user_id), {
+                'type': 'unread_update',
+                'partner_id': str(partner_id),
+                'unread_count': conversation.unread_count,
+                'total_unread': total_unread(user_id),
+            })
+    except Exception:
+        # Counters are already committed; clients also get them from the inbox and unread endpoints
+        logger.warning("Could not push unread counts", exc_info=True)
@@ -0,0 +1,129 @@
+import hashlib
+import json
+from django.conf import settings
+from django.contrib.postgres.expressions import ArraySubquery
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Func, IntegerField
+from django.db.models.lookups import Exact
+from pages.models import Musician, MusicianSearchDocument, Instrument, Genre
+
+BATCH_SIZE = 1000
+
+def build_search_documents(user_ids):
+    """Search documents for the given users, built from all of their Musician rows."""
+    musicians = Musician.objects.filter(user_id__in=user_ids) \
+        .select_related('user') \
+        .prefetch_related('genres', 'musicianinstrument_set') \
+        .order_by('user_id', 'id')
+
+    documents = {}
+    for musician in musicians:
+        document = documents.get(musician.user_id)
+        if document is None:
+            document = documents[musician.user_id] = MusicianSearchDocument(
+                user_id=musician.user_id,
+                username=musician.user.username,
+                stage_name=musician.stage_name,
+                years_played=musician.years_played,
+                home_studio=False,
+                instrument_ids=[],
+                genre_ids=[],
+            )
+        document.home_studio = document.home_studio or musician.home_studio
+        document.instrument_ids += [entry.instrument_id for entry in musician.musicianinstrument_set.all()]
+        document.genre_ids += [genre.id for genre in musician.genres.all()]
+
+    for document in documents.values():
+        document.instrument_ids = sorted(set(document.instrument_ids))
+        document.genre_ids = sorted(set(document.genre_ids))
+    return list(documents.values())
+
+def refresh_musician_search_documents(user_ids):
+    """Rebuild the users' discover search documents, dropping those of users without a musician profile."""
+    user_ids = list(user_ids)
+    documents = build_search_documents(user_ids)
+
+    MusicianSearchDocument.objects.filter(user_id__in=user_ids) \
+        .exclude(user_id__in=[document.user_id for document in documents]).delete()
+    MusicianSearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["username", "stage_name", "instrument_ids", "genre_ids", "years_played", "home_studio"],
+        batch_size=BATCH_SIZE,
+    )
+
+def refresh_musician_search_document(user):
+    refresh_musician_search_documents([user.id])
+
+def filter_documents(documents, instruments=None, genres=None, match_all=False, home_studio=None):
+    """
+    Narrow search documents to musicians playing the named instruments and genres: any
+    of them (&&) by default, all of them (@>) with match_all. Names are resolved to ids
+    inside the same query, so the GIN indexes on the id arrays do the filtering.
+    """
+    lookup = "contains" if match_all else "overlap"
+    if instruments:
+        instrument_ids = ArraySubquery(Instrument.objects.filter(instrument__in=instruments).values('id'))
+        documents = documents.filter(**{f"instrument_ids__{lookup}": instrument_ids})
+        if match_all:
+            documents = documents.filter(_all_names_exist(Instrument, "instrument", instruments))
+    if genres:
+        genre_ids = ArraySubquery(Genre.objects.filter(genre__in=genres).values('id'))
+        documents = documents.filter(**{f"genre_ids__{lookup}": genre_ids})
+        if match_all:
+            documents = documents.filter(_all_names_exist(Genre, "genre", genres))
+    if home_studio is not None:
+        documents = documents.filter(home_studio=home_studio)
+    return documents
+
+def _all_names_exist(model, field, names):
+    # An unknown name resolves to no id, and "ids @> '{}'" holds for every row, so match_all
+    # also checks that each name was found (in the same statement as the filter)
+    found = ArraySubquery(model.objects.filter(**{f"{field}__in": names}).order_by().values(field).distinct())
+    return Exact(Func(found, function="cardinality", output_field=IntegerField()), len(set(names)))
+
+# Every facet value of the filtered documents as (facet, value) rows, counted by one
+# GROUP BY; instrument and genre ids are swapped for their names after grouping.
+FACET_SQL = """
+    WITH filtered AS ({documents})
+    SELECT facets.facet, COALESCE(instrument.instrument, genre.genre, facets.value), facets.total
+    FROM (
+        SELECT facet, value, COUNT(*) AS total
+        FROM (
+            SELECT 'instruments' AS facet, unnest(instrument_ids)::text AS value FROM filtered
+            UNION ALL
+            SELECT 'genres', unnest(genre_ids)::text FROM filtered
+            UNION ALL
+            SELECT 'home_studio', home_studio::text FROM filtered
+        ) AS facet_values
+        GROUP BY facet, value
+    ) AS facets
+    LEFT JOIN pages_instrument AS instrument ON facets.facet = 'instruments' AND instrument.id::text = facets.value
+    LEFT JOIN pages_genre AS genre ON facets.facet = 'genres' AND genre.id::text = facets.value
+"""
+
+def facet_counts(documents):
+    """
+    Musicians per instrument, per genre and with/without a home studio among `documents`
+    (already filtered), in one query: {"instruments": {"Guitar": 3}, "genres": {...},
+    "home_studio": {"true": 1, "false": 2}}.
+    """
+    sql, params = documents.order_by().values('instrument_ids', 'genre_ids', 'home_studio').query.sql_with_params()
+    facets = {"instruments": {}, "genres": {}, "home_studio": {"true": 0, "false": 0}}
+    with connection.cursor() as cursor:
+        cursor.execute(FACET_SQL.format(documents=sql), params)
+        for facet, value, total in cursor.fetchall():
+            facets[facet][value] = total
+    return facets
+
+def facet_cache_key(user_id, **filters):
+    # Per user as well as per filter: the filtered set excludes the caller and whoever blocked them
+    filters = {name: sorted(value) if isinstance(value, list) else value for name, value in filters.items()}
+    digest = hashlib.sha256(json.dumps([str(user_id), filters], sort_keys=True).encode()).hexdigest()
+    return f"discover_facets:{digest}"
+
+def cached_facet_counts(documents, cache_key):
+    """facet_counts, reused for DISCOVER_FACET_CACHE_TTL seconds so drilling down between pages stays cheap."""
+    return cache.get_or_set(cache_key, lambda: facet_counts(documents), settings.DISCOVER_FACET_CACHE_TTL)
@@ -0,0 +1,263 @@
+import threading
+import time
+import numpy as np
+from scipy import sparse
+from django.conf import settings
+from pages.models import Musician, MusicianInstrument, JobListing, Instrument, Genre
+
+# Musician <-> job listing matching. Both sides become sparse rows over the same columns,
+# one per instrument then one per genre, so every score is a sparse matrix product:
+#
+#   listing row:  INSTRUMENT_WEIGHT / (instruments asked for) in each instrument column,
+#                 GENRE_WEIGHT / (genres asked for) in each genre column
+#   musician row: experience fit (0-1) in each instrument column they play, 1 per genre
+#
+# so a score is the weighted share of the listing's instruments and genres the musician
+# covers, between 0 and 1. Experience fit is min(1, years played / years the listing's
+# experience level asks for); it depends on the level, so the musician matrix is kept once
+# per level (a handful) and each listing is scored against the one for its level.
+
+INSTRUMENT_WEIGHT = 0.7
+GENRE_WEIGHT = 0.3
+
+# Years of experience each JobListing.experience_level asks for; anything else asks for none
+EXPERIENCE_LEVEL_YEARS = {
+    "Beginner": 0,
+    "Intermediate": 1,
+    "Experienced": 3,
+    "Professional": 5,
+}
+
+class MatchIndex:
+    """Sparse musician and listing matrices with the ids their rows stand for."""
+
+    def __init__(self, musician_user_ids, musician_rows, listing_ids, listing_rows, listing_years, instrument_count,
+                 instrument_ids=(), genre_ids=()):
+        self.musician_user_ids = musician_user_ids
+        self.listing_ids = listing_ids
+        self.musician_row = {user_id: row for row, user_id in enumerate(musician_user_ids)}
+        self.listing_row = {listing_id: row for row, listing_id in enumerate(listing_ids)}
+        self.listing_years = listing_years
+        self.listings = listing_rows.tocsr()
+
+        # Instrument columns hold years played; genre columns are already 1
+        self.years = musician_rows.tocsr()
+        self.is_instrument_column = np.arange(self.years.shape[1]) < instrument_count
+        # Column of each instrument/genre id, to score listings and musicians newer than the index
+        self.instrument_column = {instrument_id: column for column, instrument_id in enumerate(instrument_ids)}
+        self.genre_column = {genre_id: instrument_count + column for column, genre_id in enumerate(genre_ids)}
+        self.levels = {}
+        for years_required in np.unique(listing_years):
+            self.levels[int(years_required)] = self._fit(self.years, int(years_required))
+
+    @classmethod
+    def from_entries(cls, musician_user_ids, musician_instruments, musician_genres,
+                     listing_ids, listing_instruments, listing_genres, listing_years,
+                     instrument_count, genre_count, instrument_ids=(), genre_ids=()):
+        """
+        Build from (row, column[, years]) arrays: musician_instruments is (rows, instrument
+        columns, years played), musician_genres and listing_* are (rows, columns). Genre
+        columns are numbered from 0 here and shifted past the instrument columns. instrument_ids
+        and genre_ids, if given, are the ids the columns stand for.
+        """
+        shape_columns = instrument_count + genre_count
+
+        rows, columns, years = (np.asarray(part) for part in musician_instruments)
+        genre_rows, genre_columns = (np.asarray(part) for part in musician_genres)
+        musician_rows = sparse.coo_matrix(
+            (
+                np.concatenate([years.astype(np.float32), np.ones(len(genre_rows), dtype=np.float32)]),
+                (np.concatenate([rows, genre_rows]), np.concatenate([columns, genre_columns + instrument_count])),
+            ),
+            shape=(len(musician_user_ids), shape_columns),
+        )
+
+        rows, columns = (np.asarray(part) for part in listing_instruments)
+        genre_rows, genre_columns = (np.asarray(part) for part in listing_genres)
+        listing_count = len(listing_ids)
+        instruments_asked = np.bincount(rows, minlength=listing_count)
+        genres_asked = np.bincount(genre_rows, minlength=listing_count)
+        listing_rows = sparse.coo_matrix(
+            (
+                np.concatenate([
+                    INSTRUMENT_WEIGHT / instruments_asked[rows],
+                    GENRE_WEIGHT / genres_asked[genre_rows],
+                ]).astype(np.float32),
+                (np.concatenate([rows, genre_rows]), np.concatenate([columns, genre_columns + instrument_count])),
+            ),
+            shape=(listing_count, shape_columns),
+        )
+
+        return cls(list(musician_user_ids), musician_rows, list(listing_ids), listing_rows,
+                   np.asarray(listing_years, dtype=np.int32).reshape(listing_count), instrument_count,
+                   instrument_ids, genre_ids)
+
+    def _fit(self, years, years_required):
+        fit = years.copy()
+        if years_required > 0:
+            # CSR keeps each entry's column in .indices; only instrument entries are scaled
+            instrument_entries = self.is_instrument_column[fit.indices]
+            fit.data[instrument_entries] = np.minimum(1.0, fit.data[instrument_entries] / years_required)
+        else:
+            fit.data[:] = 1.0
+        return fit
+
+    def fit_for(self, years_required):
+        if years_required not in self.levels:
+            self.levels[years_required] = self._fit(self.years, years_required)
+        return self.levels[years_required]
+
+    def listing_vector(self, instrument_ids, genre_ids):
+        """A listing row built from ids, for listings created after the index; unknown ids match nobody."""
+        instrument_ids, genre_ids = list(instrument_ids), list(genre_ids)
+        entries = [(self.instrument_column.get(instrument_id), INSTRUMENT_WEIGHT / len(instrument_ids)) for instrument_id in instrument_ids]
+        entries += [(self.genre_column.get(genre_id), GENRE_WEIGHT / len(genre_ids)) for genre_id in genre_ids]
+        return self._row([(column, value) for column, value in entries if column is not None])
+
+    def musician_vector(self, instrument_years, genre_ids):
+        """A musician row from {instrument id: years played} and genre ids, for musicians newer than the index."""
+        entries = [(self.instrument_column.get(instrument_id), years) for instrument_id, years in instrument_years.items()]
+        entries += [(self.genre_column.get(genre_id), 1.0) for genre_id in genre_ids]
+        return self._row([(column, value) for column, value in entries if column is not None])
+
+    def _row(self, entries):
+        columns = [column for column, _ in entries]
+        values = np.asarray([value for _, value in entries], dtype=np.float32)
+        return sparse.csr_matrix((values, ([0] * len(columns), columns)), shape=(1, self.years.shape[1]))
+
+    def score_listing(self, listing_id):
+        """Score of every musician (in musician_user_ids order) for one listing."""
+        row = self.listing_row[listing_id]
+        return self.score_listing_vector(self.listings[row], int(self.listing_years[row]))
+
+    def score_listing_vector(self, listing, years_required):
+        return np.asarray((self.fit_for(years_required) @ listing.T).todense()).ravel()
+
+    def score_musician(self, user_id):
+        """Score of every listing (in listing_ids order) for one musician."""
+        return self.score_musician_vector(self.years[self.musician_row[user_id]])
+
+    def score_musician_vector(self, years):
+        scores = np.zeros(len(self.listing_ids), dtype=np.float32)
+        # Not self.levels: fit_for may add a level from another request thread
+        for years_required in np.unique(self.listing_years):
+            at_level = np.flatnonzero(self.listing_years == years_required)
+            fit = self._fit(years, years_required)
+            scores[at_level] = (self.listings[at_level] @ fit.T).toarray().ravel()
+        return scores
+
+    def recommended_applicants(self, listing_id, limit):
+        if listing_id not in self.listing_row:
+            return []
+        return top_matches(self.score_listing(listing_id), self.musician_user_ids, limit)
+
+    def recommended_gigs(self, user_id, limit):
+        if user_id not in self.musician_row:
+            return []
+        return top_matches(self.score_musician(user_id), self.listing_ids, limit)
+
+def top_matches(scores, ids, limit):
+    """The `limit` best (id, score) pairs with a score above zero, best first."""
+    candidates = np.flatnonzero(scores > 0)
+    if len(candidates) > limit:
+        candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+    candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(ids[row], float(scores[row])) for row in candidates]
+
+def build_match_index():
+    """Load every musician (one row per user, like discover) and listing into a MatchIndex."""
+    instrument_column = {instrument_id: column for column, instrument_id in enumerate(Instrument.objects.order_by('id').values_list('id', flat=True))}
+    genre_column = {genre_id: column for column, genre_id in enumerate(Genre.objects.order_by('id').values_list('id', flat=True))}
+
+    musician_user_ids = list(Musician.objects.order_by('user_id').values_list('user_id', flat=True).distinct())
+    musician_row = {user_id: row for row, user_id in enumerate(musician_user_ids)}
+    # A user with several musician profiles keeps their longest experience per instrument
+    years = {}
+    for user_id, instrument_id, years_played in MusicianInstrument.objects.values_list('musician__user_id', 'instrument_id', 'years_played').iterator():
+        key = (musician_row[user_id], instrument_column[instrument_id])
+        years[key] = max(years.get(key, 0), years_played)
+    musician_genres = set(
+        (musician_row[user_id], genre_column[genre_id])
+        for user_id, genre_id in Musician.genres.through.objects.values_list('musician__user_id', 'genre_id').iterator()
+    )
+
+    listings = list(JobListing.objects.order_by('id').values_list('id', 'experience_level'))
+    listing_row = {listing_id: row for row, (listing_id, _) in enumerate(listings)}
+    listing_instruments = [
+        (listing_row[listing_id], instrument_column[instrument_id])
+        for listing_id, instrument_id in JobListing.instruments.through.objects.values_list('joblisting_id', 'instrument_id').iterator()
+    ]
+    listing_genres = [
+        (listing_row[listing_id], genre_column[genre_id])
+        for listing_id, genre_id in JobListing.genres.through.objects.values_list('joblisting_id', 'genre_id').iterator()
+    ]
+
+    return MatchIndex.from_entries(
+        musician_user_ids,
+        _columns([(row, column, years_played) for (row, column), years_played in years.items()], 3),
+        _columns(musician_genres, 2),
+        [listing_id for listing_id, _ in listings],
+        _columns(listing_instruments, 2),
+        _columns(listing_genres, 2),
+        [EXPERIENCE_LEVEL_YEARS.get(level, 0) for _, level in listings],
+        len(instrument_column),
+        len(genre_column),
+        instrument_ids=list(instrument_column),
+        genre_ids=list(genre_column),
+    )
+
+def _columns(entries, width):
+    entries = list(entries)
+    if not entries:
+        return tuple(np.zeros(0, dtype=np.int64) for _ in range(width))
+    return tuple(np.asarray(column) for column in zip(*entries))
+
+def recommended_applicants(listing, limit):
+    """Best musicians for a JobListing as (user id, score) pairs, even if it's newer than the index."""
+    index = get_match_index()
+    if listing.id in index.listing_row:
+        scores = index.score_listing(listing.id)
+    else:
+        vector = index.listing_vector(listing.instruments.values_list('id', flat=True), listing.genres.values_list('id', flat=True))
+        scores = index.score_listing_vector(vector, EXPERIENCE_LEVEL_YEARS.get(listing.experience_level, 0))
+    return top_matches(scores, index.musician_user_ids, limit)
+
+def recommended_gigs(user, limit):
+    """Best listings for a musician user as (listing id, score) pairs, even if they're newer than the index."""
+    index = get_match_index()
+    if user.id in index.musician_row:
+        scores = index.score_musician(user.id)
+    else:
+        years = {}
+        for instrument_id, years_played in MusicianInstrument.objects.filter(musician__user=user).values_list('instrument_id', 'years_played'):
+            years[instrument_id] = max(years.get(instrument_id, 0), years_played)
+        genre_ids = Musician.genres.through.objects.filter(musician__user=user).values_list('genre_id', flat=True).distinct()
+        scores = index.score_musician_vector(index.musician_vector(years, genre_ids))
+    return top_matches(scores, index.listing_ids, limit)
+
+# The process's index and when it was built, swapped as one tuple so readers never see half
+# of a rebuild. _build_lock is only held while building: one caller rebuilds a stale index
+# while the rest keep scoring against the old one (only the very first build is waited on).
+_index_state = (None, 0.0)
+_build_lock = threading.Lock()
+
+def get_match_index():
+    """The process's MatchIndex, rebuilt once it is older than MATCH_INDEX_TTL seconds."""
+    global _index_state
+    index, built_at = _index_state
+    if index is not None and time.monotonic() - built_at <= settings.MATCH_INDEX_TTL:
+        return index
+
+    if not _build_lock.acquire(blocking=index is None):
+        return index
+    try:
+        # Another caller may have finished a rebuild while this one waited
+        if _index_state[0] is index:
+            _index_state = (build_match_index(), time.monotonic())
+        return _index_state[0]
+    finally:
+        _build_lock.release()
+
+def clear_match_index():
+    global _index_state
+    _index_state = (None, 0.0)
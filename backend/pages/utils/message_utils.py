@@ -0,0 +1,90 @@
+import html
+import uuid
+from django.contrib.postgres.search import SearchHeadline, SearchQuery
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from pages.models import Message
+from pages.models.Message import SEARCH_CONFIG
+from pages.serializers import MessageSerializer
+
+# Most messages returned by one sync call; clients call again while has_more is true
+SYNC_PAGE_SIZE = 100
+
+# Partial-word (substring) matching only kicks in once the query has a whole trigram to
+# look up; shorter queries are full-text only, so they never fall back to a table scan
+MIN_PARTIAL_MATCH_LENGTH = 3
+MAX_SEARCH_LENGTH = 100
+# Characters of context kept either side of a partial-word match in its snippet
+SNIPPET_RADIUS = 60
+# Private-use markers that ts_headline wraps matches in; swapped for <mark> after escaping
+MATCH_START, MATCH_STOP = "\ue000", "\ue001"
+
+def pair_key_for(user_id, other_user_id):
+    """Message.pair_key of the conversation between two users, whichever of them sent the message."""
+    return ":".join(sorted((str(user_id), str(other_user_id))))
+
+def parse_sync_position(created_at, message_id):
+    """(created_at, id) of the last message a client has, or None if either part is malformed."""
+    try:
+        timestamp = parse_datetime(created_at or "")
+        message_id = uuid.UUID(str(message_id))
+    except ValueError:
+        return None
+    if timestamp is None:
+        return None
+    return timestamp, message_id
+
+def messages_since(user, position, limit=None):
+    """
+    Messages to or from `user`, across all conversations, that come after the
+    (created_at, id) position, oldest first. Returns (messages, has_more).
+    """
+    limit = limit or SYNC_PAGE_SIZE
+    created_at, message_id = position
+    # created_at__gte repeats the bound outside the OR so both (sender|receiver, created_at, id)
+    # indexes can start their scans at the position instead of filtering the whole history
+    messages = Message.objects.filter(Q(sender=user) | Q(receiver=user)).filter(created_at__gte=created_at).filter(
+        Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=message_id)
+    ).order_by('created_at', 'id')
+    messages = MessageSerializer.setup_eager_loading(messages, user)
+
+    page = list(messages[:limit + 1])
+    return page[:limit], len(page) > limit
+
+def search_messages(user, text, partner_id=None):
+    """
+    Messages to or from `user` (optionally only with partner_id) whose text matches
+    `text`, either as full-text search terms (stemmed, websearch syntax) or as a
+    case-insensitive substring. Each message gets a `headline` annotation for snippet().
+    """
+    query = SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    matches = Q(search_vector=query)
+    if len(text) >= MIN_PARTIAL_MATCH_LENGTH:
+        matches |= Q(message__icontains=text)
+
+    messages = Message.objects.filter(Q(sender=user) | Q(receiver=user)).filter(matches)
+    if partner_id is not None:
+        messages = messages.filter(pair_key=pair_key_for(user.id, partner_id))
+
+    # Only computed for the rows of the page being returned
+    return messages.annotate(headline=SearchHeadline(
+        'message', query, config=SEARCH_CONFIG,
+        start_sel=MATCH_START, stop_sel=MATCH_STOP, min_words=10, max_words=25,
+    ))
+
+def snippet(message, text):
+    """HTML-escaped excerpt of a search result with the matched words wrapped in <mark>."""
+    headline = message.headline
+    if MATCH_START not in headline:
+        # A substring match: ts_headline only marks whole (stemmed) words
+        start = message.message.lower().find(text.lower())
+        if start != -1:
+            end = start + len(text)
+            headline = (
+                ("..." if start > SNIPPET_RADIUS else "")
+                + message.message[max(start - SNIPPET_RADIUS, 0):start]
+                + MATCH_START + message.message[start:end] + MATCH_STOP
+                + message.message[end:end + SNIPPET_RADIUS]
+                + ("..." if end + SNIPPET_RADIUS < len(message.message) else "")
+            )
+    return html.escape(headline).replace(MATCH_START, "<mark>").replace(MATCH_STOP, "</mark>")
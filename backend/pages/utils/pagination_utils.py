@@ -0,0 +1,100 @@
+import base64
+import binascii
+import datetime
+import json
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    PageNumberPagination with an opt-in keyset (cursor) mode.
+
+    Clients that send ?cursor= (empty for the first page) get pages keyed on
+    `keyset_ordering`, e.g. (created_at, id): no COUNT(*) and no OFFSET scan, so
+    page 500 costs the same as page 1. Requests without a cursor keep the
+    existing page-number behaviour, unless the view sets `keyset_only` (for
+    querysets too expensive to COUNT). Views pick their key columns by setting
+    `keyset_ordering`; every field must be readable as an attribute of the
+    returned objects (a model field or an annotation) and the last one must be unique.
+    """
+    cursor_query_param = 'cursor'
+    keyset_ordering = ('-created_at', '-id')
+    keyset_only = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.keyset_only or self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param, ""))
+
+        queryset = queryset.order_by(*self.keyset_ordering)
+        if position is not None:
+            try:
+                # Each field converts its value here (dates, UUIDs, numbers), so a well-formed
+                # cursor carrying values of the wrong kind fails before any query runs
+                queryset = queryset.filter(self.keyset_filter(position))
+            except (ValidationError, ValueError, TypeError):
+                raise NotFound("Invalid cursor")
+
+        results = list(queryset[:page_size + 1])
+        self.has_next = len(results) > page_size
+        self.page = results[:page_size]
+        self.next_position = self.position_of(self.page[-1]) if self.has_next else None
+        return self.page
+
+    def get_paginated_response(self, data):
+        if not getattr(self, 'cursor_mode', False):
+            return super().get_paginated_response(data)
+
+        return Response({
+            'next': self.get_next_cursor_link(),
+            'previous': None,
+            'next_cursor': self.encode_cursor(self.next_position) if self.has_next else None,
+            'results': data,
+        })
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def keyset_filter(self, position):
+        # (a, b) after (va, vb) == a > va OR (a = va AND b > vb), per column direction
+        condition = Q()
+        equal_so_far = Q()
+        for ordering, value in zip(self.keyset_ordering, position):
+            field = ordering.lstrip('-')
+            lookup = 'lt' if ordering.startswith('-') else 'gt'
+            condition |= equal_so_far & Q(**{f"{field}__{lookup}": value})
+            equal_so_far &= Q(**{field: value})
+        return condition
+
+    def position_of(self, obj):
+        position = []
+        for ordering in self.keyset_ordering:
+            value = getattr(obj, ordering.lstrip('-'))
+            position.append(value.isoformat() if isinstance(value, datetime.datetime) else str(value))
+        return position
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            raise NotFound("Invalid cursor")
+        if not isinstance(position, list) or len(position) != len(self.keyset_ordering):
+            raise NotFound("Invalid cursor")
+        return position
@@ -0,0 +1,122 @@
+import asyncio
+import datetime
+import logging
+import time
+import redis
+import redis.asyncio
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Online status and last-seen times, kept in the Redis instance the channel layer uses.
+# Every open socket is a member of its user's presence:<id> sorted set, scored with the
+# time its heartbeat lapses, so a user is online while any member's score is in the
+# future and a process that dies without running disconnect() drops out after one TTL.
+# Closing a socket stamps presence_last_seen:<id>. Looking up any number of users is a
+# single pipelined round trip, and Redis errors degrade to "offline" instead of failing.
+
+MAX_LOOKUP_IDS = 200
+
+def presence_key(user_id):
+    return f"presence:{user_id}"
+
+def last_seen_key(user_id):
+    return f"presence_last_seen:{user_id}"
+
+def redis_url():
+    """The first channel-layer host as a redis:// URL, or None if the layer isn't Redis-backed."""
+    hosts = settings.CHANNEL_LAYERS["default"].get("CONFIG", {}).get("hosts")
+    if not hosts:
+        return None
+    host = hosts[0]
+    if isinstance(host, str):
+        return host
+    if isinstance(host, dict):
+        return host["address"]
+    return "redis://%s:%s/0" % tuple(host)
+
+def client_options():
+    return {"socket_connect_timeout": 1, "socket_timeout": 1, "decode_responses": True}
+
+_client = None
+
+def get_client():
+    global _client
+    if _client is None and redis_url() is not None:
+        _client = redis.Redis.from_url(redis_url(), **client_options())
+    return _client
+
+_async_client = None
+_async_client_loop = None
+
+def get_async_client():
+    # redis.asyncio connections belong to the loop that opened them
+    global _async_client, _async_client_loop
+    if redis_url() is None:
+        return None
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = redis.asyncio.Redis.from_url(redis_url(), **client_options())
+        _async_client_loop = loop
+    return _async_client
+
+async def touch(user_id, connection_id):
+    """Mark a socket as alive for another TTL; called on connect and on every heartbeat."""
+    client = get_async_client()
+    if client is None:
+        return
+    now = time.time()
+    key = presence_key(user_id)
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zadd(key, {connection_id: now + settings.CHAT_PRESENCE_TTL})
+            pipe.zremrangebyscore(key, "-inf", now)
+            pipe.expire(key, settings.CHAT_PRESENCE_TTL)
+            await pipe.execute()
+    except redis.RedisError:
+        logger.warning("Could not update presence for user %s", user_id, exc_info=True)
+
+async def leave(user_id, connection_id):
+    client = get_async_client()
+    if client is None:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.zrem(presence_key(user_id), connection_id)
+            pipe.set(last_seen_key(user_id), time.time())
+            await pipe.execute()
+    except redis.RedisError:
+        logger.warning("Could not record last seen for user %s", user_id, exc_info=True)
+
+def get_presence(user_ids):
+    """{str(user_id): {"is_online": bool, "last_seen": datetime or None}} in one pipelined call."""
+    user_ids = [str(user_id) for user_id in dict.fromkeys(user_ids)]
+    presence = {user_id: {"is_online": False, "last_seen": None} for user_id in user_ids}
+    client = get_client()
+    if not user_ids or client is None:
+        return presence
+
+    now = time.time()
+    try:
+        with client.pipeline(transaction=False) as pipe:
+            for user_id in user_ids:
+                pipe.zcount(presence_key(user_id), now, "+inf")
+                pipe.get(last_seen_key(user_id))
+            results = pipe.execute()
+    except redis.RedisError:
+        logger.warning("Could not look up presence", exc_info=True)
+        return presence
+
+    for index, user_id in enumerate(user_ids):
+        online_count, last_seen = results[2 * index], results[2 * index + 1]
+        presence[user_id]["is_online"] = online_count > 0
+        if last_seen is not None:
+            presence[user_id]["last_seen"] = datetime.datetime.fromtimestamp(float(last_seen), tz=datetime.timezone.utc)
+    return presence
+
+def add_presence(serialized_users):
+    """Add is_online/last_seen to serialized users (dicts with an "id") with a single lookup."""
+    presence = get_presence(user["id"] for user in serialized_users)
+    for user in serialized_users:
+        user.update(presence[str(user["id"])])
+    return serialized_users
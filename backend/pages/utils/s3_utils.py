@@ -1,15 +1,52 @@
 import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+import logging
+import time
+import threading
 import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+PRESIGNED_URL_EXPIRY = 3600
+# Cached URLs are only reused while they still have at least this long to live
+PRESIGNED_URL_MIN_TTL = 900
+
+# Building a boto3 client loads endpoint/model JSON and resolves credentials, so the
+# whole process shares one (boto3 clients are thread-safe once created). Its AWS_S3_*
+# settings are read when it is built, so reset_s3_client() picks up changed settings.
+_s3_client = None
+_s3_client_lock = threading.Lock()
 
 def get_s3_client():
-    s3_client = boto3.client(
-        "s3",
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_REGION,
-    )
-    return s3_client
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                _s3_client = boto3.client(
+                    "s3",
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_REGION,
+                    config=Config(
+                        max_pool_connections=getattr(settings, "AWS_S3_MAX_POOL_CONNECTIONS", 50),
+                        retries={
+                            "mode": getattr(settings, "AWS_S3_RETRY_MODE", "standard"),
+                            "max_attempts": getattr(settings, "AWS_S3_MAX_ATTEMPTS", 3),
+                        },
+                    ),
+                )
+    return _s3_client
+
+def reset_s3_client():
+    """Drop the shared client so the next call builds a new one (tests, credential rotation)."""
+    global _s3_client
+    with _s3_client_lock:
+        _s3_client = None
 
 def get_bucket_name(file_type):
     if file_type.startswith('image/'):
@@ -41,9 +78,209 @@ def upload_to_s3(file_obj, user_id):
     )
     return object_key
 
+# Direct-to-S3 uploads: the client POSTs the bytes to S3 using a signed policy,
+# so media never passes through the app servers.
+PRESIGNED_POST_EXPIRY = 900
+# MIME prefix -> (setting, default) of the largest upload allowed, read per request
+MAX_UPLOAD_SIZE_SETTINGS = {
+    'image/': ("AWS_MAX_IMAGE_UPLOAD_SIZE", 20 * 1024 * 1024),
+    'video/': ("AWS_MAX_VIDEO_UPLOAD_SIZE", 1024 * 1024 * 1024),
+}
+
+def get_max_upload_size(file_type):
+    for prefix, (setting, default) in MAX_UPLOAD_SIZE_SETTINGS.items():
+        if file_type.startswith(prefix):
+            return getattr(settings, setting, default)
+    raise ValueError("Only image and video files are allowed.")
+
+def generate_presigned_post(file_name, file_type, file_size, user_id):
+    max_size = get_max_upload_size(file_type)
+    if not isinstance(file_size, int) or file_size <= 0 or file_size > max_size:
+        raise ValueError(f"File size must be between 1 and {max_size} bytes.")
+
+    bucket_name = get_bucket_name(file_type)
+    file_extension = file_name.split('.')[-1]
+    object_key = f"user_{user_id}/{uuid.uuid4()}.{file_extension}"
+
+    presigned_post = get_s3_client().generate_presigned_post(
+        Bucket=bucket_name,
+        Key=object_key,
+        Fields={"Content-Type": file_type},
+        Conditions=[
+            {"Content-Type": file_type},
+            ["content-length-range", file_size, file_size],
+        ],
+        ExpiresIn=PRESIGNED_POST_EXPIRY,
+    )
+    return {"file_key": object_key, "file_type": file_type, "url": presigned_post["url"], "fields": presigned_post["fields"]}
+
+def s3_object_exists(file_key, file_type):
+    try:
+        get_s3_client().head_object(Bucket=get_bucket_name(file_type), Key=file_key)
+        return True
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+class InMemoryURLCache:
+    """Per-process LRU of (bucket, key) -> (url, expires_at)."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, bucket_name, file_key):
+        with self._lock:
+            entry = self._entries.get((bucket_name, file_key))
+            if entry is not None:
+                self._entries.move_to_end((bucket_name, file_key))
+            return entry
+
+    def set(self, bucket_name, file_key, url, expires_at):
+        with self._lock:
+            self._entries[(bucket_name, file_key)] = (url, expires_at)
+            self._entries.move_to_end((bucket_name, file_key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class DjangoURLCache:
+    """Shares presigned URLs across processes through a Django cache (e.g. Redis)."""
+
+    def __init__(self, alias="default"):
+        self.alias = alias
+
+    def _key(self, bucket_name, file_key):
+        return f"s3_presigned_url:{bucket_name}:{file_key}"
+
+    def get(self, bucket_name, file_key):
+        return caches[self.alias].get(self._key(bucket_name, file_key))
+
+    def set(self, bucket_name, file_key, url, expires_at):
+        timeout = int(expires_at - time.time() - PRESIGNED_URL_MIN_TTL)
+        if timeout > 0:
+            caches[self.alias].set(self._key(bucket_name, file_key), (url, expires_at), timeout=timeout)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+class PresignedURLCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        # Guards the counters; += on an attribute isn't atomic across request threads
+        self._lock = threading.Lock()
+
+    def get_or_sign(self, bucket_name, file_key, sign):
+        entry = self.backend.get(bucket_name, file_key)
+        if entry is not None and entry[1] - time.time() >= PRESIGNED_URL_MIN_TTL:
+            with self._lock:
+                self.hits += 1
+            return entry[0]
+
+        with self._lock:
+            self.misses += 1
+        expires_at = time.time() + PRESIGNED_URL_EXPIRY
+        url = sign()
+        self.backend.set(bucket_name, file_key, url, expires_at)
+        return url
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        self.backend.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+def build_presigned_url_cache():
+    backend = getattr(settings, "AWS_PRESIGNED_URL_CACHE_BACKEND", "memory")
+    if backend == "django":
+        return PresignedURLCache(DjangoURLCache(getattr(settings, "AWS_PRESIGNED_URL_CACHE_ALIAS", "default")))
+    return PresignedURLCache(InMemoryURLCache(getattr(settings, "AWS_PRESIGNED_URL_CACHE_SIZE", 10000)))
+
+# Built on first use, like the S3 client, so importing this module doesn't read the cache settings
+_presigned_url_cache = None
+_presigned_url_cache_lock = threading.Lock()
+
+def get_presigned_url_cache():
+    global _presigned_url_cache
+    if _presigned_url_cache is None:
+        with _presigned_url_cache_lock:
+            if _presigned_url_cache is None:
+                _presigned_url_cache = build_presigned_url_cache()
+    return _presigned_url_cache
+
+# Bounded pool shared by all requests so one request's uploads run concurrently
+# without a burst of large posts opening unbounded threads/connections.
+# AWS_S3_UPLOAD_WORKERS is read when the pool is created (see reset_upload_executor).
+_upload_executor = None
+_upload_executor_lock = threading.Lock()
+
+def get_upload_executor():
+    global _upload_executor
+    if _upload_executor is None:
+        with _upload_executor_lock:
+            if _upload_executor is None:
+                _upload_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "AWS_S3_UPLOAD_WORKERS", 8),
+                    thread_name_prefix="s3-upload",
+                )
+    return _upload_executor
+
+def reset_upload_executor():
+    """Drop the shared upload pool so the next upload creates one from current settings (tests)."""
+    global _upload_executor
+    with _upload_executor_lock:
+        executor, _upload_executor = _upload_executor, None
+    if executor is not None:
+        # Uploads already submitted still finish
+        executor.shutdown(wait=False)
+
+def delete_from_s3(file_key, file_type):
+    get_s3_client().delete_object(Bucket=get_bucket_name(file_type), Key=file_key)
+
+def upload_files_to_s3(files, user_id):
+    """
+    Upload several files concurrently and return their keys in input order.
+    If any upload fails, the ones that succeeded are deleted and the first error is re-raised.
+    """
+    if len(files) <= 1:
+        return [upload_to_s3(file_obj, user_id) for file_obj in files]
+
+    futures = [get_upload_executor().submit(upload_to_s3, file_obj, user_id) for file_obj in files]
+
+    uploaded = []
+    error = None
+    for file_obj, future in zip(files, futures):
+        try:
+            uploaded.append((future.result(), file_obj.content_type))
+        except Exception as e:
+            error = error or e
+
+    if error is not None:
+        for file_key, file_type in uploaded:
+            try:
+                delete_from_s3(file_key, file_type)
+            except Exception:
+                logger.exception("Failed to clean up S3 object %s after a failed upload", file_key)
+        raise error
+
+    return [file_key for file_key, _ in uploaded]
+
 def generate_s3_url(file_key, file_type):
     bucket_name = get_bucket_name(file_type)
-    s3_client = get_s3_client()
 
-    s3_url = s3_client.generate_presigned_url("get_object", Params={"Bucket": bucket_name, "Key": file_key}, ExpiresIn=3600)
-    return s3_url
\ No newline at end of file
+    def sign():
+        s3_client = get_s3_client()
+        return s3_client.generate_presigned_url("get_object", Params={"Bucket": bucket_name, "Key": file_key}, ExpiresIn=PRESIGNED_URL_EXPIRY)
+
+    return get_presigned_url_cache().get_or_sign(bucket_name, file_key, sign)
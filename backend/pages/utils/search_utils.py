@@ -0,0 +1,20 @@
+from django.db.models import Case, IntegerField, Value, When
+
+# Username search shared by discover, likes and the conversation lists. The filter compiles
+# to UPPER(username) LIKE '%...%', which the pg_trgm GIN indexes on the username columns
+# answer for queries of three or more characters (one trigram). Shorter queries still
+# match anywhere in the name, they just aren't indexed.
+
+def search_usernames(queryset, text, field="username"):
+    """
+    Filter `queryset` to rows whose `field` contains `text` (case-insensitive) and annotate
+    `username_match_rank`: 0 for prefix matches, 1 for matches elsewhere in the name.
+    Callers order by it first so prefix matches come before the rest.
+    """
+    return queryset.filter(**{f"{field}__icontains": text}).annotate(
+        username_match_rank=Case(
+            When(**{f"{field}__istartswith": text}, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    )
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.db.models import Q
+from pages.models import User, Post, BlockedUser, ReportedPost, TimelineEntry
+
+BATCH_SIZE = 1000
+# Posts just past the window that trim_timelines() clears; anything older was cleared
+# by an earlier trim (or never added)
+TRIM_LOOKBEHIND = 100
+
+# Every home timeline is drawn from the newest settings.TIMELINE_MAX_ENTRIES posts, so a
+# timeline never holds more than that many entries: a new post only reaches the users who
+# can see it, new users and unblocks/unbans copy at most the window, and each fan-out
+# clears the entries of the posts it pushed out of the window.
+
+def recent_posts():
+    """The newest TIMELINE_MAX_ENTRIES posts, newest first: the window timelines are drawn from."""
+    return Post.objects.order_by('-created_at', '-id')[:settings.TIMELINE_MAX_ENTRIES]
+
+def visible_posts(user):
+    """Posts that belong on the user's home timeline."""
+    blocked_ids = BlockedUser.objects.filter(
+        Q(blocker=user) | Q(blocked=user)
+    ).values_list('blocker_id', 'blocked_id')
+    hidden_owner_ids = {uid for pair in blocked_ids for uid in pair} - {user.id}
+
+    return Post.objects.filter(is_banned=False) \
+        .exclude(owner=user) \
+        .exclude(owner_id__in=hidden_owner_ids) \
+        .exclude(hidden_users=user) \
+        .exclude(id__in=ReportedPost.objects.filter(user=user).values('post_id'))
+
+def timeline_recipients(post):
+    """Users whose home timeline should contain the post."""
+    if post.is_banned:
+        return User.objects.none()
+
+    return User.objects.exclude(id=post.owner_id) \
+        .exclude(blocking__blocked=post.owner_id) \
+        .exclude(blocked_by__blocker=post.owner_id) \
+        .exclude(id__in=post.hidden_users.values('id')) \
+        .exclude(id__in=ReportedPost.objects.filter(post=post, user__isnull=False).values('user_id'))
+
+def _bulk_insert(entries):
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+def fan_out_post(post, users=None):
+    """Write the post into the timeline of every eligible user (optionally limited to `users`)."""
+    if not Post.objects.filter(id=post.id, id__in=recent_posts().values('id')).exists():
+        # An old post (e.g. unbanned) is already outside every timeline's window
+        return
+    recipients = timeline_recipients(post)
+    if users is not None:
+        recipients = recipients.filter(id__in=users)
+
+    _bulk_insert(
+        TimelineEntry(user_id=user_id, post_id=post.id, created_at=post.created_at)
+        for user_id in recipients.values_list('id', flat=True).iterator(chunk_size=BATCH_SIZE)
+    )
+    trim_timelines()
+
+def add_posts_to_timeline(user, posts=None):
+    """Backfill eligible posts within the recent window (optionally limited to `posts`) into the user's timeline."""
+    eligible = visible_posts(user).filter(id__in=recent_posts().values('id'))
+    if posts is not None:
+        eligible = eligible.filter(id__in=posts)
+
+    _bulk_insert(
+        TimelineEntry(user_id=user.id, post_id=post_id, created_at=created_at)
+        for post_id, created_at in eligible.values_list('id', 'created_at').iterator(chunk_size=BATCH_SIZE)
+    )
+
+def trim_timelines():
+    """Drop the entries of posts that have fallen out of the recent window."""
+    window = settings.TIMELINE_MAX_ENTRIES
+    expired = Post.objects.order_by('-created_at', '-id').values('id')[window:window + TRIM_LOOKBEHIND]
+    TimelineEntry.objects.filter(post__in=expired).delete()
+
+def remove_post_from_timelines(post, users=None):
+    entries = TimelineEntry.objects.filter(post=post)
+    if users is not None:
+        entries = entries.filter(user__in=users)
+    entries.delete()
+
+def remove_owner_from_timeline(user, owner):
+    TimelineEntry.objects.filter(user=user, post__owner=owner).delete()
+
+def rebuild_timeline(user):
+    TimelineEntry.objects.filter(user=user).delete()
+    add_posts_to_timeline(user)
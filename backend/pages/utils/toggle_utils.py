@@ -0,0 +1,100 @@
+import uuid
+from django.db import connection
+from pages.models import User, Post, Like, Follower
+
+# Like/follow toggles as single INSERT ... ON CONFLICT DO NOTHING / DELETE ... RETURNING
+# statements. Each one checks the target exists, writes the row, and adjusts the
+# denormalized counters in one round trip, so double-clicks can't create duplicates or
+# skew the counts. Raw SQL bypasses the Like/Follower signals, which is why the counter
+# update is part of the statement. Every function returns (target_exists, changed).
+
+def _parse_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+def _execute(sql, params):
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        target_exists, changed = cursor.fetchone()
+    return target_exists, changed
+
+def like_post(user, post_id):
+    post_id = _parse_uuid(post_id)
+    if post_id is None:
+        return False, False
+
+    return _execute(f"""
+        WITH target AS (
+            SELECT id FROM {Post._meta.db_table} WHERE id = %(post)s
+        ), inserted AS (
+            INSERT INTO {Like._meta.db_table} (id, user_id, post_id, created_at)
+            SELECT %(id)s, %(user)s, id, NOW() FROM target
+            ON CONFLICT (user_id, post_id) DO NOTHING
+            RETURNING post_id
+        ), counted AS (
+            UPDATE {Post._meta.db_table} SET like_count = like_count + 1
+            WHERE id IN (SELECT post_id FROM inserted)
+        )
+        SELECT EXISTS (SELECT 1 FROM target), EXISTS (SELECT 1 FROM inserted)
+    """, {"id": uuid.uuid4(), "user": user.id, "post": post_id})
+
+def unlike_post(user, post_id):
+    post_id = _parse_uuid(post_id)
+    if post_id is None:
+        return False, False
+
+    return _execute(f"""
+        WITH deleted AS (
+            DELETE FROM {Like._meta.db_table} WHERE user_id = %(user)s AND post_id = %(post)s
+            RETURNING post_id
+        ), counted AS (
+            UPDATE {Post._meta.db_table} SET like_count = like_count - 1
+            WHERE id IN (SELECT post_id FROM deleted) AND like_count > 0
+        )
+        SELECT EXISTS (SELECT 1 FROM {Post._meta.db_table} WHERE id = %(post)s), EXISTS (SELECT 1 FROM deleted)
+    """, {"user": user.id, "post": post_id})
+
+# Both user rows are updated by one UPDATE whose `id IN (...)` index scan visits keys in
+# sorted order, so A following B while B follows A lock the rows in the same order.
+
+def follow_user(user, target_id):
+    target_id = _parse_uuid(target_id)
+    if target_id is None:
+        return False, False
+
+    return _execute(f"""
+        WITH target AS (
+            SELECT id FROM {User._meta.db_table} WHERE id = %(target)s
+        ), inserted AS (
+            INSERT INTO {Follower._meta.db_table} (id, follower_id, following_id, created_at)
+            SELECT %(id)s, %(user)s, id, NOW() FROM target
+            ON CONFLICT (follower_id, following_id) DO NOTHING
+            RETURNING following_id
+        ), counted AS (
+            UPDATE {User._meta.db_table} SET
+                follower_count = follower_count + CASE WHEN id = %(target)s THEN 1 ELSE 0 END,
+                following_count = following_count + CASE WHEN id = %(user)s THEN 1 ELSE 0 END
+            WHERE id IN (%(user)s, %(target)s) AND EXISTS (SELECT 1 FROM inserted)
+        )
+        SELECT EXISTS (SELECT 1 FROM target), EXISTS (SELECT 1 FROM inserted)
+    """, {"id": uuid.uuid4(), "user": user.id, "target": target_id})
+
+def unfollow_user(user, target_id):
+    target_id = _parse_uuid(target_id)
+    if target_id is None:
+        return False, False
+
+    return _execute(f"""
+        WITH deleted AS (
+            DELETE FROM {Follower._meta.db_table} WHERE follower_id = %(user)s AND following_id = %(target)s
+            RETURNING following_id
+        ), counted AS (
+            UPDATE {User._meta.db_table} SET
+                follower_count = GREATEST(follower_count - CASE WHEN id = %(target)s THEN 1 ELSE 0 END, 0),
+                following_count = GREATEST(following_count - CASE WHEN id = %(user)s THEN 1 ELSE 0 END, 0)
+            WHERE id IN (%(user)s, %(target)s) AND EXISTS (SELECT 1 FROM deleted)
+        )
+        SELECT EXISTS (SELECT 1 FROM {User._meta.db_table} WHERE id = %(target)s), EXISTS (SELECT 1 FROM deleted)
+    """, {"user": user.id, "target": target_id})
@@ -1,4 +1,3 @@
-import boto3
 from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from botocore.exceptions import NoCredentialsError
@@ -9,7 +8,7 @@ import textwrap
 from django.core.mail import send_mail
 from django.conf import settings
 from rest_framework.pagination import PageNumberPagination
-from pages.utils.s3_utils import upload_to_s3, generate_s3_url
+from pages.utils.s3_utils import upload_to_s3, generate_s3_url, get_s3_client
 from pages.models import JobListing, JobApplication, Experience
 from pages.serializers.application_serializers import JobApplicationSerializer
 from pages.serializers.experience_serializers import ExperienceSerializer
@@ -116,7 +115,7 @@ class AutofillResumeView(APIView):
         if not s3_file_key:
             return Response({'error': 'Missing s3_key'}, status=status.HTTP_400_BAD_REQUEST)
 
-        s3 = boto3.client('s3')
+        s3 = get_s3_client()
         try:
             with tempfile.NamedTemporaryFile(suffix=".pdf") as temp:
                 s3.download_fileobj(settings.AWS_METADATA_BUCKET_NAME, s3_file_key, temp)
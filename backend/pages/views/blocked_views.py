@@ -1,9 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from pages.models import User, BlockedUser, Follower
+from pages.models import User, BlockedUser, Follower, Post
+from pages.utils.timeline_utils import add_posts_to_timeline
 from rest_framework.pagination import PageNumberPagination
 from pages.serializers.user_serializers import UserSerializer
 
@@ -20,15 +21,16 @@ class BlockUserView(APIView):
         if request.user == target_user:
             return Response({"error": "Cannot block yourself."}, status=status.HTTP_400_BAD_REQUEST)
 
-        block, created = BlockedUser.objects.get_or_create(
-            blocker=request.user, blocked=target_user
-        )
-        
-        # Remove any mutual following relationships
-        Follower.objects.filter(
-            models.Q(follower=request.user, following=target_user) |
-            models.Q(follower=target_user, following=request.user)
-        ).delete()
+        with transaction.atomic():
+            block, created = BlockedUser.objects.get_or_create(
+                blocker=request.user, blocked=target_user
+            )
+
+            # Remove any mutual following relationships (follow counters are adjusted in the same transaction)
+            Follower.objects.filter(
+                models.Q(follower=request.user, following=target_user) |
+                models.Q(follower=target_user, following=request.user)
+            ).delete()
         
         if created:
             return Response({"message": "User blocked."}, status=status.HTTP_201_CREATED)
@@ -46,6 +48,11 @@ class BlockUserView(APIView):
         try:
             block = BlockedUser.objects.get(blocker=request.user, blocked=target_user)
             block.delete()
+
+            # Put each user's posts back on the other's home timeline
+            user = request.user
+            transaction.on_commit(lambda: add_posts_to_timeline(user, posts=Post.objects.filter(owner=target_user).values('id')))
+            transaction.on_commit(lambda: add_posts_to_timeline(target_user, posts=Post.objects.filter(owner=user).values('id')))
             return Response({"message": "User unblocked."}, status=status.HTTP_204_NO_CONTENT)
         except BlockedUser.DoesNotExist:
             return Response({"error": "Block relationship does not exist."}, status=status.HTTP_400_BAD_REQUEST)
@@ -1,13 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
-from pages.models import User, Musician, Instrument, Genre, MusicianInstrument, BlockedUser
-from pages.serializers import UserSerializer
+from pages.models import User, BlockedUser, MusicianSearchDocument
+from pages.serializers import UserSerializer, ProfileCardSerializer
+from pages.utils.search_utils import search_usernames
+from pages.utils.discover_utils import filter_documents, facet_cache_key, cached_facet_counts
 from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+import uuid
+
+# Most profile cards returned by one ProfileCardsView request (a few discover pages' worth)
+MAX_PROFILE_CARDS = 50
 
 class GetUsersView(APIView, PageNumberPagination):
     permission_classes = [IsAuthenticated]
@@ -17,33 +23,72 @@ class GetUsersView(APIView, PageNumberPagination):
         search_query = request.GET.get("search", "").strip()
         instrument_query = request.GET.getlist("instrument")
         genre_query = request.GET.getlist("genre")
-        
-        musicians = Musician.objects.all()
-
-        # Filtering by instruments
-        if instrument_query:
-            musicians = musicians.filter(
-                id__in=MusicianInstrument.objects.filter(instrument__instrument__in=instrument_query)
-                .values_list("musician_id", flat=True)
-            )
+        # ?match=all: musicians with every selected instrument/genre instead of any of them
+        match_all = request.GET.get("match") == "all"
+        home_studio_query = request.GET.get("home_studio")
+        home_studio = None if home_studio_query is None else home_studio_query.lower() == "true"
+        # ?facets=true: also count results per instrument, genre and home studio
+        include_facets = request.GET.get("facets", "").lower() == "true"
 
-        # Filtering by genres
-        if genre_query:
-            musicians = musicians.filter(genres__genre__in=genre_query)
+        # One table: the musicians' search documents (see MusicianSearchDocument)
+        blocked_by_others = BlockedUser.objects.filter(blocked=request.user).values('blocker_id')
+        documents = MusicianSearchDocument.objects.filter(user__role="musician").exclude(user_id=request.user.id).exclude(user_id__in=blocked_by_others)
+        documents = filter_documents(documents, instruments=instrument_query, genres=genre_query, match_all=match_all, home_studio=home_studio)
 
-        # Filtering by username
+        # Filtering by username, prefix matches first
         if search_query:
-            musicians = musicians.filter(user__username__icontains=search_query)
+            documents = search_usernames(documents, search_query).order_by('username_match_rank', 'username')
+        else:
+            documents = documents.order_by('username')
 
-        blocked_by_others = BlockedUser.objects.filter(blocked=request.user).values_list('blocker_id', flat=True)
-        discover_queryset = musicians.exclude(user__id__in=blocked_by_others)
-            
-        # Get distinct users associated with filtered musicians
-        users = User.objects.filter(id__in=discover_queryset.values("user_id"), role="musician").distinct().exclude(id=request.user.id)
-        paginated_users = self.paginate_queryset(users, request)
+        paginated_documents = self.paginate_queryset(documents.values_list('username', flat=True), request)
 
-        return self.get_paginated_response([user.username for user in paginated_users])
+        response = self.get_paginated_response(list(paginated_documents))
+        if include_facets:
+            cache_key = facet_cache_key(
+                request.user.id, search=search_query, instrument=instrument_query, genre=genre_query,
+                match_all=match_all, home_studio=home_studio,
+            )
+            response.data["facets"] = cached_facet_counts(documents, cache_key)
+        return response
     
+class ProfileCardsView(APIView):
+    """
+    Profile cards for ?ids=<id>,... and/or ?usernames=<name>,..., in the order asked for.
+    Replaces the per-result UserByUsernameView + MusicianDetailView + FollowingView calls
+    discover used to make; the whole batch costs the same handful of queries. Unknown users,
+    and users who blocked the caller, are left out.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user_ids = [user_id.strip() for user_id in request.GET.get("ids", "").split(",") if user_id.strip()]
+        usernames = [username.strip() for username in request.GET.get("usernames", "").split(",") if username.strip()]
+        if not user_ids and not usernames:
+            return Response({"error": "ids or usernames is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(user_ids) + len(usernames) > MAX_PROFILE_CARDS:
+            return Response({"error": f"At most {MAX_PROFILE_CARDS} profiles can be looked up at once"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            user_ids = [uuid.UUID(user_id) for user_id in user_ids]
+        except ValueError:
+            return Response({"error": "Invalid user id"}, status=status.HTTP_400_BAD_REQUEST)
+
+        blocked_by_others = BlockedUser.objects.filter(blocked=request.user).values('blocker_id')
+        users = User.objects.filter(Q(id__in=user_ids) | Q(username__in=usernames)).exclude(id__in=blocked_by_others)
+        users = ProfileCardSerializer.setup_eager_loading(users, request.user)
+
+        cards = {}
+        for card in ProfileCardSerializer(users, many=True, context={'auth_user': request.user}).data:
+            cards[card["id"]] = cards[card["username"]] = card
+
+        ordered, seen = [], set()
+        for key in [str(user_id) for user_id in user_ids] + usernames:
+            card = cards.get(key)
+            if card is not None and card["id"] not in seen:
+                seen.add(card["id"])
+                ordered.append(card)
+        return Response(ordered, status=status.HTTP_200_OK)
+
 class UserByUsernameView(APIView):
     def get(self, request, *args, **kwargs):
         username = kwargs.get('username')
@@ -1,10 +1,13 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from pages.utils.pagination_utils import KeysetPagination
+from pages.utils.toggle_utils import follow_user, unfollow_user
+from pages.utils.presence_utils import add_presence
 from pages.serializers import FollowCountSerializer, UserSerializer
 from pages.models import User, Musician, Follower, BlockedUser
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import F
 
 
 class FollowingView(APIView):
@@ -19,10 +22,12 @@ class FollowingView(APIView):
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
         
-class FollowPagination(PageNumberPagination):
+class FollowPagination(KeysetPagination):
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 50
+    # Newest follows first: the Follower row's created_at and id, annotated onto each user
+    keyset_ordering = ('-followed_at', '-follow_id')
 
 class FollowListView(APIView, FollowPagination):
     permission_classes = [IsAuthenticated]
@@ -35,17 +40,19 @@ class FollowListView(APIView, FollowPagination):
             page = request.GET.get("page", 1)
             
             if follow_type == "followers":
-                follow_queryset = User.objects.filter(following__following=user)
+                follow_queryset = User.objects.filter(following__following=user) \
+                    .annotate(followed_at=F("following__created_at"), follow_id=F("following__id"))
             else:
-                follow_queryset = User.objects.filter(followers__follower=user)
+                follow_queryset = User.objects.filter(followers__follower=user) \
+                    .annotate(followed_at=F("followers__created_at"), follow_id=F("followers__id"))
             
             blocked_by_others = BlockedUser.objects.filter(blocked=request.user).values_list('blocker_id', flat=True)
-            follow_queryset = follow_queryset.exclude(id__in=blocked_by_others)
+            follow_queryset = follow_queryset.exclude(id__in=blocked_by_others).order_by(*self.keyset_ordering)
                 
             paginated_followers = self.paginate_queryset(follow_queryset, request, view=self)
             serializer = UserSerializer(paginated_followers, many=True, context={'request': request, 'auth_user': request.user})
 
-            return self.get_paginated_response(serializer.data)
+            return self.get_paginated_response(add_presence(serializer.data))
         
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
@@ -54,33 +61,23 @@ class FollowToggleView(APIView):
     permission_classes = [IsAuthenticated]
 
     def post(self, request, user_id):
-        try:
-            target_user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
-            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        if request.user == target_user:
+        if request.user.id == user_id:
             return Response({"error": "You cannot follow yourself"}, status=status.HTTP_400_BAD_REQUEST)
 
-        follow_exists = Follower.objects.filter(follower=request.user, following=target_user).exists()
-        if follow_exists:
+        target_exists, followed = follow_user(request.user, user_id)
+        if not target_exists:
+            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+        if not followed:
             return Response({"message": "Already following"}, status=status.HTTP_200_OK)
-
-        Follower.objects.create(follower=request.user, following=target_user)
         return Response({"message": "Followed"}, status=status.HTTP_201_CREATED)
 
     def delete(self, request, user_id):
-        try:
-            target_user = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        target_exists, unfollowed = unfollow_user(request.user, user_id)
+        if not target_exists:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        try:
-            follow = Follower.objects.get(follower=request.user, following=target_user)
-            follow.delete()
-            return Response({"message": "Unfollowed"}, status=status.HTTP_204_NO_CONTENT)
-        except Follower.DoesNotExist:
+        if not unfollowed:
             return Response({"error": "You are not following this user"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"message": "Unfollowed"}, status=status.HTTP_204_NO_CONTENT)
         
 class IsFollowingView(APIView):
     permission_classes = [IsAuthenticated]
@@ -4,9 +4,23 @@ from rest_framework.response import Response
 from rest_framework import status
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.pagination import PageNumberPagination
+from pages.utils.pagination_utils import KeysetPagination
 from pages.serializers.listing_serializers import JobListingSerializer
-from pages.models import User, Business, JobListing, Instrument, Genre
-from pages.serializers.user_serializers import UserSerializer
+from pages.models import User, Business, JobListing, Instrument, Genre, Musician, BlockedUser
+from pages.serializers.user_serializers import UserSerializer, ProfileCardSerializer
+from pages.utils.match_utils import recommended_gigs, recommended_applicants
+
+# Default and largest number of matches the recommendation views return
+RECOMMENDATION_LIMIT = 10
+MAX_RECOMMENDATION_LIMIT = 50
+
+def recommendation_limit(request):
+    """?limit= clamped to MAX_RECOMMENDATION_LIMIT, or None if it isn't a positive number."""
+    try:
+        limit = int(request.GET.get("limit", RECOMMENDATION_LIMIT))
+    except ValueError:
+        return None
+    return min(limit, MAX_RECOMMENDATION_LIMIT) if limit > 0 else None
 
 class CreateJobListingView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -83,7 +97,7 @@ class GetJobListingsView(APIView, PageNumberPagination):
         serialized_jobs = JobListingSerializer(paginated_jobs, many=True).data
         return self.get_paginated_response(serialized_jobs)
 
-class GetAllJobListingsView(APIView, PageNumberPagination):
+class GetAllJobListingsView(APIView, KeysetPagination):
     authentication_classes = [JWTAuthentication]
     page_size = 6
 
@@ -120,4 +134,55 @@ class GetUserFromBusinessView(APIView):
         except Business.DoesNotExist:
             return Response({"error": "Business not found"}, status=status.HTTP_404_NOT_FOUND)
         
-        return Response(serialize_user.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serialize_user.data, status=status.HTTP_200_OK)
+
+class RecommendedGigsView(APIView):
+    """The job listings that best match the caller's instruments, experience and genres."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        limit = recommendation_limit(request)
+        if limit is None:
+            return Response({"error": "limit must be a positive number"}, status=status.HTTP_400_BAD_REQUEST)
+        if not Musician.objects.filter(user=request.user).exists():
+            return Response({"error": "Musician profile not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        matches = recommended_gigs(request.user, limit)
+        listings = JobListing.objects.filter(id__in=[listing_id for listing_id, _ in matches]) \
+            .select_related('business').prefetch_related('instruments', 'genres').in_bulk()
+
+        results = []
+        for listing_id, score in matches:
+            if listing_id in listings:
+                results.append({**JobListingSerializer(listings[listing_id]).data, "match_score": round(score, 4)})
+        return Response(results, status=status.HTTP_200_OK)
+
+class RecommendedApplicantsView(APIView):
+    """The musicians who best match one of the caller's job listings, as profile cards."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, listing_id):
+        limit = recommendation_limit(request)
+        if limit is None:
+            return Response({"error": "limit must be a positive number"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            listing = JobListing.objects.select_related('business').get(id=listing_id)
+        except JobListing.DoesNotExist:
+            return Response({"error": "Job listing not found"}, status=status.HTTP_404_NOT_FOUND)
+        if listing.business.user_id != request.user.id:
+            return Response({"error": "Only the listing's business can see recommended applicants"}, status=status.HTTP_403_FORBIDDEN)
+
+        matches = recommended_applicants(listing, limit)
+        blocked_by_others = BlockedUser.objects.filter(blocked=request.user).values('blocker_id')
+        users = User.objects.filter(id__in=[user_id for user_id, _ in matches]).exclude(id__in=blocked_by_others)
+        users = ProfileCardSerializer.setup_eager_loading(users, request.user)
+        cards = {card["id"]: card for card in ProfileCardSerializer(users, many=True, context={'auth_user': request.user}).data}
+
+        results = []
+        for user_id, score in matches:
+            card = cards.get(str(user_id))
+            if card is not None:
+                results.append({**card, "match_score": round(score, 4)})
+        return Response(results, status=status.HTTP_200_OK)
@@ -2,13 +2,21 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from pages.serializers import MessageSerializer, UserSerializer
-from pages.utils.s3_utils import upload_to_s3
+from pages.utils.s3_utils import upload_files_to_s3
+from pages.utils.conversation_utils import record_message, mark_read, total_unread
+from pages.utils.message_utils import messages_since, parse_sync_position, pair_key_for, search_messages, snippet, MAX_SEARCH_LENGTH
+from pages.utils.search_utils import search_usernames
+from pages.utils.presence_utils import get_presence, add_presence, MAX_LOOKUP_IDS
 from pages.forms import MessageForm
-from pages.models import Message, User, BlockedUser, Follower
+from pages.models import Message, User, BlockedUser, Follower, Conversation
 from rest_framework.pagination import PageNumberPagination
+from pages.utils.pagination_utils import KeysetPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.db.models import Exists, OuterRef, Q
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
 
 class CreateMessageView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -19,17 +27,20 @@ class CreateMessageView(APIView):
             form = MessageForm(request.data, request.FILES)
             
             if form.is_valid():
-                file_keys = []
-                file_types = []
-                for file in form.cleaned_data['files']:
-                    file_keys.append(upload_to_s3(file, request.user.id))
-                    file_types.append(file.content_type)
+                files = form.cleaned_data['files']
+                file_keys = upload_files_to_s3(files, request.user.id)
+                file_types = [file.content_type for file in files]
                 message = form.save(commit=False)
                 message.owner = request.user
                 message.file_keys = file_keys
                 message.file_types = file_types
-                message.save()
-                form.save_m2m()
+                # The form stamped created_at before the upload; a message is dated when it's saved,
+                # or keyset and since-cursors that already moved past that time would skip it
+                message.created_at = timezone.now()
+                with transaction.atomic():
+                    message.save()
+                    form.save_m2m()
+                    record_message(message)
                 return Response({
                     "message": "Message created successfully!",
                     "message_object": MessageSerializer(message).data
@@ -38,7 +49,7 @@ class CreateMessageView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-class GetMessagesView(APIView, PageNumberPagination):
+class GetMessagesView(APIView, KeysetPagination):
     page_size = 30
 
     def get(self, request):
@@ -53,18 +64,101 @@ class GetMessagesView(APIView, PageNumberPagination):
         except User.DoesNotExist:
             return Response({"error": "Other user not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        messages = Message.objects.filter(
-            Q(sender=user, receiver=other_user) |
-            Q(sender=other_user, receiver=user)
-        ).order_by('-created_at')
+        # One range scan on message_pair_created_idx, newest first
+        messages = Message.objects.filter(pair_key=pair_key_for(user.id, other_user.id)).order_by('-created_at', '-id')
+        messages = MessageSerializer.setup_eager_loading(messages, user)
 
         paginated_messages = self.paginate_queryset(messages, request)
 
         serialized_messages = MessageSerializer(paginated_messages, many=True, context={'auth_user': user}).data
         return self.get_paginated_response(serialized_messages)
     
-class GetActiveConversationsView(APIView, PageNumberPagination):
+# Catch-up after a dropped socket: everything the user missed, across all conversations,
+# since the (created_at, id) of the last message they received
+class GetMessagesSinceView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        position = parse_sync_position(request.GET.get("created_at"), request.GET.get("id"))
+        if position is None:
+            return Response({"error": "created_at and id of the last received message are required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        messages, has_more = messages_since(request.user, position)
+        serialized_messages = MessageSerializer(messages, many=True, context={'auth_user': request.user}).data
+        return Response({"results": serialized_messages, "has_more": has_more}, status=status.HTTP_200_OK)
+
+# Search across the caller's own conversations (or one of them with ?converser_id=), newest first.
+# Always cursor-paginated: counting every match of a common word would cost more than the page.
+class SearchMessagesView(APIView, KeysetPagination):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+    page_size = 20
+    keyset_only = True
+
+    def get(self, request):
+        text = request.GET.get("q", "").strip()
+        if not text:
+            return Response({"error": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(text) > MAX_SEARCH_LENGTH:
+            return Response({"error": f"q cannot exceed {MAX_SEARCH_LENGTH} characters"}, status=status.HTTP_400_BAD_REQUEST)
+
+        converser_id = request.GET.get("converser_id")
+        try:
+            if converser_id and not User.objects.filter(id=converser_id).exists():
+                raise ValidationError("Unknown user")
+        except ValidationError:
+            return Response({"error": "Other user not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        messages = search_messages(request.user, text, partner_id=converser_id or None)
+        messages = MessageSerializer.setup_eager_loading(messages, request.user)
+        paginated_messages = self.paginate_queryset(messages, request)
+
+        results = MessageSerializer(paginated_messages, many=True, context={'auth_user': request.user}).data
+        for result, message in zip(results, paginated_messages):
+            result['snippet'] = snippet(message, text)
+        return self.get_paginated_response(results)
+
+class MarkConversationReadView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        partner_id = request.data.get("partner_id")
+        try:
+            found = mark_read(request.user, partner_id)
+        except ValidationError:
+            found = False
+        if not found:
+            return Response({"error": "Conversation not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({"unread_count": 0, "total_unread": total_unread(request.user.id)}, status=status.HTTP_200_OK)
+
+# Badge count: a sum over the user's conversation rows, not a scan of Message
+class GetUnreadCountView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({"total_unread": total_unread(request.user.id)}, status=status.HTTP_200_OK)
+
+class GetPresenceView(APIView):
+    """Online status and last-seen time for ?ids=<id>,<id>,... answered from Redis, without touching the database."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        user_ids = [user_id.strip() for user_id in request.GET.get("ids", "").split(",") if user_id.strip()]
+        if not user_ids:
+            return Response({"error": "ids is required"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(user_ids) > MAX_LOOKUP_IDS:
+            return Response({"error": f"At most {MAX_LOOKUP_IDS} ids can be looked up at once"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(get_presence(user_ids), status=status.HTTP_200_OK)
+
+class GetActiveConversationsView(APIView, KeysetPagination):
     page_size = 6
+    keyset_ordering = ('-last_activity_at', '-id')
 
     def get(self, request):
         user_id = request.GET.get("user_id")
@@ -74,27 +168,35 @@ class GetActiveConversationsView(APIView, PageNumberPagination):
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        conversation_users = User.objects.filter(
-            Q(sent_messages__receiver=user) | Q(received_messages__sender=user)
-        ).exclude(id=user.id).distinct().order_by('-created_at')
+        # One query over the (user, last_activity_at) index, most recent conversation first
+        conversations = Conversation.objects.filter(user=user) \
+            .select_related('partner', 'last_message__sender') \
+            .annotate(
+                partner_is_following=Exists(Follower.objects.filter(follower=user, following=OuterRef('partner'))),
+                partner_is_blocked=Exists(BlockedUser.objects.filter(blocker=user, blocked=OuterRef('partner'))),
+            ).order_by('-last_activity_at', '-id')
 
         if search_query:
-            conversation_users = conversation_users.filter(username__icontains=search_query)
+            # Prefix matches first, most recent first within each group
+            conversations = search_usernames(conversations, search_query, field='partner__username')
+            self.keyset_ordering = ('username_match_rank',) + self.keyset_ordering
+            conversations = conversations.order_by(*self.keyset_ordering)
 
-        paginated_users = self.paginate_queryset(conversation_users, request)
+        paginated_conversations = self.paginate_queryset(conversations, request)
 
         serialized_users = []
-        for conversation_user in paginated_users:
-            latest_message = Message.objects.filter(
-                Q(sender=user, receiver=conversation_user) | Q(sender=conversation_user, receiver=user)
-            ).order_by('-created_at').first()
+        for conversation in paginated_conversations:
+            partner = conversation.partner
+            partner.isFollowing = conversation.partner_is_following
+            partner.isBlocked = conversation.partner_is_blocked
 
-            serialized_user = UserSerializer(conversation_user, context={'auth_user': user}).data
-            serialized_user['latest_message'] = MessageSerializer(latest_message).data if latest_message else None
+            serialized_user = UserSerializer(partner, context={'auth_user': user}).data
+            serialized_user['latest_message'] = MessageSerializer(conversation.last_message).data if conversation.last_message else None
+            serialized_user['unread_count'] = conversation.unread_count
 
             serialized_users.append(serialized_user)
 
-        return self.get_paginated_response(serialized_users)
+        return self.get_paginated_response(add_presence(serialized_users))
     
 # Returns only musicians - only those that follow the search query, users they are following appear first
 class GetPotentialConversationsView(APIView, PageNumberPagination):
@@ -110,25 +212,22 @@ class GetPotentialConversationsView(APIView, PageNumberPagination):
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        conversation_users = User.objects.filter(
-            Q(sent_messages__receiver=user) | Q(received_messages__sender=user)
-        ).exclude(id=user.id).distinct()
+        conversation_users = Conversation.objects.filter(user=user).values('partner_id')
 
         blocked_by_others = BlockedUser.objects.filter(blocked=request.user).values_list('blocker_id', flat=True)
 
         users = User.objects.filter(role="musician") \
             .exclude(id__in=blocked_by_others) \
-            .exclude(id__in=conversation_users.values_list('id', flat=True)) \
+            .exclude(id__in=conversation_users) \
             .exclude(id=user.id)
 
-        if search_query:
-            users = users.filter(username__icontains=search_query)
-
         following_subquery = Follower.objects.filter(follower=user, following=OuterRef('id'))
+        users = users.annotate(isFollowing=Exists(following_subquery))
 
-        users = users.annotate(
-            isFollowing=Exists(following_subquery)
-        ).order_by('-isFollowing', 'username')
+        if search_query:
+            users = search_usernames(users, search_query).order_by('username_match_rank', '-isFollowing', 'username')
+        else:
+            users = users.order_by('-isFollowing', 'username')
 
         paginated_users = self.paginate_queryset(users, request)
 
@@ -2,13 +2,22 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from pages.serializers import PostSerializer, UserSerializer, CommentSerializer
-from pages.utils.s3_utils import upload_to_s3
+from pages.utils.s3_utils import upload_files_to_s3, generate_presigned_post, s3_object_exists
+from pages.utils.timeline_utils import fan_out_post
+from pages.utils.toggle_utils import like_post, unlike_post
+from pages.utils.search_utils import search_usernames
+from pages.utils.pagination_utils import KeysetPagination
 from pages.forms import PostForm
 from pages.models import Post, Comment, Like, User, ReportedPost, BlockedUser
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.db.models import Q, Count
+from django.db.models import Q, Count, F
+from django.db import transaction
+from django.core.exceptions import ValidationError
+
+# Matches the size of Post.file_keys
+MAX_POST_FILES = 10
 
 class CreatePostView(APIView):
     authentication_classes = [JWTAuthentication]
@@ -19,11 +28,9 @@ class CreatePostView(APIView):
             form = PostForm(request.data, request.FILES)
             
             if form.is_valid():
-                file_keys = []
-                file_types = []
-                for file in form.cleaned_data['files']:
-                    file_keys.append(upload_to_s3(file, request.user.id))
-                    file_types.append(file.content_type)
+                files = form.cleaned_data['files']
+                file_keys = upload_files_to_s3(files, request.user.id)
+                file_types = [file.content_type for file in files]
                 post = form.save(commit=False)
                 post.owner = request.user
                 post.file_keys = file_keys
@@ -36,6 +43,67 @@ class CreatePostView(APIView):
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
+class PresignPostUploadView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        files = request.data.get("files", [])
+        if not files:
+            return Response({"error": "No files uploaded."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(files) > MAX_POST_FILES:
+            return Response({"error": f"A post can have at most {MAX_POST_FILES} files."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            uploads = [
+                generate_presigned_post(file.get("name", ""), file.get("content_type", ""), file.get("size"), request.user.id)
+                for file in files
+            ]
+        except (ValueError, AttributeError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({"uploads": uploads}, status=status.HTTP_200_OK)
+
+class FinalizePostUploadView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        file_keys = request.data.get("file_keys", [])
+        file_types = request.data.get("file_types", [])
+        caption = request.data.get("caption", "")
+        tagged_user_ids = request.data.get("tagged_users", [])
+
+        if not file_keys or len(file_keys) != len(file_types):
+            return Response({"error": "Each uploaded file needs a key and a type."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(file_keys) > MAX_POST_FILES:
+            return Response({"error": f"A post can have at most {MAX_POST_FILES} files."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Keys are issued under the uploader's prefix; refuse anyone else's objects
+        prefix = f"user_{request.user.id}/"
+        if any(not str(key).startswith(prefix) for key in file_keys):
+            return Response({"error": "Invalid file key."}, status=status.HTTP_400_BAD_REQUEST)
+        if any(not (str(file_type).startswith('image/') or str(file_type).startswith('video/')) for file_type in file_types):
+            return Response({"error": "Only image and video files are allowed."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            missing = [key for key, file_type in zip(file_keys, file_types) if not s3_object_exists(key, file_type)]
+            if missing:
+                return Response({"error": "Some files have not finished uploading.", "missing": missing}, status=status.HTTP_400_BAD_REQUEST)
+
+            post = Post(owner=request.user, caption=caption, file_keys=file_keys, file_types=file_types)
+            post.clean_fields(exclude=["owner"])
+            post.save()
+            if tagged_user_ids:
+                post.tagged_users.set(User.objects.filter(id__in=tagged_user_ids))
+            return Response({"message": "Post created successfully!", "post_id": post.id}, status=status.HTTP_201_CREATED)
+        except ValidationError as e:
+            return Response({"error": "Invalid post data", "details": e.message_dict}, status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 class GetPostsView(APIView, PageNumberPagination):
     page_size = 6
 
@@ -47,14 +115,16 @@ class GetPostsView(APIView, PageNumberPagination):
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
         posts = Post.objects.filter(owner__username=user.username, is_banned=False).distinct().order_by("-created_at")
+        posts = PostSerializer.setup_eager_loading(posts, user)
 
         paginated_posts = self.paginate_queryset(posts, request)
 
         serialized_posts = PostSerializer(paginated_posts, many=True, context={'auth_user': user}).data
         return self.get_paginated_response(serialized_posts)
     
-class GetFeedView(APIView, PageNumberPagination):
+class GetFeedView(APIView, KeysetPagination):
     page_size = 6
+    keyset_ordering = ('-timeline_created_at', '-id')
 
     def get(self, request):
         user_id = request.GET.get("user_id")
@@ -62,12 +132,13 @@ class GetFeedView(APIView, PageNumberPagination):
             user = User.objects.get(id=user_id)
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
+        # Hidden, reported, banned and blocked posts are pruned from the timeline on write
         posts = Post.objects.filter(
-            ~Q(owner__username=user.username),
-            ~Q(id__in=user.hidden_posts.values('id')),
-            ~Q(id__in=user.reported_posts.values('id')),
-            Q(is_banned=False)
-        ).distinct().order_by("-created_at")
+            timeline_entries__user=user
+        ).annotate(
+            timeline_created_at=F("timeline_entries__created_at")
+        ).order_by("-timeline_created_at", "-id")
+        posts = PostSerializer.setup_eager_loading(posts, user)
 
         paginated_posts = self.paginate_queryset(posts, request)
 
@@ -88,6 +159,7 @@ class GetLikedPostsView(APIView, PageNumberPagination):
             Q(id__in=liked_post_ids),
             Q(is_banned=False)
         ).distinct().order_by("created_at")
+        posts = PostSerializer.setup_eager_loading(posts, user)
 
         paginated_posts = self.paginate_queryset(posts, request)
 
@@ -103,6 +175,7 @@ class GetReportedPostsView(APIView, PageNumberPagination):
             id__in=post_ids,
             is_banned=False
         ).distinct().order_by("created_at")
+        posts = PostSerializer.setup_eager_loading(posts)
 
         paginated_posts = self.paginate_queryset(posts, request)
 
@@ -116,6 +189,7 @@ class GetBannedPostsView(APIView, PageNumberPagination):
         posts = Post.objects.filter(
             Q(is_banned=True)
         ).distinct().order_by("-created_at")
+        posts = PostSerializer.setup_eager_loading(posts)
 
         paginated_posts = self.paginate_queryset(posts, request)
 
@@ -123,35 +197,23 @@ class GetBannedPostsView(APIView, PageNumberPagination):
         return self.get_paginated_response(serialized_posts)
     
 class LikeToggleView(APIView):
+    permission_classes = [IsAuthenticated]
+
     def post(self, request):
-        post_id = request.data.get("post_id")
-        print(post_id)
-        try:
-            target_post = Post.objects.get(id=post_id)
-        except Post.DoesNotExist:
+        post_exists, liked = like_post(request.user, request.data.get("post_id"))
+        if not post_exists:
             return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        follow_exists = Like.objects.filter(user=request.user, post=target_post).exists()
-        if follow_exists:
+        if not liked:
             return Response({"message": "Already liked"}, status=status.HTTP_200_OK)
-
-        Like.objects.create(user=request.user, post=target_post)
         return Response({"message": "Liked"}, status=status.HTTP_201_CREATED)
 
     def delete(self, request):
-        post_id = request.data.get("post_id")
-        print(post_id)
-        try:
-            target_post = Post.objects.get(id=post_id)
-        except Post.DoesNotExist:
+        post_exists, unliked = unlike_post(request.user, request.data.get("post_id"))
+        if not post_exists:
             return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        try:
-            like = Like.objects.get(user=request.user, post=target_post)
-            like.delete()
-            return Response({"message": "Unliked"}, status=status.HTTP_200_OK)
-        except Like.DoesNotExist:
+        if not unliked:
             return Response({"error": "This post is not liked"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"message": "Unliked"}, status=status.HTTP_200_OK)
         
 class HideView(APIView):
     def post(self, request):
@@ -264,6 +326,7 @@ class UnbanView(APIView):
             target_post.ban_admin.clear()
             target_post.full_clean()
             target_post.save()
+            transaction.on_commit(lambda: fan_out_post(target_post))
             return Response({"message": "Unbanned"}, status=status.HTTP_200_OK)
         except:
             return Response({"error": "Failed to ban post"}, status=status.HTTP_400_BAD_REQUEST)
@@ -282,7 +345,7 @@ class GetLikedUsersView(APIView, PageNumberPagination):
         liked_users = User.objects.filter(id__in=target_post.likes.values_list('user_id', flat=True))
 
         if search_query:
-            liked_users = liked_users.filter(username__icontains=search_query)
+            liked_users = search_usernames(liked_users, search_query).order_by('username_match_rank', 'username')
 
         blocked_by_others = BlockedUser.objects.filter(blocked=request.user).values_list('blocker_id', flat=True)
         you_blocked = BlockedUser.objects.filter(blocker=request.user).values_list('blocked_id', flat=True)
@@ -4,6 +4,8 @@ from rest_framework import status
 from pages.models import Musician, User, Genre, Instrument, MusicianInstrument, BlockedUser, Business
 from pages.serializers import MusicianSerializer
 from pages.serializers import BusinessSerializer
+from pages.utils.discover_utils import refresh_musician_search_document
+from django.db import transaction
 from django.contrib.auth.hashers import check_password
 from rest_framework.permissions import IsAuthenticated
 
@@ -24,6 +26,8 @@ class MusicianDetailView(APIView):
             return Response({"error": "Musician profile not found"}, status=status.HTTP_404_NOT_FOUND)
 
 
+    # A failed instrument/genre lookup rolls back the whole update (and its search document refresh)
+    @transaction.atomic
     def patch(self, request, user_id):
         try:
             user = User.objects.get(id=user_id)
@@ -70,6 +74,7 @@ class MusicianDetailView(APIView):
                         if created:
                             musician.instruments.add(instrument)
                     except Instrument.DoesNotExist:
+                        transaction.set_rollback(True)
                         return Response({"error": "Instrument not found"}, status=status.HTTP_404_NOT_FOUND)
 
             if 'genres' in request.data:
@@ -81,8 +86,11 @@ class MusicianDetailView(APIView):
                         musician.genres.add(genre)
                     
                     except Genre.DoesNotExist:
+                        transaction.set_rollback(True)
                         return Response({"error": "Genre not found"}, status=status.HTTP_404_NOT_FOUND)
 
+            # Discover reads the denormalized search document; rebuild it from what was saved
+            transaction.on_commit(lambda: refresh_musician_search_document(user))
             return Response({"message": "Profile updated successfully"}, status=status.HTTP_200_OK)
         except User.DoesNotExist:
             return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
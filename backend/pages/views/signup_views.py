@@ -3,6 +3,7 @@ from rest_framework.response import Response
 from rest_framework import status
 from pages.models import Musician, Instrument, MusicianInstrument, Business
 from pages.serializers import UserSignupSerializer
+from pages.utils.discover_utils import refresh_musician_search_document
 
 
 # API endpoint for signup requests (handles both musicians and business account)
@@ -43,6 +44,7 @@ def signup(request):
                             years_played=years_played
                         )
                     except Instrument.DoesNotExist:
+                        refresh_musician_search_document(user)
                         return Response({"error": "Instrument not found."}, status=status.HTTP_400_BAD_REQUEST)
 
             # Set genres after Musician instance is created
@@ -52,6 +54,9 @@ def signup(request):
                 genre_ids = [genre.get("id") for genre in genres_data if genre.get("id")]
                 musician.genres.set(genre_ids)  # Use set() to assign ManyToMany field
 
+            # Make the new musician discoverable
+            refresh_musician_search_document(user)
+
             return Response({"message": "User and musician created successfully", "id": user.id}, status=status.HTTP_201_CREATED)
 
         # If not a musician, check if the role is business
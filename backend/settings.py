@@ -49,6 +49,21 @@ AWS_IMAGE_BUCKET_NAME="savvy-note-images"
 AWS_VIDEO_BUCKET_NAME="savvy-note-videos"
 AWS_METADATA_BUCKET_NAME="savvy-note-metadata"
 
+# Presigned URL cache: "memory" (per-process LRU) or "django" (shared through CACHES, e.g. Redis)
+AWS_PRESIGNED_URL_CACHE_BACKEND = env("AWS_PRESIGNED_URL_CACHE_BACKEND", default="memory")
+AWS_PRESIGNED_URL_CACHE_ALIAS = "default"
+AWS_PRESIGNED_URL_CACHE_SIZE = 10000
+
+# Shared S3 client: connection pool size (per process) and botocore retry behaviour
+AWS_S3_MAX_POOL_CONNECTIONS = env.int("AWS_S3_MAX_POOL_CONNECTIONS", default=50)
+AWS_S3_RETRY_MODE = "standard"
+AWS_S3_MAX_ATTEMPTS = 3
+# Threads used to upload a multi-file post/message in parallel (keep <= pool size)
+AWS_S3_UPLOAD_WORKERS = 8
+# Size limits enforced by presigned POST policies for direct-to-S3 post uploads
+AWS_MAX_IMAGE_UPLOAD_SIZE = 20 * 1024 * 1024
+AWS_MAX_VIDEO_UPLOAD_SIZE = 1024 * 1024 * 1024
+
 # Stripe environment variables
 STRIPE_SECRET_KEY = env("STRIPE_SECRET_KEY")
 STRIPE_WEBHOOK_SECRET = env('STRIPE_WEBHOOK_SECRET', default='dummy_ci_value')
@@ -85,6 +100,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.sites',
+    'django.contrib.postgres',
     'pages',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -235,3 +251,31 @@ CHANNEL_LAYERS = {
         },
     },
 }
+
+# Chat write-behind: socket messages are broadcast immediately and persisted with one
+# bulk_create per window (pages/messaging/write_behind.py). Off by default.
+CHAT_WRITE_BEHIND = env.bool("CHAT_WRITE_BEHIND", default=False)
+CHAT_WRITE_BEHIND_WINDOW_MS = 50
+CHAT_WRITE_BEHIND_MAX_BATCH = 500
+
+# Typing indicators: at most one "typing" publish per user per window, and "stop_typing"
+# after a window without keystrokes (pages/messaging/typing.py)
+CHAT_TYPING_WINDOW_MS = 2000
+
+# Seconds a WebSocket JWT's user is cached, so reconnects don't each query the user table
+CHAT_WS_USER_CACHE_TTL = 60
+
+# Presence (pages/utils/presence_utils.py): sockets refresh their entry every heartbeat and
+# count as gone once TTL seconds pass without one
+CHAT_PRESENCE_HEARTBEAT = 20
+CHAT_PRESENCE_TTL = 60
+
+# Seconds discover's facet counts are cached per user and filter combination (pages/utils/discover_utils.py)
+DISCOVER_FACET_CACHE_TTL = 30
+
+# Seconds each process reuses its musician/listing match matrices before rebuilding them
+# from the database (pages/utils/match_utils.py)
+MATCH_INDEX_TTL = 300
+
+# Home timelines (pages/utils/timeline_utils.py) hold at most the newest this-many posts
+TIMELINE_MAX_ENTRIES = 500
@@ -63,3 +63,9 @@ class LikeTest:
 
         posts[0].delete()
         assert Like.objects.count() == 0
+
+    def test_unique_user_post_constraint(self, create_user, create_post):
+        posts = create_post
+        Like.objects.create(user=create_user, post=posts[0])
+        with pytest.raises(IntegrityError):
+            Like.objects.create(user=create_user, post=posts[0])
@@ -0,0 +1,58 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from pages.models import Message, User
+from pages.utils import message_utils
+
+@pytest.mark.django_db
+class MessageTest:
+
+    @pytest.fixture
+    def create_users(db):
+        alice = User.objects.create_user(username="alice", email="alice@test.com")
+        bob = User.objects.create_user(username="bob", email="bob@test.com")
+        return alice, bob
+
+    def test_pair_key_is_the_same_in_both_directions(self, create_users):
+        alice, bob = create_users
+        sent = Message.objects.create(sender=alice, receiver=bob, message="Hi")
+        received = Message.objects.create(sender=bob, receiver=alice, message="Hello")
+        sent.refresh_from_db()
+        received.refresh_from_db()
+
+        assert sent.pair_key == received.pair_key == message_utils.pair_key_for(bob.id, alice.id)
+
+    def test_pair_key_is_set_for_bulk_inserts(self, create_users):
+        alice, bob = create_users
+        Message.objects.bulk_create([Message(sender=alice, receiver=bob, message=str(i)) for i in range(3)])
+
+        assert Message.objects.filter(pair_key=message_utils.pair_key_for(alice.id, bob.id)).count() == 3
+
+    def test_pair_key_cleared_when_participant_deleted(self, create_users):
+        alice, bob = create_users
+        message = Message.objects.create(sender=alice, receiver=bob, message="Hi")
+        bob.delete()
+        message.refresh_from_db()
+
+        assert message.pair_key is None
+
+    def test_conversation_history_uses_pair_index(self, create_users):
+        alice, bob = create_users
+        Message.objects.create(sender=alice, receiver=bob, message="Hi")
+        client = APIClient()
+        client.force_authenticate(user=alice)
+
+        with CaptureQueriesContext(connection) as queries:
+            client.get("/api/message/get/", {"user_id": alice.id, "converser_id": bob.id})
+        history_query = next(query["sql"] for query in queries if '"pages_message"."pair_key" =' in query["sql"] and "ORDER BY" in query["sql"])
+
+        with connection.cursor() as cursor:
+            # The test tables are tiny, so make the planner show what it would do on a big one
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+            cursor.execute(f"EXPLAIN {history_query}")
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+
+        assert "Index Scan using message_pair_created_idx" in plan
+        assert "Sort" not in plan
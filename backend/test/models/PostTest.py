@@ -93,13 +93,25 @@ class PostTest:
         post = create_post
         users = create_tagged_users
 
-        assert post.like_count() == 0
+        assert post.like_count == 0
 
         Like.objects.create(user=users[0], post=post)
-        assert post.like_count() == 1
+        post.refresh_from_db()
+        assert post.like_count == 1
 
         Like.objects.create(user=users[1], post=post)
-        assert post.like_count() == 2
+        post.refresh_from_db()
+        assert post.like_count == 2
+
+    def test_like_count_after_cascade_delete(self, create_post, create_tagged_users):
+        post = create_post
+        users = create_tagged_users
+        Like.objects.create(user=users[0], post=post)
+        Like.objects.create(user=users[1], post=post)
+
+        users[0].delete()
+        post.refresh_from_db()
+        assert post.like_count == 1
         
     def test_blank_caption(self, create_owner):
         post = Post.objects.create(
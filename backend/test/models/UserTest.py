@@ -1,9 +1,17 @@
 from django.db import IntegrityError
 from django.core.exceptions import ValidationError
 import pytest
+from django.db import connection
 from pages.models import User
+from pages.utils import search_utils
 from datetime import datetime
 
+@pytest.fixture
+def many_users(db):
+    User.objects.bulk_create([User(username=f"{chr(97 + i % 26)}{chr(97 + i // 26 % 26)}member{i}", email=f"member{i}@test.com") for i in range(3000)])
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE pages_user")
+
 
 class UserTest:
 
@@ -79,4 +87,24 @@ class UserTest:
         user = create_user
         user.username = ""
         with pytest.raises(ValidationError):
-            user.full_clean()
\ No newline at end of file
+            user.full_clean()
+
+    @pytest.mark.django_db
+    def test_username_search_short_query_matches_anywhere(self):
+        for name in ["sally", "alfred", "bob"]:
+            User.objects.create_user(username=name, email=f"{name}@test.com")
+
+        users = search_utils.search_usernames(User.objects.all(), "al").order_by('username_match_rank', 'username')
+
+        assert list(users.values_list('username', flat=True)) == ["alfred", "sally"]
+
+    @pytest.mark.django_db
+    def test_username_contains_search_uses_trigram_index(self, many_users):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                pytest.skip("pg_trgm is not available on this server")
+
+        plan = search_utils.search_usernames(User.objects.all(), "ber123").explain()
+
+        assert "user_username_trgm_idx" in plan
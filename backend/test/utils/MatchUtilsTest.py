@@ -0,0 +1,47 @@
+import pytest
+from pages.utils import match_utils
+
+@pytest.fixture
+def index():
+    """
+    Instruments: 0 guitar, 1 drums. Genres: 0 rock, 1 jazz.
+    Musicians: "rocker" plays guitar for 6 years and rock; "jazz_drummer" drums for 1 year, jazz;
+    "newbie" guitar for 1 year, rock and jazz.
+    Listings: 10 rock guitarist (Professional: 5 years), 20 drums + guitar jazz (no level).
+    """
+    return match_utils.MatchIndex.from_entries(
+        ["rocker", "jazz_drummer", "newbie"],
+        ([0, 1, 2], [0, 1, 0], [6, 1, 1]),
+        ([0, 1, 2, 2], [0, 1, 0, 1]),
+        [10, 20],
+        ([0, 1, 1], [0, 0, 1]),
+        ([0, 1], [0, 1]),
+        [5, 0],
+        instrument_count=2,
+        genre_count=2,
+    )
+
+def test_score_listing(index):
+    scores = index.score_listing(10)
+
+    # Full marks for the experienced guitarist; the newbie covers the genre and a fifth of the experience
+    assert scores[0] == pytest.approx(1.0)
+    assert scores[1] == pytest.approx(0.0)
+    assert scores[2] == pytest.approx(0.7 * 1 / 5 + 0.3)
+
+def test_score_musician(index):
+    scores = index.score_musician("newbie")
+
+    assert scores[0] == pytest.approx(0.7 * 1 / 5 + 0.3)
+    # One of two instruments (no experience asked for) and the listing's only genre
+    assert scores[1] == pytest.approx(0.35 + 0.3)
+
+def test_recommendations_best_first(index):
+    assert [user_id for user_id, _ in index.recommended_applicants(20, 10)] == ["jazz_drummer", "newbie", "rocker"]
+    assert [user_id for user_id, _ in index.recommended_applicants(10, 10)] == ["rocker", "newbie"]
+    assert [user_id for user_id, _ in index.recommended_applicants(10, 1)] == ["rocker"]
+    assert [listing_id for listing_id, _ in index.recommended_gigs("rocker", 10)] == [10, 20]
+
+def test_unknown_ids_have_no_recommendations(index):
+    assert index.recommended_gigs("nobody", 10) == []
+    assert index.recommended_applicants(99, 10) == []
@@ -37,6 +37,16 @@ def mock_get_s3_client(mocker):
     
     return mock_s3_client
 
+@pytest.fixture(autouse=True)
+def clear_presigned_url_cache():
+    from pages.utils.s3_utils import get_presigned_url_cache, reset_s3_client
+    presigned_url_cache = get_presigned_url_cache()
+    presigned_url_cache.clear()
+    reset_s3_client()
+    yield presigned_url_cache
+    presigned_url_cache.clear()
+    reset_s3_client()
+
 @pytest.fixture(autouse=True)
 def mock_django_settings(monkeypatch):
     monkeypatch.delenv("AWS_PROFILE", raising=False)
@@ -45,7 +55,13 @@ def mock_django_settings(monkeypatch):
         AWS_SECRET_ACCESS_KEY="fake_secret",
         AWS_REGION="us-east-1",
         AWS_IMAGE_BUCKET_NAME="mock-bucket",
-        AWS_VIDEO_BUCKET_NAME="mock-video-bucket"
+        AWS_VIDEO_BUCKET_NAME="mock-video-bucket",
+        AWS_S3_MAX_POOL_CONNECTIONS=50,
+        AWS_S3_RETRY_MODE="standard",
+        AWS_S3_MAX_ATTEMPTS=3,
+        AWS_S3_UPLOAD_WORKERS=8,
+        AWS_MAX_IMAGE_UPLOAD_SIZE=20 * 1024 * 1024,
+        AWS_MAX_VIDEO_UPLOAD_SIZE=1024 * 1024 * 1024,
 ))
     
 def test_get_bucket_name_image(monkeypatch):
@@ -88,6 +104,116 @@ def test_generate_s3_url(file_key, file_type, mock_get_s3_client, mock_get_bucke
         ExpiresIn=3600,
     )
 
+def test_generate_s3_url_reuses_cached_url(file_key, file_type, mock_get_s3_client, mock_get_bucket_name, clear_presigned_url_cache):
+    from pages.utils.s3_utils import generate_s3_url
+
+    first = generate_s3_url(file_key, file_type)
+    second = generate_s3_url(file_key, file_type)
+
+    assert first == second == "https://mock-url.com/test.jpg"
+    mock_get_s3_client.generate_presigned_url.assert_called_once()
+    assert clear_presigned_url_cache.stats() == {"hits": 1, "misses": 1}
+
+def test_generate_s3_url_resigns_near_expiry(monkeypatch, file_key, file_type, mock_get_s3_client, mock_get_bucket_name, clear_presigned_url_cache):
+    from pages.utils import s3_utils
+
+    now = 1_000_000.0
+    monkeypatch.setattr(s3_utils.time, "time", lambda: now)
+    s3_utils.generate_s3_url(file_key, file_type)
+
+    # Less than PRESIGNED_URL_MIN_TTL of lifetime left: sign a fresh URL
+    now += s3_utils.PRESIGNED_URL_EXPIRY - s3_utils.PRESIGNED_URL_MIN_TTL + 1
+    s3_utils.generate_s3_url(file_key, file_type)
+
+    assert mock_get_s3_client.generate_presigned_url.call_count == 2
+    assert clear_presigned_url_cache.stats() == {"hits": 0, "misses": 2}
+
+def test_presigned_url_cache_counts_concurrent_lookups():
+    from concurrent.futures import ThreadPoolExecutor
+    from pages.utils.s3_utils import PresignedURLCache, InMemoryURLCache
+
+    cache = PresignedURLCache(InMemoryURLCache())
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: cache.get_or_sign("bucket", f"key{i % 10}", lambda: "url"), range(2000)))
+
+    stats = cache.stats()
+    assert stats["hits"] + stats["misses"] == 2000
+    assert stats["misses"] >= 10
+
+def test_presigned_url_cache_built_on_first_use(monkeypatch):
+    from pages.utils import s3_utils
+
+    monkeypatch.setattr(s3_utils, "_presigned_url_cache", None)
+    built = MagicMock()
+    monkeypatch.setattr(s3_utils, "build_presigned_url_cache", built)
+
+    assert s3_utils.get_presigned_url_cache() is s3_utils.get_presigned_url_cache() is built.return_value
+    built.assert_called_once()
+
+def test_in_memory_url_cache_evicts_least_recently_used():
+    from pages.utils.s3_utils import InMemoryURLCache
+
+    cache = InMemoryURLCache(max_entries=2)
+    cache.set("bucket", "a", "url-a", 100)
+    cache.set("bucket", "b", "url-b", 100)
+    cache.get("bucket", "a")
+    cache.set("bucket", "c", "url-c", 100)
+
+    assert cache.get("bucket", "a") == ("url-a", 100)
+    assert cache.get("bucket", "b") is None
+    assert cache.get("bucket", "c") == ("url-c", 100)
+
+def test_django_url_cache_round_trip():
+    from pages.utils.s3_utils import DjangoURLCache
+    import time
+
+    cache = DjangoURLCache()
+    expires_at = time.time() + 3600
+    cache.set("bucket", "key", "url", expires_at)
+
+    assert cache.get("bucket", "key") == ("url", expires_at)
+    cache.clear()
+
+def test_get_s3_client_is_shared(mocker):
+    from pages.utils.s3_utils import get_s3_client
+    mock_boto_client = mocker.patch("boto3.client")
+
+    first = get_s3_client()
+    second = get_s3_client()
+
+    assert first is second
+    mock_boto_client.assert_called_once()
+    assert mock_boto_client.call_args.kwargs["config"].max_pool_connections > 1
+
+def test_s3_settings_read_when_client_and_pool_are_built(mocker):
+    from pages.utils import s3_utils
+    mock_boto_client = mocker.patch("boto3.client")
+    s3_utils.settings.AWS_S3_MAX_POOL_CONNECTIONS = 7
+    s3_utils.settings.AWS_S3_MAX_ATTEMPTS = 5
+    s3_utils.settings.AWS_S3_UPLOAD_WORKERS = 3
+    s3_utils.settings.AWS_MAX_IMAGE_UPLOAD_SIZE = 1024
+    s3_utils.reset_upload_executor()
+
+    s3_utils.get_s3_client()
+    config = mock_boto_client.call_args.kwargs["config"]
+
+    assert config.max_pool_connections == 7
+    assert config.retries["max_attempts"] == 5
+    assert s3_utils.get_upload_executor()._max_workers == 3
+    assert s3_utils.get_max_upload_size("image/png") == 1024
+    s3_utils.reset_upload_executor()
+
+def test_get_s3_client_thread_safe(mocker):
+    from concurrent.futures import ThreadPoolExecutor
+    from pages.utils.s3_utils import get_s3_client
+    mock_boto_client = mocker.patch("boto3.client")
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        clients = list(executor.map(lambda _: get_s3_client(), range(32)))
+
+    assert all(client is clients[0] for client in clients)
+    mock_boto_client.assert_called_once()
+
 def test_upload_to_s3_image(monkeypatch, mock_get_bucket_name, mock_get_s3_client):
     from pages.utils.s3_utils import upload_to_s3
 
@@ -134,6 +260,44 @@ def test_upload_to_s3_video(monkeypatch, mock_get_bucket_name, mock_get_s3_clien
         ExtraArgs={"ContentType": "video/mp4"},
     )
     
+def test_upload_files_to_s3_runs_concurrently_in_order(monkeypatch):
+    import threading
+    from pages.utils import s3_utils
+
+    barrier = threading.Barrier(3, timeout=5)
+
+    def fake_upload(file_obj, user_id):
+        barrier.wait()  # Only passes if all three uploads are in flight at once
+        return f"user_{user_id}/{file_obj.name}"
+
+    monkeypatch.setattr(s3_utils, "upload_to_s3", fake_upload)
+    files = [MagicMock(content_type="image/jpeg") for _ in range(3)]
+    for i, file_obj in enumerate(files):
+        file_obj.name = f"{i}.jpg"
+
+    keys = s3_utils.upload_files_to_s3(files, 7)
+
+    assert keys == ["user_7/0.jpg", "user_7/1.jpg", "user_7/2.jpg"]
+
+def test_upload_files_to_s3_cleans_up_on_failure(monkeypatch):
+    from pages.utils import s3_utils
+
+    def fake_upload(file_obj, user_id):
+        if file_obj.name == "bad.jpg":
+            raise Exception("S3 upload failed")
+        return f"user_{user_id}/{file_obj.name}"
+
+    deleted = []
+    monkeypatch.setattr(s3_utils, "upload_to_s3", fake_upload)
+    monkeypatch.setattr(s3_utils, "delete_from_s3", lambda key, file_type: deleted.append(key))
+    files = [MagicMock(content_type="image/jpeg") for _ in range(3)]
+    files[0].name, files[1].name, files[2].name = "a.jpg", "bad.jpg", "c.jpg"
+
+    with pytest.raises(Exception, match="S3 upload failed"):
+        s3_utils.upload_files_to_s3(files, 7)
+
+    assert sorted(deleted) == ["user_7/a.jpg", "user_7/c.jpg"]
+
 def test_get_bucket_name_pdf(monkeypatch):
     monkeypatch.setattr("pages.utils.s3_utils.settings", type("MockSettings", (), {
         "AWS_IMAGE_BUCKET_NAME": "image-bucket",
@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import status
-from pages.models import Musician, Business, Instrument, Genre
+from pages.models import Musician, Business, Instrument, Genre, MusicianSearchDocument
 
 
 User = get_user_model()
@@ -50,6 +50,11 @@ def test_signup_musician_success(api_client, instrument, genre):
     assert User.objects.filter(email=data["email"]).exists()
     assert Musician.objects.filter(user__email=data["email"]).exists()
 
+    document = MusicianSearchDocument.objects.get(user__email=data["email"])
+    assert document.username == "musouser"
+    assert document.instrument_ids == [instrument.id]
+    assert document.genre_ids == [genre.id]
+
 @pytest.mark.django_db
 def test_signup_business_success(api_client):
     data = {
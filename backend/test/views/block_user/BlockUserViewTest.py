@@ -3,7 +3,7 @@ import uuid
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from rest_framework import status
-from pages.models import BlockedUser
+from pages.models import BlockedUser, Follower
 
 User = get_user_model()
 
@@ -32,6 +32,21 @@ def test_block_user_success(authenticated_client, create_user):
     assert response.data["message"] == "User blocked."
     assert BlockedUser.objects.filter(blocker=create_user, blocked=target_user).exists()
 
+@pytest.mark.django_db
+def test_block_user_removes_follows_and_updates_counters(authenticated_client, create_user):
+    target_user = User.objects.create_user(username="targetuser", email="target@test.com")
+    Follower.objects.create(follower=create_user, following=target_user)
+    Follower.objects.create(follower=target_user, following=create_user)
+
+    response = authenticated_client.post(BLOCK_URL.format(target_user.id))
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert not Follower.objects.filter(follower__in=[create_user, target_user]).exists()
+    for user in (create_user, target_user):
+        user.refresh_from_db()
+        assert user.follower_count == 0
+        assert user.following_count == 0
+
 @pytest.mark.django_db
 def test_block_user_already_blocked(authenticated_client, create_user):
     """Test attempting to block an already blocked user."""
@@ -1,8 +1,13 @@
+import io
 import pytest
 import random
+from django.core import management
 from django.contrib.auth import get_user_model
-from pages.models import User, Musician, Genre, Instrument, MusicianInstrument, BlockedUser
+from pages.models import User, Musician, Genre, Instrument, MusicianInstrument, BlockedUser, MusicianSearchDocument
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from rest_framework.test import APIClient
+from pages.utils import discover_utils
 
 User = get_user_model()
 DISCOVER_URL = "/api/discover/"
@@ -48,6 +53,7 @@ def create_users(db):
         musician.save()
         users.append(user)
 
+    discover_utils.refresh_musician_search_documents([user.id for user in users])
     return users
 
 @pytest.fixture
@@ -82,6 +88,28 @@ def test_get_users_search(authenticated_client_factory, create_users):
     assert len(response.data["results"]) == 1
     assert response.data["results"][0] == search_query
     
+@pytest.mark.django_db
+def test_get_users_search_ranks_prefix_matches_first(authenticated_client_factory):
+    for name in ["bigjohn", "john", "johnny", "jane"]:
+        user = User.objects.create_user(username=name, email=f"{name}@gmail.com")
+        Musician.objects.create(user=user, stage_name=name, years_played=1, home_studio=False)
+        discover_utils.refresh_musician_search_document(user)
+    client, _ = authenticated_client_factory()
+
+    assert client.get(DISCOVER_URL, {"search": "JOHN"}).data["results"] == ["john", "johnny", "bigjohn"]
+    # Shorter than a trigram still matches anywhere in the name
+    assert client.get(DISCOVER_URL, {"search": "jo"}).data["results"] == ["john", "johnny", "bigjohn"]
+
+@pytest.mark.django_db
+def test_get_users_only_lists_musician_accounts(authenticated_client_factory):
+    for name, role in [("player", "musician"), ("venue", "business")]:
+        user = User.objects.create_user(username=name, email=f"{name}@gmail.com", role=role)
+        Musician.objects.create(user=user, stage_name=name, years_played=1, home_studio=False)
+        discover_utils.refresh_musician_search_document(user)
+    client, _ = authenticated_client_factory()
+
+    assert client.get(DISCOVER_URL).data["results"] == ["player"]
+
 @pytest.mark.filterwarnings("ignore:Pagination may yield inconsistent results with an unordered object_list")
 def test_get_users_pagination_next_page(authenticated_client_factory, create_users):
     """Ensure pagination works for loading additional pages"""
@@ -202,3 +230,103 @@ def test_discover_excludes_blocked_users(authenticated_client_factory, create_us
     # Ensure the blocked_user's username is not in the discover results
     for username in blocked_usernames:
         assert username not in result_usernames, f"{username} should not be visible to the blocked user"
+
+@pytest.fixture
+def band(db):
+    guitar, drums, bass = (Instrument.objects.create(instrument=name) for name in ("Guitar", "Drums", "Bass"))
+    rock, jazz = (Genre.objects.create(genre=name) for name in ("Rock", "Jazz"))
+    lineup = {"guitarist": ([guitar], [rock]), "drummer": ([drums], [rock, jazz]), "multi": ([guitar, drums], [jazz])}
+    for name, (instruments, genres) in lineup.items():
+        user = User.objects.create_user(username=name, email=f"{name}@gmail.com")
+        musician = Musician.objects.create(user=user, stage_name=name, years_played=1, home_studio=name == "multi")
+        for instrument in instruments:
+            MusicianInstrument.objects.create(musician=musician, instrument=instrument, years_played=1)
+        musician.genres.set(genres)
+        discover_utils.refresh_musician_search_document(user)
+
+@pytest.mark.django_db
+def test_discover_filters_any_or_all(authenticated_client_factory, band):
+    client, _ = authenticated_client_factory()
+
+    assert client.get(DISCOVER_URL, {"instrument": ["Guitar", "Drums"]}).data["results"] == ["drummer", "guitarist", "multi"]
+    assert client.get(DISCOVER_URL, {"instrument": ["Guitar", "Drums"], "match": "all"}).data["results"] == ["multi"]
+    assert client.get(DISCOVER_URL, {"instrument": "Drums", "genre": "Rock"}).data["results"] == ["drummer"]
+
+@pytest.mark.django_db
+def test_discover_match_all_with_unknown_name(authenticated_client_factory, band):
+    client, _ = authenticated_client_factory()
+
+    assert client.get(DISCOVER_URL, {"instrument": "Theremin", "match": "all"}).data["results"] == []
+    assert client.get(DISCOVER_URL, {"instrument": ["Guitar", "Theremin"], "match": "all"}).data["results"] == []
+    assert client.get(DISCOVER_URL, {"genre": ["Jazz", "Polka"], "match": "all"}).data["results"] == []
+    # Any-of filters still match on the names that exist
+    assert client.get(DISCOVER_URL, {"instrument": ["Guitar", "Theremin"]}).data["results"] == ["guitarist", "multi"]
+
+@pytest.mark.django_db
+def test_discover_reads_only_search_documents(authenticated_client_factory, band):
+    client, _ = authenticated_client_factory()
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(DISCOVER_URL, {"instrument": "Guitar", "genre": "Rock", "search": "gui"})
+
+    # COUNT and the page; no joins through musicians, instruments or genres
+    assert len(queries) == 2
+    assert not any("pages_musician\"" in query["sql"] or "pages_musicianinstrument" in query["sql"] for query in queries)
+
+@pytest.mark.django_db
+def test_discover_filter_uses_gin_index(band):
+    documents = discover_utils.filter_documents(MusicianSearchDocument.objects.all(), instruments=["Guitar"], genres=["Rock"])
+
+    with connection.cursor() as cursor:
+        # The table is tiny here; make the planner show which index it would use at scale
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = documents.explain()
+
+    assert "musician_doc_instruments_idx" in plan or "musician_doc_genres_idx" in plan
+    assert "pages_musicianinstrument" not in plan
+
+@pytest.mark.django_db
+def test_rebuild_musician_search(band):
+    MusicianSearchDocument.objects.all().delete()
+
+    management.call_command("rebuild_musician_search", stdout=io.StringIO())
+
+    assert set(MusicianSearchDocument.objects.values_list("username", flat=True)) == {"guitarist", "drummer", "multi"}
+
+@pytest.mark.django_db
+def test_discover_facets(authenticated_client_factory, band):
+    client, _ = authenticated_client_factory()
+
+    response = client.get(DISCOVER_URL, {"genre": "Jazz", "facets": "true"})
+
+    assert response.data["results"] == ["drummer", "multi"]
+    assert response.data["facets"] == {
+        "instruments": {"Drums": 2, "Guitar": 1},
+        "genres": {"Jazz": 2, "Rock": 1},
+        "home_studio": {"true": 1, "false": 1},
+    }
+    assert "facets" not in client.get(DISCOVER_URL, {"genre": "Jazz"}).data
+
+@pytest.mark.django_db
+def test_discover_home_studio_filter(authenticated_client_factory, band):
+    client, _ = authenticated_client_factory()
+
+    assert client.get(DISCOVER_URL, {"home_studio": "true"}).data["results"] == ["multi"]
+    assert client.get(DISCOVER_URL, {"home_studio": "false"}).data["results"] == ["drummer", "guitarist"]
+
+@pytest.mark.django_db
+def test_discover_facets_one_query_then_cached(authenticated_client_factory, band):
+    client, _ = authenticated_client_factory()
+    params = {"instrument": "Drums", "facets": "true"}
+
+    with CaptureQueriesContext(connection) as first:
+        first_facets = client.get(DISCOVER_URL, params).data["facets"]
+    with CaptureQueriesContext(connection) as second:
+        second_facets = client.get(DISCOVER_URL, params).data["facets"]
+
+    # COUNT, page, facets; the repeat is served from the cache
+    assert len(first) == 3
+    assert len(second) == 2
+    assert first_facets == second_facets
+    # A different filter combination is counted separately
+    assert client.get(DISCOVER_URL, {"instrument": "Guitar", "facets": "true"}).data["facets"]["instruments"] == {"Guitar": 2, "Drums": 1}
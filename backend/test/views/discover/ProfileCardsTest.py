@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from pages.models import User, Musician, Genre, Instrument, MusicianInstrument, BlockedUser, Follower
+
+PROFILES_URL = "/api/discover/profiles/"
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+@pytest.fixture
+def viewer(db):
+    return User.objects.create_user(username="viewer", email="viewer@gmail.com", password="testpassword1!")
+
+@pytest.fixture
+def authenticated_client(api_client, viewer):
+    api_client.force_authenticate(user=viewer)
+    return api_client
+
+@pytest.fixture
+def make_musician(db):
+    guitar = Instrument.objects.create(instrument="Guitar")
+    rock = Genre.objects.create(genre="Rock")
+
+    def make(username):
+        user = User.objects.create_user(username=username, email=f"{username}@gmail.com")
+        musician = Musician.objects.create(user=user, stage_name=f"{username} band", years_played=3, home_studio=True)
+        MusicianInstrument.objects.create(musician=musician, instrument=guitar, years_played=3)
+        musician.genres.add(rock)
+        return user
+    return make
+
+@pytest.mark.django_db
+def test_profile_cards(authenticated_client, viewer, make_musician):
+    alice = make_musician("alice")
+    Follower.objects.create(follower=viewer, following=alice)
+    alice.refresh_from_db()
+
+    response = authenticated_client.get(PROFILES_URL, {"ids": str(alice.id)})
+
+    assert response.status_code == 200
+    card = response.data[0]
+    assert card["username"] == "alice"
+    assert card["isFollowing"] is True
+    assert card["isBlocked"] is False
+    assert card["follower_count"] == alice.follower_count
+    assert card["musician"]["stage_name"] == "alice band"
+    assert card["musician"]["genres"] == ["Rock"]
+    assert card["musician"]["instruments"][0]["instrument_name"] == "Guitar"
+    assert card["musician"]["instruments"][0]["years_played"] == 3
+
+@pytest.mark.django_db
+def test_profile_cards_keep_requested_order(authenticated_client, make_musician):
+    alice, bob, carol = make_musician("alice"), make_musician("bob"), make_musician("carol")
+    business = User.objects.create_user(username="venue", email="venue@gmail.com")
+
+    response = authenticated_client.get(PROFILES_URL, {"ids": f"{carol.id},{alice.id}", "usernames": "venue,bob,alice,missing"})
+
+    assert [card["username"] for card in response.data] == ["carol", "alice", "venue", "bob"]
+    assert response.data[2]["musician"] is None
+
+@pytest.mark.django_db
+def test_profile_cards_hide_users_who_blocked_viewer(authenticated_client, viewer, make_musician):
+    alice, bob = make_musician("alice"), make_musician("bob")
+    BlockedUser.objects.create(blocker=alice, blocked=viewer)
+    BlockedUser.objects.create(blocker=viewer, blocked=bob)
+
+    response = authenticated_client.get(PROFILES_URL, {"usernames": "alice,bob"})
+
+    assert [card["username"] for card in response.data] == ["bob"]
+    assert response.data[0]["isBlocked"] is True
+
+@pytest.mark.django_db
+def test_profile_cards_constant_queries(authenticated_client, make_musician):
+    for name in ("a1", "a2"):
+        make_musician(name)
+    with CaptureQueriesContext(connection) as small:
+        authenticated_client.get(PROFILES_URL, {"usernames": "a1,a2"})
+
+    names = [f"b{i}" for i in range(20)]
+    for name in names:
+        make_musician(name)
+    with CaptureQueriesContext(connection) as large:
+        response = authenticated_client.get(PROFILES_URL, {"usernames": ",".join(names)})
+
+    assert len(response.data) == 20
+    # Users, musicians, genres, instruments
+    assert len(large) == len(small) == 4
+
+@pytest.mark.django_db
+def test_profile_cards_validation(authenticated_client):
+    assert authenticated_client.get(PROFILES_URL).status_code == 400
+    assert authenticated_client.get(PROFILES_URL, {"ids": "not-a-uuid"}).status_code == 400
+    too_many = ",".join(f"user{i}" for i in range(51))
+    assert authenticated_client.get(PROFILES_URL, {"usernames": too_many}).status_code == 400
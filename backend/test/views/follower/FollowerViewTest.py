@@ -1,5 +1,10 @@
 import pytest
 import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.core import management
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from pages.models import Musician, Follower, BlockedUser
@@ -128,6 +133,23 @@ class FollowerViewTest:
         assert "next" in response.data
         assert len(response.data["results"]) == 10
     
+    def test_follow_list_ordered_by_follow_time(self, create_user, authenticated_client):
+        """Newest follow first, whenever the accounts signed up; cursor pages continue in that order."""
+        accounts = [User.objects.create_user(username=f"follower{i}", email=f"follower{i}@test.com") for i in range(5)]
+        for account in (accounts[3], accounts[0], accounts[4], accounts[1], accounts[2]):
+            Follower.objects.create(follower=account, following=create_user)
+            Follower.objects.create(follower=create_user, following=account)
+        expected = ["follower2", "follower1", "follower4", "follower0", "follower3"]
+        url = FOLLOW_LIST_URL.format(create_user.id)
+
+        for follow_type in ("followers", "following"):
+            first = authenticated_client.get(url, {"type": follow_type, "page_size": 3, "cursor": ""})
+            second = authenticated_client.get(url, {"type": follow_type, "page_size": 3, "cursor": first.data["next_cursor"]})
+            page = authenticated_client.get(url, {"type": follow_type})
+
+            assert [user["username"] for user in first.data["results"] + second.data["results"]] == expected
+            assert [user["username"] for user in page.data["results"]] == expected
+
     @pytest.mark.django_db
     def test_follow_user(self, authenticated_client, create_user):
         """Test following a user."""
@@ -252,3 +274,100 @@ class FollowerViewTest:
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
         assert response.data["error"] == "User not found"
+
+    @pytest.mark.django_db
+    def test_follow_toggle_updates_counters(self, authenticated_client, create_user):
+        target_user = User.objects.create_user(username="targetuser", email="target@test.com")
+
+        authenticated_client.post(FOLLOW_TOGGLE_URL.format(target_user.id))
+        create_user.refresh_from_db()
+        target_user.refresh_from_db()
+        assert create_user.following_count == 1
+        assert target_user.follower_count == 1
+
+        authenticated_client.delete(FOLLOW_TOGGLE_URL.format(target_user.id))
+        create_user.refresh_from_db()
+        target_user.refresh_from_db()
+        assert create_user.following_count == 0
+        assert target_user.follower_count == 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_counters_exact_under_concurrent_follow_toggles(self):
+        """Concurrent follows/unfollows (including mutual follows) leave the counters equal to the real counts."""
+        target_user = User.objects.create_user(username="targetuser", email="target@test.com")
+        users = [User.objects.create_user(username=f"user{i}", email=f"user{i}@test.com") for i in range(12)]
+        barrier = threading.Barrier(len(users))
+
+        def toggle(user, index):
+            try:
+                client = APIClient()
+                client.force_authenticate(user=user)
+                other = APIClient()
+                other.force_authenticate(user=target_user)
+                barrier.wait()
+                client.post(FOLLOW_TOGGLE_URL.format(target_user.id))
+                other.post(FOLLOW_TOGGLE_URL.format(user.id))
+                if index % 2:
+                    client.delete(FOLLOW_TOGGLE_URL.format(target_user.id))
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=len(users)) as executor:
+            list(executor.map(toggle, users, range(len(users))))
+
+        target_user.refresh_from_db()
+        assert target_user.follower_count == Follower.objects.filter(following=target_user).count() == 6
+        assert target_user.following_count == Follower.objects.filter(follower=target_user).count() == 12
+        for user in User.objects.filter(id__in=[user.id for user in users]):
+            assert user.following_count == Follower.objects.filter(follower=user).count()
+            assert user.follower_count == 1
+
+    @pytest.mark.django_db
+    def test_reconcile_follow_counts_fixes_drift(self, create_user, create_follower):
+        User.objects.filter(id=create_user.id).update(follower_count=5)
+        User.objects.filter(id=create_follower.id).update(following_count=0)
+
+        management.call_command("reconcile_follow_counts", batch_size=1)
+
+        create_user.refresh_from_db()
+        create_follower.refresh_from_db()
+        assert create_user.follower_count == 1
+        assert create_follower.following_count == 1
+
+    @pytest.mark.django_db
+    def test_follow_toggle_is_one_query(self, authenticated_client):
+        target_user = User.objects.create_user(username="targetuser", email="target@test.com")
+
+        with CaptureQueriesContext(connection) as queries:
+            authenticated_client.post(FOLLOW_TOGGLE_URL.format(target_user.id))
+        assert len(queries) == 1
+
+        with CaptureQueriesContext(connection) as queries:
+            authenticated_client.delete(FOLLOW_TOGGLE_URL.format(target_user.id))
+        assert len(queries) == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_double_click_burst_follows_once(self):
+        user = User.objects.create_user(username="clicker", email="clicker@test.com")
+        target_user = User.objects.create_user(username="targetuser", email="target@test.com")
+        clicks = 8
+        barrier = threading.Barrier(clicks)
+
+        def click(_):
+            try:
+                client = APIClient()
+                client.force_authenticate(user=user)
+                barrier.wait()
+                return client.post(FOLLOW_TOGGLE_URL.format(target_user.id)).status_code
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=clicks) as executor:
+            codes = list(executor.map(click, range(clicks)))
+
+        assert codes.count(status.HTTP_201_CREATED) == 1
+        assert Follower.objects.filter(follower=user, following=target_user).count() == 1
+        target_user.refresh_from_db()
+        user.refresh_from_db()
+        assert target_user.follower_count == 1
+        assert user.following_count == 1
@@ -176,6 +176,38 @@ def test_fetch_all_jobs_success(auth_client, create_business, instrument, genre)
     assert len(response.data["results"]) == 6  # page size = 6
     assert response.data["count"] == 8
 
+@pytest.mark.django_db
+def test_fetch_all_jobs_cursor(auth_client, create_business):
+    """Test walking all job listings with keyset (cursor) pagination."""
+    for i in range(8):
+        JobListing.objects.create(
+            business=create_business,
+            event_title=f"Gig {i}",
+            venue=f"Venue {i}",
+            gig_type="oneTime",
+            event_description=f"Description {i}",
+            payment_type="Fixed amount",
+        )
+
+    first_page = auth_client.get(FETCH_ALL_JOBS_URL, {"cursor": ""})
+
+    assert first_page.status_code == status.HTTP_200_OK
+    assert "count" not in first_page.data
+    assert [job["event_title"] for job in first_page.data["results"]] == [f"Gig {i}" for i in range(7, 1, -1)]
+    assert first_page.data["next_cursor"] is not None
+
+    second_page = auth_client.get(FETCH_ALL_JOBS_URL, {"cursor": first_page.data["next_cursor"]})
+
+    assert [job["event_title"] for job in second_page.data["results"]] == ["Gig 1", "Gig 0"]
+    assert second_page.data["next"] is None
+    assert second_page.data["next_cursor"] is None
+
+@pytest.mark.django_db
+def test_fetch_all_jobs_invalid_cursor(auth_client):
+    response = auth_client.get(FETCH_ALL_JOBS_URL, {"cursor": "not-a-cursor"})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
 
 @pytest.mark.django_db
 def test_fetch_single_job_success(auth_client, job_listing):
@@ -0,0 +1,148 @@
+import pytest
+from rest_framework.test import APIClient
+from pages.models import User, JobListing, Instrument, Genre, Business, Musician, MusicianInstrument, BlockedUser
+from pages.utils import match_utils
+
+RECOMMENDED_GIGS_URL = "/api/jobs/recommended/"
+RECOMMENDED_APPLICANTS_URL = "/api/jobs/{}/recommended-applicants/"
+
+@pytest.fixture(autouse=True)
+def fresh_match_index():
+    match_utils.clear_match_index()
+    yield
+    match_utils.clear_match_index()
+
+@pytest.fixture
+def client_for():
+    def make(user):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client
+    return make
+
+@pytest.fixture
+def catalog(db):
+    return {
+        "guitar": Instrument.objects.create(instrument="Guitar"),
+        "drums": Instrument.objects.create(instrument="Drums"),
+        "rock": Genre.objects.create(genre="Rock"),
+        "jazz": Genre.objects.create(genre="Jazz"),
+    }
+
+@pytest.fixture
+def make_musician(catalog):
+    def make(username, instruments, genres):
+        user = User.objects.create_user(username=username, email=f"{username}@gmail.com")
+        musician = Musician.objects.create(user=user, stage_name=username, years_played=1)
+        for name, years in instruments.items():
+            MusicianInstrument.objects.create(musician=musician, instrument=catalog[name], years_played=years)
+        musician.genres.set([catalog[name] for name in genres])
+        return user
+    return make
+
+@pytest.fixture
+def business_user(db):
+    user = User.objects.create_user(username="venue", email="venue@gmail.com")
+    Business.objects.create(user=user, business_name="The Venue", industry="Music")
+    return user
+
+@pytest.fixture
+def make_listing(business_user, catalog):
+    def make(title, instruments, genres, experience_level=None):
+        listing = JobListing.objects.create(
+            business=Business.objects.get(user=business_user),
+            event_title=title, venue="Club", gig_type="oneTime", event_description="Gig",
+            payment_type="Fixed amount", experience_level=experience_level,
+        )
+        listing.instruments.set([catalog[name] for name in instruments])
+        listing.genres.set([catalog[name] for name in genres])
+        return listing
+    return make
+
+@pytest.mark.django_db
+def test_recommended_gigs(client_for, make_musician, make_listing):
+    rocker = make_musician("rocker", {"guitar": 2}, ["rock"])
+    rock_gig = make_listing("Rock night", ["guitar"], ["rock"])
+    pro_gig = make_listing("Pro rock night", ["guitar"], ["rock"], experience_level="Professional")
+    make_listing("Jazz drummer", ["drums"], ["jazz"])
+
+    response = client_for(rocker).get(RECOMMENDED_GIGS_URL)
+
+    assert response.status_code == 200
+    assert [gig["id"] for gig in response.data] == [rock_gig.id, pro_gig.id]
+    assert response.data[0]["match_score"] == 1.0
+    assert response.data[1]["match_score"] == pytest.approx(0.7 * 2 / 5 + 0.3, abs=1e-4)
+    assert response.data[0]["instruments"][0]["instrument"] == "Guitar"
+
+@pytest.mark.django_db
+def test_recommended_gigs_limit(client_for, make_musician, make_listing):
+    rocker = make_musician("rocker", {"guitar": 2}, ["rock"])
+    for i in range(3):
+        make_listing(f"Gig {i}", ["guitar"], [])
+
+    client = client_for(rocker)
+
+    assert len(client.get(RECOMMENDED_GIGS_URL, {"limit": 2}).data) == 2
+    assert client.get(RECOMMENDED_GIGS_URL, {"limit": "zero"}).status_code == 400
+
+@pytest.mark.django_db
+def test_recommended_gigs_needs_musician_profile(client_for, business_user):
+    assert client_for(business_user).get(RECOMMENDED_GIGS_URL).status_code == 404
+
+@pytest.mark.django_db
+def test_recommended_applicants(client_for, business_user, make_musician, make_listing):
+    drummer = make_musician("drummer", {"drums": 4}, ["jazz"])
+    guitarist = make_musician("guitarist", {"guitar": 4}, ["jazz"])
+    make_musician("unrelated", {"guitar": 4}, ["rock"])
+    blocker = make_musician("blocker", {"drums": 9}, ["jazz"])
+    BlockedUser.objects.create(blocker=blocker, blocked=business_user)
+    listing = make_listing("Jazz drummer", ["drums"], ["jazz"], experience_level="Experienced")
+
+    response = client_for(business_user).get(RECOMMENDED_APPLICANTS_URL.format(listing.id))
+
+    assert response.status_code == 200
+    assert [card["username"] for card in response.data] == ["drummer", "guitarist"]
+    assert response.data[0]["id"] == str(drummer.id)
+    assert response.data[0]["match_score"] == 1.0
+    assert response.data[0]["musician"]["instruments"][0]["instrument_name"] == "Drums"
+    assert response.data[1]["id"] == str(guitarist.id)
+    assert response.data[1]["match_score"] == pytest.approx(0.3, abs=1e-4)
+
+@pytest.mark.django_db
+def test_recommended_applicants_only_for_owner(client_for, make_musician, make_listing):
+    listing = make_listing("Rock night", ["guitar"], ["rock"])
+    other = make_musician("other", {"guitar": 1}, ["rock"])
+
+    assert client_for(other).get(RECOMMENDED_APPLICANTS_URL.format(listing.id)).status_code == 403
+    assert client_for(other).get(RECOMMENDED_APPLICANTS_URL.format(listing.id + 1)).status_code == 404
+
+@pytest.mark.django_db
+def test_recommendations_include_profiles_newer_than_index(client_for, business_user, make_musician, make_listing):
+    rocker = make_musician("rocker", {"guitar": 2}, ["rock"])
+    make_listing("Jazz drummer", ["drums"], ["jazz"])
+    match_utils.get_match_index()
+
+    # Neither exists in the cached index, so both are scored from the database
+    listing = make_listing("Rock night", ["guitar"], ["rock"])
+    newcomer = make_musician("newcomer", {"drums": 1}, ["jazz"])
+
+    applicants = client_for(business_user).get(RECOMMENDED_APPLICANTS_URL.format(listing.id))
+    gigs = client_for(newcomer).get(RECOMMENDED_GIGS_URL)
+
+    assert [card["id"] for card in applicants.data] == [str(rocker.id)]
+    assert applicants.data[0]["match_score"] == 1.0
+    assert [gig["event_title"] for gig in gigs.data] == ["Jazz drummer"]
+
+@pytest.mark.django_db
+def test_stale_index_served_while_rebuilding(settings, mocker):
+    stale = mocker.Mock(name="stale index")
+    match_utils._index_state = (stale, 0.0)
+    settings.MATCH_INDEX_TTL = 0
+    build = mocker.patch.object(match_utils, "build_match_index")
+
+    with match_utils._build_lock:
+        # Another request holds the rebuild
+        assert match_utils.get_match_index() is stale
+    build.assert_not_called()
+
+    assert match_utils.get_match_index() is build.return_value
@@ -0,0 +1,193 @@
+import json
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from pages.models import Message, Conversation
+
+User = get_user_model()
+
+# Consumers reach the database through database_sync_to_async, which manages its own
+# connections, so these tests need real transactions
+pytestmark = pytest.mark.django_db(transaction=True)
+
+@pytest.fixture
+def create_users():
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    return alice, bob
+
+def test_send_message_persists_and_broadcasts(create_users, run_sockets):
+    alice, bob = create_users
+    received = {}
+
+    async def scenario(open_socket):
+        alice_socket = await open_socket(alice)
+        bob_socket = await open_socket(bob)
+        await alice_socket.send_to(text_data=json.dumps({"type": "send_message", "message": "Hello", "client_id": "tmp-1"}))
+        received["alice"] = json.loads(await alice_socket.receive_from())
+        bob_frames = [json.loads(await bob_socket.receive_from()) for _ in range(2)]
+        received["bob"] = next(frame for frame in bob_frames if frame["type"] == "chat_message")
+        received["bob_unread"] = next(frame for frame in bob_frames if frame["type"] == "unread_update")
+
+    run_sockets(scenario)
+
+    message = Message.objects.get()
+    assert message.sender == alice
+    assert message.receiver == bob
+    assert message.message == "Hello"
+    assert received.pop("bob_unread") == {
+        "type": "unread_update", "partner_id": str(alice.id), "unread_count": 1, "total_unread": 1,
+    }
+    for frame in received.values():
+        assert frame["type"] == "chat_message"
+        assert frame["message_object"]["id"] == str(message.id)
+        assert frame["message_object"]["sender"]["username"] == "alice"
+    assert received["alice"]["client_id"] == "tmp-1"
+    assert Conversation.objects.filter(user=bob, partner=alice, last_message=message).exists()
+
+def test_anonymous_join_rejected(create_users, run_sockets):
+    result = {}
+
+    async def scenario(open_socket):
+        result["join"] = (await open_socket(AnonymousUser(), must_connect=False)).connect_result
+
+    run_sockets(scenario)
+
+    assert result["join"] == (False, 4401)
+
+def test_non_participant_join_rejected(create_users, run_sockets):
+    carol = User.objects.create_user(username="carol", email="carol@test.com")
+    result = {}
+
+    async def scenario(open_socket):
+        result["join"] = (await open_socket(carol, must_connect=False)).connect_result
+
+    run_sockets(scenario)
+
+    assert result["join"] == (False, 4403)
+
+def test_join_with_missing_partner_rejected(run_sockets):
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    result = {}
+
+    async def scenario(open_socket):
+        result["join"] = (await open_socket(alice, must_connect=False)).connect_result
+
+    run_sockets(scenario)
+
+    assert result["join"] == (False, 4403)
+
+def test_join_of_other_pairs_room_with_dashed_username_rejected(run_sockets):
+    # "a-b-c" is the room of a-b and c; user "a" must not get in by matching its prefix
+    a = User.objects.create_user(username="a", email="a@test.com")
+    User.objects.create_user(username="a-b", email="ab@test.com")
+    User.objects.create_user(username="c", email="c@test.com")
+    result = {}
+
+    async def scenario(open_socket):
+        result["join"] = (await open_socket(a, "/ws/chat/a-b-c/", must_connect=False)).connect_result
+
+    run_sockets(scenario)
+
+    assert result["join"] == (False, 4403)
+
+def test_pairs_sharing_a_room_name_get_separate_groups(run_sockets):
+    # Both a + b-c and a-b + c are named "a-b-c"; neither pair hears the other
+    a = User.objects.create_user(username="a", email="a@test.com")
+    User.objects.create_user(username="b-c", email="bc@test.com")
+    a_b = User.objects.create_user(username="a-b", email="ab@test.com")
+    c = User.objects.create_user(username="c", email="c@test.com")
+    received = {}
+
+    async def scenario(open_socket):
+        a_socket = await open_socket(a, "/ws/chat/a-b-c/")
+        a_b_socket = await open_socket(a_b, "/ws/chat/a-b-c/")
+        await a_b_socket.send_to(text_data=json.dumps({"type": "send_message", "message": "For c only"}))
+        received["sender"] = json.loads(await a_b_socket.receive_from())
+        received["a_has_nothing"] = await a_socket.receive_nothing()
+
+    run_sockets(scenario)
+
+    assert received["sender"]["message_object"]["message"] == "For c only"
+    assert Message.objects.get().receiver == c
+    assert received["a_has_nothing"]
+
+def test_send_message_rejects_empty_text(create_users, run_sockets):
+    alice, _ = create_users
+    received = {}
+
+    async def scenario(open_socket):
+        socket = await open_socket(alice)
+        await socket.send_to(text_data=json.dumps({"type": "send_message", "message": "   "}))
+        received["frame"] = json.loads(await socket.receive_from())
+
+    run_sockets(scenario)
+
+    assert received["frame"] == {"type": "error", "error": "Message cannot be empty"}
+
+def test_relayed_attachment_message_is_loaded_from_database(create_users, run_sockets):
+    alice, bob = create_users
+    message = Message.objects.create(sender=alice, receiver=bob, message="Photo", file_keys=[], file_types=[])
+    received = {}
+
+    async def scenario(open_socket):
+        socket = await open_socket(bob)
+        forged = {"id": str(message.id), "message": "Forged text"}
+        await socket.send_to(text_data=json.dumps({"type": "chat_message", "message_object": forged}))
+        received["frame"] = json.loads(await socket.receive_from())
+
+    run_sockets(scenario)
+
+    assert received["frame"]["message_object"]["message"] == "Photo"
+
+def test_relayed_message_from_other_room_is_rejected(create_users, run_sockets):
+    alice, _ = create_users
+    carol = User.objects.create_user(username="carol", email="carol@test.com")
+    message = Message.objects.create(sender=alice, receiver=carol, message="Private")
+    received = {}
+
+    async def scenario(open_socket):
+        socket = await open_socket(alice)
+        await socket.send_to(text_data=json.dumps({"type": "chat_message", "message_object": {"id": str(message.id)}}))
+        received["frame"] = json.loads(await socket.receive_from())
+
+    run_sockets(scenario)
+
+    assert received["frame"] == {"type": "error", "error": "Message not found"}
+
+def test_send_message_keeps_quotes_and_backslashes(create_users, run_sockets):
+    alice, _ = create_users
+    text = 'Saved it to "C:\\dir" \\o/'
+    received = {}
+
+    async def scenario(open_socket):
+        socket = await open_socket(alice)
+        await socket.send_to(text_data=json.dumps({"type": "send_message", "message": text}))
+        received["frame"] = json.loads(await socket.receive_from())
+
+    run_sockets(scenario)
+
+    assert received["frame"]["message_object"]["message"] == text
+    assert Message.objects.get().message == text
+
+def test_malformed_frame_gets_error_and_socket_stays_open(create_users, run_sockets):
+    alice, _ = create_users
+    received = {}
+
+    async def scenario(open_socket):
+        socket = await open_socket(alice)
+        await socket.send_to(text_data='{"type": "send_message", "message": ')
+        received["malformed"] = json.loads(await socket.receive_from())
+        await socket.send_to(text_data=json.dumps("send_message"))
+        received["not_an_object"] = json.loads(await socket.receive_from())
+        await socket.send_to(bytes_data=b'{"type": "send_message", "message": "Binary"}')
+        received["binary"] = json.loads(await socket.receive_from())
+        await socket.send_to(text_data=json.dumps({"type": "send_message", "message": "Still here"}))
+        received["after"] = json.loads(await socket.receive_from())
+
+    run_sockets(scenario)
+
+    assert received["malformed"] == {"type": "error", "error": "Invalid message format"}
+    assert received["not_an_object"] == {"type": "error", "error": "Invalid message format"}
+    assert received["binary"] == {"type": "error", "error": "Invalid message format"}
+    assert received["after"]["message_object"]["message"] == "Still here"
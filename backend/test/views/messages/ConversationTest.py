@@ -0,0 +1,175 @@
+import base64
+import json
+import pytest
+from datetime import timedelta
+from django.core import management
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from pages.models import Message, Conversation
+from pages.utils import conversation_utils
+
+User = get_user_model()
+CREATE_URL = "/api/message/create/"
+ACTIVE_URL = "/api/active-conversations/"
+
+@pytest.fixture
+def create_user(db):
+    return User.objects.create_user(username="testuser", email="test@test.com", password="password123")
+
+@pytest.fixture
+def create_partners(db):
+    return [User.objects.create_user(username=f"partner{i}", email=f"partner{i}@test.com") for i in range(3)]
+
+@pytest.fixture
+def api_client(create_user):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    return client
+
+@pytest.fixture
+def send_message(api_client):
+    def send(sender, receiver, text):
+        response = api_client.post(CREATE_URL, {"sender": sender.id, "receiver": receiver.id, "message": text}, format="multipart")
+        assert response.status_code == status.HTTP_201_CREATED
+        return Message.objects.get(id=response.data["message_object"]["id"])
+    return send
+
+def test_create_message_updates_both_inboxes(create_user, create_partners, send_message):
+    partner = create_partners[0]
+    send_message(create_user, partner, "Hi")
+    reply = send_message(partner, create_user, "Hey")
+
+    for user, other in ((create_user, partner), (partner, create_user)):
+        conversation = Conversation.objects.get(user=user, partner=other)
+        assert conversation.last_message == reply
+        assert conversation.last_activity_at == reply.created_at
+    assert Conversation.objects.count() == 2
+
+def test_create_message_dated_after_upload(create_user, create_partners, send_message, mocker):
+    upload_finished = []
+
+    def slow_upload(files, user_id):
+        upload_finished.append(timezone.now())
+        return []
+    mocker.patch("pages.views.message_views.upload_files_to_s3", side_effect=slow_upload)
+
+    message = send_message(create_user, create_partners[0], "Photo")
+
+    assert message.created_at >= upload_finished[0]
+
+def test_older_message_does_not_replace_newer_inbox_entry(create_user, create_partners):
+    partner = create_partners[0]
+    now = timezone.now()
+    newer = Message.objects.create(sender=create_user, receiver=partner, message="Newer", created_at=now)
+    older = Message.objects.create(sender=partner, receiver=create_user, message="Older", created_at=now - timedelta(seconds=5))
+
+    conversation_utils.record_message(newer)
+    # e.g. a write-behind batch or slow upload committed after the newer message
+    conversation_utils.record_message(older)
+
+    for user, other in ((create_user, partner), (partner, create_user)):
+        conversation = Conversation.objects.get(user=user, partner=other)
+        assert conversation.last_message == newer
+        assert conversation.last_activity_at == now
+    assert Conversation.objects.get(user=create_user).unread_count == 1
+
+def test_inbox_ordered_by_last_activity(api_client, create_user, create_partners, send_message):
+    for partner in create_partners:
+        send_message(create_user, partner, f"Hi {partner.username}")
+    send_message(create_partners[0], create_user, "Latest")
+
+    response = api_client.get(ACTIVE_URL, {"user_id": create_user.id})
+
+    assert response.status_code == status.HTTP_200_OK
+    usernames = [result["username"] for result in response.data["results"]]
+    assert usernames == ["partner0", "partner2", "partner1"]
+    assert response.data["results"][0]["latest_message"]["message"] == "Latest"
+
+def test_inbox_search(api_client, create_user, create_partners, send_message):
+    for partner in create_partners:
+        send_message(create_user, partner, "Hello")
+
+    response = api_client.get(ACTIVE_URL, {"user_id": create_user.id, "search": "partner1"})
+
+    assert [result["username"] for result in response.data["results"]] == ["partner1"]
+
+def test_inbox_search_ranks_prefix_matches_first(api_client, create_user, send_message):
+    names = ["bigjohn", "john", "johnny", "jane"]
+    partners = {name: User.objects.create_user(username=name, email=f"{name}@test.com") for name in names}
+    for name in names:
+        send_message(create_user, partners[name], "Hello")
+
+    first = api_client.get(ACTIVE_URL, {"user_id": create_user.id, "search": "john", "cursor": "", "page_size": 2}).data
+    usernames = [result["username"] for result in first["results"]]
+    if first["next_cursor"]:
+        rest = api_client.get(ACTIVE_URL, {"user_id": create_user.id, "search": "john", "cursor": first["next_cursor"]}).data
+        usernames += [result["username"] for result in rest["results"]]
+
+    # Prefix matches first, most recent first within each group
+    assert usernames == ["johnny", "john", "bigjohn"]
+
+def test_potential_conversations_rank_prefix_matches_first(api_client, create_user):
+    for name in ["bigjohn", "john", "johnny", "jane"]:
+        User.objects.create_user(username=name, email=f"{name}@test.com")
+
+    response = api_client.get("/api/potential-conversations/", {"user_id": create_user.id, "search": "john"})
+
+    assert [result["username"] for result in response.data["results"]] == ["john", "johnny", "bigjohn"]
+
+def test_inbox_query_count_is_constant(api_client, create_user, send_message):
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(ACTIVE_URL, {"user_id": create_user.id})
+        assert response.status_code == status.HTTP_200_OK
+        return len(queries)
+
+    partner = User.objects.create_user(username="first", email="first@test.com")
+    send_message(create_user, partner, "Hello")
+    baseline = count_queries()
+
+    for i in range(5):
+        partner = User.objects.create_user(username=f"more{i}", email=f"more{i}@test.com")
+        send_message(partner, create_user, "Hello")
+
+    assert count_queries() == baseline
+
+def test_backfill_conversations(create_user, create_partners):
+    now = timezone.now()
+    partner = create_partners[0]
+    Message.objects.create(sender=create_user, receiver=partner, message="Old")
+    newest = Message.objects.create(sender=partner, receiver=create_user, message="New")
+    Message.objects.filter(message="Old").update(created_at=now - timedelta(days=1))
+    Message.objects.filter(id=newest.id).update(created_at=now)
+    Message.objects.create(sender=create_partners[1], receiver=create_partners[2], message="Other")
+
+    management.call_command("backfill_conversations")
+
+    assert Conversation.objects.count() == 4
+    conversation = Conversation.objects.get(user=create_user, partner=partner)
+    assert conversation.last_message_id == newest.id
+    assert conversation.last_activity_at == now
+
+def test_backfill_conversations_leaves_unread_counts_alone(create_user, create_partners, mocker):
+    push = mocker.patch("pages.utils.conversation_utils.push_unread_counts")
+    partner = create_partners[0]
+    Message.objects.create(sender=create_user, receiver=partner, message="Hi")
+    Message.objects.create(sender=partner, receiver=create_user, message="Hey")
+
+    management.call_command("backfill_conversations")
+    Conversation.objects.filter(user=create_user).update(unread_count=3)
+    management.call_command("backfill_conversations")
+
+    assert Conversation.objects.get(user=create_user).unread_count == 3
+    assert Conversation.objects.get(user=partner).unread_count == 0
+    push.assert_not_called()
+
+def test_active_conversations_search_cursor_with_bad_values(api_client, create_user):
+    cursor = base64.urlsafe_b64encode(json.dumps(["first", "garbage", "nope"]).encode()).decode()
+
+    response = api_client.get(ACTIVE_URL, {"user_id": create_user.id, "search": "part", "cursor": cursor})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from pages.models import Message
+from pages.utils import message_utils
+
+User = get_user_model()
+SEARCH_URL = "/api/message/search/"
+
+@pytest.fixture
+def create_users(db):
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    carol = User.objects.create_user(username="carol", email="carol@test.com")
+    return alice, bob, carol
+
+@pytest.fixture
+def api_client(create_users):
+    client = APIClient()
+    client.force_authenticate(user=create_users[0])
+    return client
+
+@pytest.fixture
+def send(create_users):
+    def send(sender, receiver, text):
+        return Message.objects.create(sender=sender, receiver=receiver, message=text)
+    return send
+
+def test_full_text_search_matches_stemmed_words(api_client, create_users, send):
+    alice, bob, _ = create_users
+    message = send(bob, alice, "We played the blues all night")
+    send(bob, alice, "See you tomorrow")
+
+    response = api_client.get(SEARCH_URL, {"q": "playing"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [result["id"] for result in response.data["results"]] == [str(message.id)]
+    assert "<mark>played</mark>" in response.data["results"][0]["snippet"]
+
+def test_partial_word_search(api_client, create_users, send):
+    alice, bob, _ = create_users
+    send(alice, bob, "Bring your guitar to rehearsal")
+
+    results = api_client.get(SEARCH_URL, {"q": "guit"}).data["results"]
+
+    assert len(results) == 1
+    assert results[0]["snippet"] == "Bring your <mark>guit</mark>ar to rehearsal"
+
+def test_search_only_covers_callers_conversations(api_client, create_users, send):
+    alice, bob, carol = create_users
+    with_bob = send(bob, alice, "gig on friday")
+    with_carol = send(alice, carol, "gig on saturday")
+    send(bob, carol, "gig on sunday")
+
+    everyone = api_client.get(SEARCH_URL, {"q": "gig"}).data["results"]
+    only_bob = api_client.get(SEARCH_URL, {"q": "gig", "converser_id": bob.id}).data["results"]
+
+    assert [result["id"] for result in everyone] == [str(with_carol.id), str(with_bob.id)]
+    assert [result["id"] for result in only_bob] == [str(with_bob.id)]
+
+def test_snippets_are_escaped(api_client, create_users, send):
+    alice, bob, _ = create_users
+    send(bob, alice, "<script>alert('jam')</script> session")
+
+    snippet = api_client.get(SEARCH_URL, {"q": "session"}).data["results"][0]["snippet"]
+
+    assert "<script>" not in snippet
+    assert "<mark>session</mark>" in snippet
+
+def test_search_is_cursor_paginated(api_client, create_users, send):
+    alice, bob, _ = create_users
+    for i in range(25):
+        send(bob, alice, f"rehearsal number {i}")
+
+    first = api_client.get(SEARCH_URL, {"q": "rehearsal"}).data
+    second = api_client.get(SEARCH_URL, {"q": "rehearsal", "cursor": first["next_cursor"]}).data
+
+    assert "count" not in first
+    assert len(first["results"]) == 20
+    assert len(second["results"]) == 5
+    assert second["next_cursor"] is None
+    assert not {result["id"] for result in first["results"]} & {result["id"] for result in second["results"]}
+
+def test_search_validation(api_client):
+    assert api_client.get(SEARCH_URL).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(SEARCH_URL, {"q": "x" * 101}).status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.get(SEARCH_URL, {"q": "gig", "converser_id": "nope"}).status_code == status.HTTP_404_NOT_FOUND
+
+def test_search_requires_authentication(db):
+    assert APIClient().get(SEARCH_URL, {"q": "gig"}).status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.fixture
+def busy_conversation(create_users, send):
+    alice, bob, _ = create_users
+    # Enough rows that a rare word is more selective than the sender/receiver indexes
+    Message.objects.bulk_create([Message(sender=bob, receiver=alice, message=f"see you at {i}") for i in range(5000)])
+    send(bob, alice, "gig on friday, ok")
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE pages_message")
+    return alice
+
+def test_full_text_search_uses_gin_index(busy_conversation):
+    # Two letters: full-text only, no substring branch
+    plan = message_utils.search_messages(busy_conversation, "ok").explain()
+
+    assert "message_search_idx" in plan
+
+def test_partial_word_search_uses_trigram_index(busy_conversation):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            pytest.skip("pg_trgm is not available on this server")
+
+    plan = message_utils.search_messages(busy_conversation, "gig").explain()
+
+    assert "message_search_idx" in plan
+    assert "message_text_trgm_idx" in plan
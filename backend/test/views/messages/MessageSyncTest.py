@@ -0,0 +1,141 @@
+import json
+import pytest
+from datetime import timedelta
+from asgiref import sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from pages.messaging.routing import websocket_urlpatterns
+from pages.models import Message
+from pages.utils import message_utils
+
+User = get_user_model()
+SINCE_URL = "/api/message/since/"
+
+@pytest.fixture
+def create_users(db):
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    carol = User.objects.create_user(username="carol", email="carol@test.com")
+    return alice, bob, carol
+
+@pytest.fixture
+def api_client(create_users):
+    client = APIClient()
+    client.force_authenticate(user=create_users[0])
+    return client
+
+@pytest.fixture
+def history(create_users):
+    """Six messages one second apart; only the first four involve alice."""
+    alice, bob, carol = create_users
+    start = timezone.now() - timedelta(minutes=1)
+    pairs = [(alice, bob), (bob, alice), (carol, alice), (alice, carol), (bob, carol), (carol, bob)]
+    return [
+        Message.objects.create(sender=sender, receiver=receiver, message=f"Message {i}", created_at=start + timedelta(seconds=i))
+        for i, (sender, receiver) in enumerate(pairs)
+    ]
+
+def test_messages_since_cursor_across_conversations(api_client, history):
+    last_seen = history[0]
+
+    response = api_client.get(SINCE_URL, {"created_at": last_seen.created_at.isoformat(), "id": last_seen.id})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [message["message"] for message in response.data["results"]] == ["Message 1", "Message 2", "Message 3"]
+    assert response.data["has_more"] is False
+
+def test_messages_since_breaks_timestamp_ties_by_id(api_client, create_users):
+    alice, bob, _ = create_users
+    now = timezone.now()
+    messages = sorted(
+        [Message.objects.create(sender=alice, receiver=bob, message=str(i), created_at=now) for i in range(3)],
+        key=lambda message: str(message.id),
+    )
+
+    response = api_client.get(SINCE_URL, {"created_at": now.isoformat(), "id": messages[0].id})
+
+    assert [message["id"] for message in response.data["results"]] == [str(message.id) for message in messages[1:]]
+
+def test_messages_since_pages_with_has_more(api_client, history, mocker):
+    mocker.patch("pages.utils.message_utils.SYNC_PAGE_SIZE", 2)
+    position = history[0]
+
+    response = api_client.get(SINCE_URL, {"created_at": position.created_at.isoformat(), "id": position.id})
+
+    assert len(response.data["results"]) == 2
+    assert response.data["has_more"] is True
+
+def test_messages_since_constant_queries(api_client, create_users, history):
+    alice, bob, _ = create_users
+    position = history[0]
+    params = {"created_at": position.created_at.isoformat(), "id": position.id}
+
+    with CaptureQueriesContext(connection) as few:
+        api_client.get(SINCE_URL, params)
+    for i in range(10):
+        Message.objects.create(sender=bob, receiver=alice, message=f"More {i}")
+    with CaptureQueriesContext(connection) as many:
+        response = api_client.get(SINCE_URL, params)
+
+    assert len(response.data["results"]) == 13
+    assert len(many) == len(few)
+
+def test_messages_since_requires_cursor(api_client):
+    response = api_client.get(SINCE_URL, {"created_at": "yesterday", "id": "nope"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_messages_since_requires_authentication(db):
+    response = APIClient().get(SINCE_URL)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_socket_frame(settings):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    seen = Message.objects.create(sender=alice, receiver=bob, message="Seen")
+    Message.objects.create(sender=bob, receiver=alice, message="Missed")
+    received = {}
+
+    async def main():
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/chat/alice-bob/")
+        communicator.scope["user"] = alice
+        await communicator.connect()
+        await communicator.send_to(text_data=json.dumps({"type": "sync", "created_at": seen.created_at.isoformat(), "id": str(seen.id)}))
+        received["frame"] = json.loads(await communicator.receive_from())
+        await communicator.disconnect()
+
+    sync.async_to_sync(main)()
+
+    assert received["frame"]["type"] == "sync"
+    assert [message["message"] for message in received["frame"]["messages"]] == ["Missed"]
+    assert received["frame"]["has_more"] is False
+
+def test_messages_since_starts_at_the_position(create_users):
+    alice, bob, carol = create_users
+    start = timezone.now() - timedelta(days=30)
+    # A long history before the position, so a scan of all of alice's messages would be costly
+    Message.objects.bulk_create([
+        Message(sender=bob if i % 2 else alice, receiver=alice if i % 2 else carol, message=str(i), created_at=start + timedelta(minutes=i))
+        for i in range(5000)
+    ])
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE pages_message")
+
+    last_seen = Message.objects.order_by('-created_at', '-id').first()
+    with CaptureQueriesContext(connection) as queries:
+        message_utils.messages_since(alice, (last_seen.created_at, last_seen.id))
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN " + queries[0]["sql"])
+        plan = "\n".join(row[0] for row in cursor.fetchall())
+
+    assert "message_sender_created_idx" in plan
+    assert "message_receiver_created_idx" in plan
@@ -0,0 +1,165 @@
+import pytest
+import redis
+from django.contrib.auth import get_user_model
+from rest_framework import status
+from rest_framework.test import APIClient
+from pages.utils import presence_utils
+
+User = get_user_model()
+PRESENCE_URL = "/api/presence/"
+ACTIVE_URL = "/api/active-conversations/"
+
+class FakeRedis:
+    """Just enough of a Redis client (sorted sets, strings, pipelines) for the presence service."""
+
+    def __init__(self):
+        self.sorted_sets = {}
+        self.strings = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def zadd(self, key, mapping):
+        self.sorted_sets.setdefault(key, {}).update(mapping)
+
+    def zremrangebyscore(self, key, low, high):
+        low, high = float(low), float(high)
+        members = self.sorted_sets.get(key, {})
+        for member, score in list(members.items()):
+            if low <= score <= high:
+                del members[member]
+
+    def zrem(self, key, member):
+        self.sorted_sets.get(key, {}).pop(member, None)
+
+    def zcount(self, key, low, high):
+        low, high = float(low), float(high)
+        return sum(1 for score in self.sorted_sets.get(key, {}).values() if low <= score <= high)
+
+    def expire(self, key, seconds):
+        return True
+
+    def set(self, key, value):
+        self.strings[key] = str(value)
+
+    def get(self, key):
+        return self.strings.get(key)
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args):
+            self.commands.append((name, args))
+        return queue
+
+    def run(self):
+        self.client.round_trips += 1
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+    def execute(self):
+        return self.run()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+class AsyncFakePipeline(FakePipeline):
+    async def execute(self):
+        return self.run()
+
+@pytest.fixture
+def fake_redis(mocker):
+    fake = FakeRedis()
+    async_fake = mocker.Mock()
+    async_fake.pipeline = lambda transaction=True: AsyncFakePipeline(fake)
+    mocker.patch("pages.utils.presence_utils.get_client", return_value=fake)
+    mocker.patch("pages.utils.presence_utils.get_async_client", return_value=async_fake)
+    return fake
+
+@pytest.fixture
+def create_users(db):
+    return [User.objects.create_user(username=f"user{i}", email=f"user{i}@test.com") for i in range(3)]
+
+@pytest.fixture
+def api_client(create_users):
+    client = APIClient()
+    client.force_authenticate(user=create_users[0])
+    return client
+
+def test_presence_lookup_is_one_pipelined_call(api_client, create_users, fake_redis, django_assert_num_queries):
+    online, offline, never_seen = create_users
+    fake_redis.zadd(presence_utils.presence_key(online.id), {"socket": 2 ** 40})
+    fake_redis.set(presence_utils.last_seen_key(offline.id), 1700000000)
+
+    with django_assert_num_queries(0):
+        response = api_client.get(PRESENCE_URL, {"ids": f"{online.id},{offline.id},{never_seen.id}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert fake_redis.round_trips == 1
+    assert response.data[str(online.id)]["is_online"] is True
+    assert response.data[str(offline.id)]["is_online"] is False
+    assert response.data[str(offline.id)]["last_seen"].timestamp() == 1700000000
+    assert response.data[str(never_seen.id)] == {"is_online": False, "last_seen": None}
+
+def test_presence_lookup_validates_ids(api_client, fake_redis):
+    assert api_client.get(PRESENCE_URL).status_code == status.HTTP_400_BAD_REQUEST
+    too_many = ",".join(str(i) for i in range(presence_utils.MAX_LOOKUP_IDS + 1))
+    assert api_client.get(PRESENCE_URL, {"ids": too_many}).status_code == status.HTTP_400_BAD_REQUEST
+
+def test_expired_heartbeat_counts_as_offline(create_users, fake_redis):
+    user = create_users[1]
+    fake_redis.zadd(presence_utils.presence_key(user.id), {"crashed-socket": 1})
+
+    assert presence_utils.get_presence([user.id])[str(user.id)]["is_online"] is False
+
+def test_presence_without_redis_reports_offline(create_users, mocker):
+    client = mocker.Mock()
+    client.pipeline.side_effect = redis.ConnectionError("down")
+    mocker.patch("pages.utils.presence_utils.get_client", return_value=client)
+
+    user = create_users[1]
+    assert presence_utils.get_presence([user.id]) == {str(user.id): {"is_online": False, "last_seen": None}}
+
+@pytest.mark.django_db(transaction=True)
+def test_sockets_maintain_presence(run_sockets, fake_redis):
+    user = User.objects.create_user(username="alice", email="alice@test.com")
+    User.objects.create_user(username="bob", email="bob@test.com")
+    snapshots = []
+
+    async def scenario(open_socket):
+        notifications = await open_socket(user, "/ws/notifications/")
+        chat = await open_socket(user, "/ws/chat/alice-bob/")
+        snapshots.append(presence_utils.get_presence([user.id])[str(user.id)])
+        await chat.disconnect()
+        # The notification socket is still open, so the user stays online
+        snapshots.append(presence_utils.get_presence([user.id])[str(user.id)])
+        await notifications.disconnect()
+        snapshots.append(presence_utils.get_presence([user.id])[str(user.id)])
+
+    run_sockets(scenario)
+
+    assert [snapshot["is_online"] for snapshot in snapshots] == [True, True, False]
+    assert snapshots[0]["last_seen"] is None
+    assert snapshots[2]["last_seen"] is not None
+
+def test_conversation_list_includes_presence(api_client, create_users, fake_redis):
+    user, partner, _ = create_users
+    api_client.post("/api/message/create/", {"sender": user.id, "receiver": partner.id, "message": "Hi"}, format="multipart")
+    fake_redis.zadd(presence_utils.presence_key(partner.id), {"socket": 2 ** 40})
+
+    results = api_client.get(ACTIVE_URL, {"user_id": user.id}).data["results"]
+
+    assert results[0]["is_online"] is True
+    assert fake_redis.round_trips == 1
@@ -0,0 +1,79 @@
+import asyncio
+import json
+import pytest
+from asgiref import sync
+from django.contrib.auth import get_user_model
+from pages.messaging.typing import TypingCoalescer
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+@pytest.fixture(autouse=True)
+def typing_settings(in_memory_channel_layer, settings):
+    settings.CHAT_TYPING_WINDOW_MS = 200
+
+@pytest.fixture
+def create_users():
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    return alice, bob
+
+def test_keystroke_burst_publishes_once_then_stops():
+    published = []
+
+    async def publish(event_type, username):
+        published.append((event_type, username))
+
+    async def main():
+        coalescer = TypingCoalescer(publish, window=0.1)
+        for _ in range(20):
+            await coalescer.keystroke("alice")
+        assert published == [("typing", "alice")]
+        await asyncio.sleep(0.25)
+
+    sync.async_to_sync(main)()
+
+    assert published == [("typing", "alice"), ("stop_typing", "alice")]
+
+def test_typing_refreshed_once_per_window():
+    published = []
+
+    async def publish(event_type, username):
+        published.append(event_type)
+
+    async def main():
+        coalescer = TypingCoalescer(publish, window=0.1)
+        # Keep typing for ~3 windows, a keystroke every 20ms
+        for _ in range(15):
+            await coalescer.keystroke("alice")
+            await asyncio.sleep(0.02)
+        await coalescer.stop_all()
+
+    sync.async_to_sync(main)()
+
+    assert published[-1] == "stop_typing"
+    assert 2 <= published.count("typing") <= 4
+
+def test_consumer_coalesces_typing_and_stops_on_send(create_users, run_sockets):
+    alice, bob = create_users
+    frames = []
+
+    async def scenario(open_socket):
+        alice_socket = await open_socket(alice)
+        bob_socket = await open_socket(bob)
+
+        for _ in range(10):
+            await alice_socket.send_to(text_data=json.dumps({"type": "typing", "username": "alice"}))
+        await alice_socket.send_to(text_data=json.dumps({"type": "send_message", "message": "Hi"}))
+
+        for _ in range(4):
+            frame = json.loads(await bob_socket.receive_from())
+            if frame["type"] != "unread_update":
+                frames.append(frame)
+        assert await bob_socket.receive_nothing(timeout=0.3)
+
+    run_sockets(scenario)
+
+    assert [frame["type"] for frame in frames] == ["typing", "stop_typing", "chat_message"]
+    assert frames[0]["username"] == "alice"
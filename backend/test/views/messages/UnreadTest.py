@@ -0,0 +1,130 @@
+import json
+import pytest
+from asgiref import sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from rest_framework import status
+from rest_framework.test import APIClient
+from pages.messaging.routing import websocket_urlpatterns
+from pages.models import Message, Conversation
+from pages.utils import conversation_utils
+
+User = get_user_model()
+READ_URL = "/api/message/read/"
+UNREAD_URL = "/api/message/unread/"
+ACTIVE_URL = "/api/active-conversations/"
+
+@pytest.fixture
+def create_users(db):
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    carol = User.objects.create_user(username="carol", email="carol@test.com")
+    return alice, bob, carol
+
+@pytest.fixture
+def send():
+    def send(sender, receiver, text="Hello"):
+        message = Message.objects.create(sender=sender, receiver=receiver, message=text)
+        conversation_utils.record_messages([message])
+        return message
+    return send
+
+@pytest.fixture
+def alice_client(create_users):
+    client = APIClient()
+    client.force_authenticate(user=create_users[0])
+    return client
+
+def test_messages_increment_receiver_unread_only(create_users, send):
+    alice, bob, _ = create_users
+    send(bob, alice)
+    send(bob, alice)
+    send(alice, bob)
+
+    assert Conversation.objects.get(user=alice, partner=bob).unread_count == 2
+    assert Conversation.objects.get(user=bob, partner=alice).unread_count == 1
+
+def test_batched_messages_increment_unread_by_batch_size(create_users):
+    alice, bob, _ = create_users
+    messages = Message.objects.bulk_create([Message(sender=bob, receiver=alice, message=str(i)) for i in range(5)])
+    conversation_utils.record_messages(messages)
+
+    assert Conversation.objects.get(user=alice, partner=bob).unread_count == 5
+
+def test_mark_read_resets_count_and_moves_cursor(alice_client, create_users, send):
+    alice, bob, carol = create_users
+    send(bob, alice)
+    last = send(bob, alice)
+    send(carol, alice)
+
+    response = alice_client.post(READ_URL, {"partner_id": bob.id})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {"unread_count": 0, "total_unread": 1}
+    conversation = Conversation.objects.get(user=alice, partner=bob)
+    assert conversation.unread_count == 0
+    assert conversation.last_read_message == last
+    assert conversation.last_read_at == last.created_at
+    # The partner's side is untouched
+    assert Conversation.objects.get(user=bob, partner=alice).unread_count == 0
+
+def test_mark_read_unknown_conversation(alice_client):
+    assert alice_client.post(READ_URL, {"partner_id": "not-a-uuid"}).status_code == status.HTTP_404_NOT_FOUND
+
+def test_unread_total_and_inbox_counts(alice_client, create_users, send):
+    alice, bob, carol = create_users
+    send(bob, alice)
+    send(carol, alice)
+    send(carol, alice)
+
+    assert alice_client.get(UNREAD_URL).data == {"total_unread": 3}
+    inbox = alice_client.get(ACTIVE_URL, {"user_id": alice.id}).data["results"]
+    assert {entry["username"]: entry["unread_count"] for entry in inbox} == {"bob": 1, "carol": 2}
+
+@pytest.mark.django_db(transaction=True)
+def test_unread_pushed_to_user_channel_and_mark_read_frame(settings):
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    frames = {}
+
+    async def main():
+        notifications = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/notifications/")
+        notifications.scope["user"] = alice
+        chat = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/chat/alice-bob/")
+        chat.scope["user"] = bob
+        assert (await notifications.connect())[0]
+        assert (await chat.connect())[0]
+
+        await chat.send_to(text_data=json.dumps({"type": "send_message", "message": "Hi"}))
+        frames["pushed"] = json.loads(await notifications.receive_from())
+
+        alice_chat = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/chat/alice-bob/")
+        alice_chat.scope["user"] = alice
+        assert (await alice_chat.connect())[0]
+        await alice_chat.send_to(text_data=json.dumps({"type": "mark_read"}))
+        frames["after_read"] = json.loads(await notifications.receive_from())
+
+        for communicator in (notifications, chat, alice_chat):
+            await communicator.disconnect()
+
+    sync.async_to_sync(main)()
+
+    assert frames["pushed"] == {"type": "unread_update", "partner_id": str(bob.id), "unread_count": 1, "total_unread": 1}
+    assert frames["after_read"]["unread_count"] == 0
+    assert frames["after_read"]["total_unread"] == 0
+    assert Conversation.objects.get(user=alice, partner=bob).unread_count == 0
+
+def test_notifications_require_authentication(db):
+    result = {}
+
+    async def main():
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), "/ws/notifications/")
+        communicator.scope["user"] = AnonymousUser()
+        result["connected"], result["code"] = await communicator.connect()
+
+    sync.async_to_sync(main)()
+
+    assert result == {"connected": False, "code": 4401}
@@ -0,0 +1,85 @@
+import pytest
+from channels.routing import URLRouter
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import AccessToken
+from pages.messaging import middleware
+from pages.messaging.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+@pytest.fixture
+def create_users():
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    return alice, bob
+
+@pytest.fixture
+def connect(run_sockets):
+    """Open and close a socket through the JWT middleware; returns (connected, subprotocol or close code)."""
+    def run(path="/ws/chat/alice-bob/", subprotocols=None):
+        result = {}
+
+        async def scenario(open_socket):
+            application = middleware.JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+            socket = await open_socket(None, path, application=application, subprotocols=subprotocols, must_connect=False)
+            result["join"] = socket.connect_result
+
+        run_sockets(scenario)
+        return result["join"]
+    return run
+
+def test_token_in_query_string(create_users, connect):
+    alice, _ = create_users
+    token = str(AccessToken.for_user(alice))
+
+    assert connect(f"/ws/chat/alice-bob/?token={token}")[0]
+
+def test_token_in_subprotocol(create_users, connect):
+    alice, _ = create_users
+    token = str(AccessToken.for_user(alice))
+
+    connected, subprotocol = connect(subprotocols=["bearer", token])
+
+    assert connected
+    assert subprotocol == "bearer"
+
+def test_missing_or_invalid_token_rejected(create_users, connect):
+    assert connect() == (False, 4401)
+    assert connect("/ws/chat/alice-bob/?token=not-a-jwt") == (False, 4401)
+
+def test_token_for_other_room_rejected(create_users, connect):
+    carol = User.objects.create_user(username="carol", email="carol@test.com")
+    token = str(AccessToken.for_user(carol))
+
+    assert connect(f"/ws/chat/alice-bob/?token={token}") == (False, 4403)
+
+def test_reconnect_uses_cached_user(create_users, connect):
+    alice, _ = create_users
+    token = str(AccessToken.for_user(alice))
+    assert connect(f"/ws/chat/alice-bob/?token={token}")[0]
+    assert cache.get(middleware.ws_user_cache_key(alice.id)) == alice
+
+    with CaptureQueriesContext(connection) as queries:
+        for _ in range(5):
+            assert connect(f"/ws/chat/alice-bob/?token={token}")[0]
+
+    assert not [query for query in queries if "pages_user" in query["sql"]]
+
+def test_deactivated_user_rejected_after_cache_invalidation(create_users, connect):
+    alice, _ = create_users
+    token = str(AccessToken.for_user(alice))
+    assert connect(f"/ws/chat/alice-bob/?token={token}")[0]
+
+    alice.is_active = False
+    alice.save()
+
+    assert connect(f"/ws/chat/alice-bob/?token={token}") == (False, 4401)
@@ -0,0 +1,89 @@
+import asyncio
+import json
+import pytest
+from channels.db import database_sync_to_async
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from pages.messaging import write_behind
+from pages.models import Message, Conversation
+
+User = get_user_model()
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+@pytest.fixture(autouse=True)
+def write_behind_settings(in_memory_channel_layer, settings):
+    settings.CHAT_WRITE_BEHIND = True
+    settings.CHAT_WRITE_BEHIND_WINDOW_MS = 60 * 1000  # Only disconnect/max_batch flush
+    settings.CHAT_WRITE_BEHIND_MAX_BATCH = 500
+    write_behind._buffer = None
+    yield
+    write_behind._buffer = None
+
+@pytest.fixture
+def create_users():
+    alice = User.objects.create_user(username="alice", email="alice@test.com")
+    bob = User.objects.create_user(username="bob", email="bob@test.com")
+    return alice, bob
+
+@pytest.fixture
+def run_chat(run_sockets):
+    def run(user, scenario):
+        async def chat(open_socket):
+            await scenario(await open_socket(user))
+
+        run_sockets(chat)
+    return run
+
+def test_messages_broadcast_before_write_and_flushed_on_disconnect(create_users, run_chat):
+    alice, bob = create_users
+    seen = {}
+
+    async def scenario(socket):
+        for i in range(3):
+            await socket.send_to(text_data=json.dumps({"type": "send_message", "message": f"Message {i}"}))
+        seen["frames"] = [json.loads(await socket.receive_from()) for _ in range(3)]
+        seen["saved_before_disconnect"] = await database_sync_to_async(Message.objects.count)()
+
+    run_chat(alice, scenario)
+
+    assert seen["saved_before_disconnect"] == 0
+    messages = list(Message.objects.order_by("created_at"))
+    assert [message.message for message in messages] == ["Message 0", "Message 1", "Message 2"]
+    assert [str(message.id) for message in messages] == [frame["message_object"]["id"] for frame in seen["frames"]]
+    assert Conversation.objects.get(user=bob, partner=alice).last_message == messages[-1]
+
+def test_full_batch_flushes_without_waiting(settings, create_users, run_chat):
+    settings.CHAT_WRITE_BEHIND_MAX_BATCH = 2
+    alice, _ = create_users
+    seen = {}
+
+    async def scenario(socket):
+        for i in range(2):
+            await socket.send_to(text_data=json.dumps({"type": "send_message", "message": f"Message {i}"}))
+            await socket.receive_from()
+        # The flush runs as a task on the loop; give it a moment (well under the 60s window)
+        for _ in range(50):
+            seen["saved"] = await database_sync_to_async(Message.objects.count)()
+            if seen["saved"] == 2:
+                break
+            await asyncio.sleep(0.02)
+
+    run_chat(alice, scenario)
+
+    assert seen["saved"] == 2
+
+def test_created_at_strictly_increases_per_conversation(mocker, create_users):
+    alice, bob = create_users
+    now = timezone.now()
+    mocker.patch("pages.messaging.write_behind.timezone.now", return_value=now)
+    buffer = write_behind.MessageWriteBuffer(window=60, max_batch=500)
+    mocker.patch.object(buffer, "schedule_flush")
+
+    messages = [buffer.add(alice, bob, "First"), buffer.add(bob, alice, "Second"), buffer.add(alice, bob, "Third")]
+
+    stamps = [message.created_at for message in messages]
+    assert stamps == sorted(stamps) and len(set(stamps)) == 3
+
+    buffer.flush_sync()
+    assert list(Message.objects.order_by("created_at").values_list("message", flat=True)) == ["First", "Second", "Third"]
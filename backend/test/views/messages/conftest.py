@@ -0,0 +1,47 @@
+import pytest
+from asgiref import sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from pages.messaging.routing import websocket_urlpatterns
+
+CHAT_PATH = "/ws/chat/alice-bob/"
+
+@pytest.fixture
+def in_memory_channel_layer(settings):
+    """Socket tests run without Redis: groups live in the test process."""
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+    return settings
+
+@pytest.fixture
+def run_sockets(in_memory_channel_layer):
+    """
+    Run `await scenario(open_socket)` on one event loop, then disconnect every socket that connected.
+
+    open_socket(user, path=CHAT_PATH, application=None, subprotocols=None, must_connect=True)
+    connects a WebsocketCommunicator as `user` (None: let `application`, e.g. the JWT
+    middleware, authenticate it) and returns it; .connect_result holds (connected,
+    subprotocol or close code) for joins that are meant to be rejected.
+    """
+    def run(scenario):
+        opened = []
+
+        async def open_socket(user, path=CHAT_PATH, application=None, subprotocols=None, must_connect=True):
+            communicator = WebsocketCommunicator(application or URLRouter(websocket_urlpatterns), path, subprotocols=subprotocols)
+            if user is not None:
+                communicator.scope["user"] = user
+            communicator.connect_result = await communicator.connect()
+            if communicator.connect_result[0]:
+                opened.append(communicator)
+            elif must_connect:
+                pytest.fail(f"{path} rejected the connection: {communicator.connect_result}")
+            return communicator
+
+        async def main():
+            try:
+                await scenario(open_socket)
+            finally:
+                for communicator in opened:
+                    await communicator.disconnect()
+
+        sync.async_to_sync(main)()
+    return run
@@ -20,7 +20,7 @@ def api_client():
 
 @pytest.fixture
 def mock_upload(mocker):
-    mock = mocker.patch("pages.views.post_views.upload_to_s3")
+    mock = mocker.patch("pages.utils.s3_utils.upload_to_s3")
     mock.return_value = ("user_0000/test.jpg")
     yield mock
 
@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import MagicMock
+from botocore.exceptions import ClientError
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from pages.models import Post
+
+User = get_user_model()
+UPLOAD_URL = "/api/post/upload-url/"
+FINALIZE_URL = "/api/post/finalize/"
+
+@pytest.fixture
+def create_user(db):
+    return User.objects.create_user(username="testuser", email="test@test.com", password="password123")
+
+@pytest.fixture
+def api_client(create_user):
+    client = APIClient()
+    client.force_authenticate(user=create_user)
+    return client
+
+@pytest.fixture
+def mock_s3_client(mocker):
+    client = MagicMock()
+    client.generate_presigned_post.side_effect = lambda **kwargs: {
+        "url": f"https://{kwargs['Bucket']}.s3.amazonaws.com/",
+        "fields": {"key": kwargs["Key"], "Content-Type": kwargs["Fields"]["Content-Type"], "policy": "signed"},
+    }
+    mocker.patch("pages.utils.s3_utils.get_s3_client", return_value=client)
+    return client
+
+def test_presign_upload(api_client, create_user, mock_s3_client):
+    files = [
+        {"name": "photo.png", "content_type": "image/png", "size": 1024},
+        {"name": "clip.mp4", "content_type": "video/mp4", "size": 4096},
+    ]
+
+    response = api_client.post(UPLOAD_URL, {"files": files}, format="json")
+
+    assert response.status_code == status.HTTP_200_OK
+    uploads = response.data["uploads"]
+    assert len(uploads) == 2
+    assert uploads[0]["file_key"].startswith(f"user_{create_user.id}/")
+    assert uploads[0]["file_key"].endswith(".png")
+    assert uploads[1]["file_type"] == "video/mp4"
+
+    conditions = mock_s3_client.generate_presigned_post.call_args_list[0].kwargs["Conditions"]
+    assert {"Content-Type": "image/png"} in conditions
+    assert ["content-length-range", 1024, 1024] in conditions
+
+def test_presign_upload_rejects_unsupported_type(api_client, mock_s3_client):
+    files = [{"name": "notes.txt", "content_type": "text/plain", "size": 10}]
+
+    response = api_client.post(UPLOAD_URL, {"files": files}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    mock_s3_client.generate_presigned_post.assert_not_called()
+
+def test_presign_upload_rejects_oversized_file(api_client, mock_s3_client):
+    files = [{"name": "huge.png", "content_type": "image/png", "size": 10 ** 12}]
+
+    response = api_client.post(UPLOAD_URL, {"files": files}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_presign_upload_too_many_files(api_client, mock_s3_client):
+    files = [{"name": f"{i}.png", "content_type": "image/png", "size": 10} for i in range(11)]
+
+    response = api_client.post(UPLOAD_URL, {"files": files}, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_finalize_creates_post(api_client, create_user, mock_s3_client):
+    tagged_user = User.objects.create_user(username="tagged", email="tagged@test.com", password="password123")
+    data = {
+        "file_keys": [f"user_{create_user.id}/a.png"],
+        "file_types": ["image/png"],
+        "caption": "Direct upload",
+        "tagged_users": [str(tagged_user.id)],
+    }
+
+    response = api_client.post(FINALIZE_URL, data, format="json")
+
+    assert response.status_code == status.HTTP_201_CREATED
+    post = Post.objects.get(id=response.data["post_id"])
+    assert post.owner == create_user
+    assert post.file_keys == data["file_keys"]
+    assert list(post.tagged_users.all()) == [tagged_user]
+
+def test_finalize_rejects_foreign_key(api_client, mock_s3_client):
+    data = {"file_keys": ["user_someone-else/a.png"], "file_types": ["image/png"]}
+
+    response = api_client.post(FINALIZE_URL, data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert Post.objects.count() == 0
+
+def test_finalize_requires_uploaded_objects(api_client, create_user, mock_s3_client):
+    mock_s3_client.head_object.side_effect = ClientError({"Error": {"Code": "404"}}, "HeadObject")
+    data = {"file_keys": [f"user_{create_user.id}/a.png"], "file_types": ["image/png"]}
+
+    response = api_client.post(FINALIZE_URL, data, format="json")
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert response.data["missing"] == data["file_keys"]
+    assert Post.objects.count() == 0
@@ -0,0 +1,137 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth import get_user_model
+from django.core import management
+from pages.models import Post, TimelineEntry
+
+User = get_user_model()
+
+# Timeline fan-out and backfill run once the creating transaction commits
+pytestmark = pytest.mark.django_db(transaction=True)
+
+FETCH_FEED_URL = "/api/fetch-feed/"
+BLOCK_URL = "/api/block/{}/"
+BAN_URL = "/api/post/ban/"
+UNBAN_URL = "/api/post/unban/"
+HIDE_URL = "/api/post/hide/"
+UNHIDE_URL = "/api/post/unhide/"
+REPORT_URL = "/api/post/report/"
+
+@pytest.fixture
+def create_users(db):
+    viewer = User.objects.create_user(username="viewer", email="viewer@test.com", password="password123")
+    author = User.objects.create_user(username="author", email="author@test.com", password="password123")
+    return viewer, author
+
+@pytest.fixture
+def create_post(create_users):
+    return Post.objects.create(
+        owner=create_users[1],
+        file_keys=["user_0002/test.png"],
+        file_types=["image/png"],
+        caption="Timeline post",
+    )
+
+@pytest.fixture
+def api_client(create_users):
+    client = APIClient()
+    client.force_authenticate(user=create_users[0])
+    return client
+
+@pytest.fixture
+def mock_generate_s3_url(mocker):
+    mock = mocker.patch("pages.serializers.post_serializers.generate_s3_url")
+    mock.return_value = "https://mock-s3-url.com/user_0000/test.jpg"
+    yield mock
+
+@pytest.fixture
+def in_timeline():
+    def check(user, post):
+        return TimelineEntry.objects.filter(user=user, post=post).exists()
+    return check
+
+def test_post_fans_out_to_other_users(create_users, create_post, in_timeline):
+    viewer, author = create_users
+
+    assert in_timeline(viewer, create_post)
+    assert not in_timeline(author, create_post)
+
+def test_new_user_timeline_is_backfilled(create_post, in_timeline):
+    newcomer = User.objects.create_user(username="newcomer", email="new@test.com", password="password123")
+
+    assert in_timeline(newcomer, create_post)
+
+def test_feed_reads_timeline(api_client, create_users, create_post, mock_generate_s3_url):
+    response = api_client.get(FETCH_FEED_URL, {"user_id": create_users[0].id})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [post["id"] for post in response.data["results"]] == [str(create_post.id)]
+
+def test_hide_and_unhide_update_timeline(api_client, create_users, create_post, in_timeline):
+    viewer = create_users[0]
+
+    api_client.post(HIDE_URL, {"post_id": create_post.id, "user_id": viewer.id})
+    assert not in_timeline(viewer, create_post)
+
+    api_client.delete(UNHIDE_URL, {"post_id": create_post.id, "user_id": viewer.id})
+    assert in_timeline(viewer, create_post)
+
+def test_report_prunes_timeline(api_client, create_users, create_post, in_timeline):
+    viewer = create_users[0]
+
+    api_client.post(REPORT_URL, {"post_id": create_post.id, "user_id": viewer.id})
+
+    assert not in_timeline(viewer, create_post)
+
+def test_ban_and_unban_update_timeline(api_client, create_users, create_post, in_timeline):
+    viewer = create_users[0]
+
+    api_client.post(BAN_URL, {"post_id": create_post.id, "admin_id": viewer.id})
+    assert not TimelineEntry.objects.filter(post=create_post).exists()
+
+    api_client.post(UNBAN_URL, {"post_id": create_post.id})
+    assert in_timeline(viewer, create_post)
+
+def test_block_and_unblock_update_timeline(api_client, create_users, create_post, in_timeline):
+    viewer, author = create_users
+
+    api_client.post(BLOCK_URL.format(author.id))
+    assert not in_timeline(viewer, create_post)
+
+    api_client.delete(BLOCK_URL.format(author.id))
+    assert in_timeline(viewer, create_post)
+
+def test_rebuild_timelines_command(create_users, create_post, in_timeline):
+    viewer = create_users[0]
+    TimelineEntry.objects.all().delete()
+
+    management.call_command("rebuild_timelines")
+
+    assert in_timeline(viewer, create_post)
+    assert TimelineEntry.objects.count() == 1
+
+def test_timeline_keeps_only_the_newest_posts(settings, create_users, in_timeline):
+    settings.TIMELINE_MAX_ENTRIES = 2
+    viewer, author = create_users
+    posts = [
+        Post.objects.create(owner=author, file_keys=["user_0002/test.png"], file_types=["image/png"], caption=f"Post {i}")
+        for i in range(3)
+    ]
+
+    assert TimelineEntry.objects.filter(user=viewer).count() == 2
+    assert not in_timeline(viewer, posts[0])
+    assert in_timeline(viewer, posts[2])
+
+def test_new_user_backfill_is_limited_to_recent_posts(settings, create_users, in_timeline):
+    settings.TIMELINE_MAX_ENTRIES = 2
+    author = create_users[1]
+    posts = [
+        Post.objects.create(owner=author, file_keys=["user_0002/test.png"], file_types=["image/png"], caption=f"Post {i}")
+        for i in range(3)
+    ]
+
+    newcomer = User.objects.create_user(username="newcomer", email="new@test.com", password="password123")
+
+    assert TimelineEntry.objects.filter(user=newcomer).count() == 2
+    assert not in_timeline(newcomer, posts[0])
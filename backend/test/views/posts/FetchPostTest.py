@@ -1,16 +1,24 @@
 
+import base64
+import json
 import uuid
 import pytest
 from rest_framework import status
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
 from pages.serializers.post_serializers import PostSerializer
-from pages.models import Post, ReportedPost, Like
+from pages.models import Post, ReportedPost, Like, Follower
+from pages.views.post_views import GetFeedView
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.utils.timezone import now, timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 User = get_user_model()
 
+# Timeline fan-out and backfill run once the creating transaction commits
+pytestmark = pytest.mark.django_db(transaction=True)
+
 FETCH_POSTS_URL = "/api/post/fetch/"
 FETCH_FEED_URL = "/api/fetch-feed/"
 FETCH_BANNED_POSTS_URL = "/api/fetch-banned-posts/"
@@ -151,6 +159,31 @@ def test_fetch_feed(api_client, create_users, create_posts_other_user, mock_gene
     assert response.data["results"][0]["owner"]["id"] == str(other_user.id)
     assert response.data["results"][0]["owner"]["username"] == other_user.username
 
+def test_fetch_feed_cursor(api_client, post_factory, create_users, mock_generate_s3_url):
+    user, other_user = create_users
+    api_client.force_authenticate(user=user)
+    captions = [f"Post {i}" for i in range(8)]
+    for days_ago, caption in enumerate(captions):
+        post_factory(owner=other_user, caption=caption, created_days_ago=days_ago)
+
+    first_page = api_client.get(FETCH_FEED_URL, {"user_id": user.id, "cursor": ""})
+    second_page = api_client.get(FETCH_FEED_URL, {"user_id": user.id, "cursor": first_page.data["next_cursor"]})
+
+    assert [post["caption"] for post in first_page.data["results"]] == captions[:6]
+    assert [post["caption"] for post in second_page.data["results"]] == captions[6:]
+    assert second_page.data["next_cursor"] is None
+
+@pytest.mark.parametrize("position", [["garbage", "nope"], [now().isoformat(), "nope"], [None, str(uuid.uuid4())], [[1], {}]])
+def test_fetch_feed_cursor_with_bad_values(api_client, create_users, mock_generate_s3_url, position):
+    user, _ = create_users
+    api_client.force_authenticate(user=user)
+    cursor = base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+    response = api_client.get(FETCH_FEED_URL, {"user_id": user.id, "cursor": cursor})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.data["detail"] == "Invalid cursor"
+
 def test_fetch_feed_no_user(api_client, create_users, mock_generate_s3_url):
     api_client.force_authenticate(user=create_users[0])
 
@@ -256,4 +289,48 @@ def test_post_serializer(mocker, create_posts, mock_generate_s3_url):
     assert data["caption"] == "Test"
     assert data["s3_urls"] == ["https://mock-s3-url.com/user_0000/test.jpg"]
 
-    mock_generate_s3_url.assert_called_once_with("user_0001/test.png", "image/png")
\ No newline at end of file
+    mock_generate_s3_url.assert_called_once_with("user_0001/test.png", "image/png")
+
+@pytest.fixture
+def count_feed_queries():
+    def count(client, user):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(FETCH_FEED_URL, {"user_id": user.id})
+        assert response.status_code == status.HTTP_200_OK
+        return len(context.captured_queries), response
+    return count
+
+def test_fetch_feed_constant_queries(api_client, post_factory, create_users, count_feed_queries, mock_generate_s3_url):
+    user, other_user = create_users
+    api_client.force_authenticate(user=user)
+
+    post_factory(owner=other_user, caption="First")
+    small_page_queries, response = count_feed_queries(api_client, user)
+    assert len(response.data["results"]) == 1
+
+    for i in range(10):
+        post = post_factory(owner=other_user, caption=f"Post {i}")
+        Like.objects.create(user=user, post=post)
+        post.tagged_users.add(user)
+    full_page_queries, response = count_feed_queries(api_client, user)
+    assert len(response.data["results"]) == GetFeedView.page_size
+
+    assert full_page_queries == small_page_queries
+
+def test_fetch_feed_annotated_fields(api_client, create_users, create_posts_other_user, mock_generate_s3_url):
+    user, other_user = create_users
+    api_client.force_authenticate(user=user)
+    post = create_posts_other_user[0]
+    Like.objects.create(user=user, post=post)
+    Like.objects.create(user=other_user, post=post)
+    ReportedPost.objects.create(user=other_user, post=post)
+    Follower.objects.create(follower=user, following=other_user)
+
+    response = api_client.get(FETCH_FEED_URL, {"user_id": user.id})
+
+    result = next(p for p in response.data["results"] if p["id"] == str(post.id))
+    assert result["like_count"] == 2
+    assert result["is_liked"] is True
+    assert result["is_reported"] is True
+    assert result["owner"]["isFollowing"] is True
+    assert result["owner"]["isBlocked"] is False
@@ -4,6 +4,11 @@ from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from pages.models import Post, Like
 from rest_framework import status
+from django.core import management
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import uuid
 
 User = get_user_model()
@@ -85,4 +90,66 @@ def test_unlike_non_existent_post(authenticated_client, create_user, create_post
 
     assert response.status_code == status.HTTP_404_NOT_FOUND
     assert response.data["error"] == "Post not found"
-    
\ No newline at end of file
+    
+
+@pytest.mark.django_db
+def test_like_and_unlike_update_like_count(authenticated_client, create_post):
+    post = create_post
+
+    authenticated_client.post(LIKE_TOGGLE_URL, {"post_id": post.id})
+    post.refresh_from_db()
+    assert post.like_count == 1
+
+    authenticated_client.delete(LIKE_TOGGLE_URL, {"post_id": post.id})
+    post.refresh_from_db()
+    assert post.like_count == 0
+
+@pytest.mark.django_db
+def test_reconcile_like_counts_fixes_drift(create_user, create_post):
+    post = create_post
+    Like.objects.create(user=create_user, post=post)
+    Post.objects.filter(id=post.id).update(like_count=7)
+
+    management.call_command("reconcile_like_counts")
+
+    post.refresh_from_db()
+    assert post.like_count == 1
+
+@pytest.mark.django_db
+def test_like_toggle_is_one_query(authenticated_client, create_post):
+    with CaptureQueriesContext(connection) as queries:
+        authenticated_client.post(LIKE_TOGGLE_URL, {"post_id": create_post.id})
+    assert len(queries) == 1
+
+    with CaptureQueriesContext(connection) as queries:
+        authenticated_client.delete(LIKE_TOGGLE_URL, {"post_id": create_post.id})
+    assert len(queries) == 1
+
+@pytest.mark.django_db
+def test_like_invalid_post_id(authenticated_client):
+    response = authenticated_client.post(LIKE_TOGGLE_URL, {"post_id": "not-a-uuid"})
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.django_db(transaction=True)
+def test_double_click_burst_likes_once(create_user, create_post):
+    clicks = 8
+    barrier = threading.Barrier(clicks)
+
+    def click(_):
+        try:
+            client = APIClient()
+            client.force_authenticate(user=create_user)
+            barrier.wait()
+            return client.post(LIKE_TOGGLE_URL, {"post_id": create_post.id}).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=clicks) as executor:
+        codes = list(executor.map(click, range(clicks)))
+
+    assert codes.count(status.HTTP_201_CREATED) == 1
+    assert codes.count(status.HTTP_200_OK) == clicks - 1
+    create_post.refresh_from_db()
+    assert Like.objects.filter(user=create_user, post=create_post).count() == 1
+    assert create_post.like_count == 1
@@ -1,7 +1,7 @@
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
-from pages.models import Musician, Instrument, Genre, MusicianInstrument, Business, BlockedUser
+from pages.models import Musician, Instrument, Genre, MusicianInstrument, Business, BlockedUser, MusicianSearchDocument
 import json
 
 User = get_user_model()
@@ -93,7 +93,7 @@ def test_get_musician_while_blocked(api_client, create_musician, db):
     assert response.data == {"detail": "You are blocked from viewing this profile."}  
 
 @pytest.mark.django_db
-def test_patch_musician(api_client, create_musician):
+def test_patch_musician(api_client, create_musician, django_capture_on_commit_callbacks):
     """Test updating musician profile with new instruments and genres."""
     user, musician = create_musician
     url = MUSICIAN_URL.format(user.id)
@@ -113,7 +113,8 @@ def test_patch_musician(api_client, create_musician):
         "home_studio": True
     }
     
-    response = api_client.patch(url, json.dumps(updated_data), content_type="application/json")
+    with django_capture_on_commit_callbacks(execute=True):
+        response = api_client.patch(url, json.dumps(updated_data), content_type="application/json")
     
     assert response.status_code == 200
     assert response.data == {"message": "Profile updated successfully"}
@@ -123,6 +124,11 @@ def test_patch_musician(api_client, create_musician):
     assert user.email == "updated@gmail.com"
     assert list(musician.genres.values_list("genre", flat=True)) == ["Jazz"]
 
+    document = MusicianSearchDocument.objects.get(user=user)
+    assert document.username == "updateduser"
+    assert document.instrument_ids == [instrument.id]
+    assert document.genre_ids == list(Genre.objects.filter(genre="Jazz").values_list("id", flat=True))
+
 @pytest.mark.django_db
 def test_patch_musician_user_not_found(api_client):
     url = MUSICIAN_URL.format("00000000-0000-0000-0000-000000000000")
@@ -213,6 +219,28 @@ def test_patch_genre_not_found(api_client, db):
     assert response.status_code == 404
     assert response.data == {"error": "Genre not found"}
 
+@pytest.mark.django_db
+def test_patch_musician_not_found_lookup_rolls_back(api_client, create_musician, django_capture_on_commit_callbacks):
+    user, musician = create_musician
+    api_client.force_authenticate(user=user)
+    Genre.objects.create(genre="Jazz")
+
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        response = api_client.patch(
+            MUSICIAN_URL.format(user.id),
+            {"username": "renamed", "instruments": [{"instrument_name": "Guitar", "years_played": 9}], "genres": ["Jazz", "Polka"]},
+            format="json",
+        )
+
+    assert response.status_code == 404
+    user.refresh_from_db()
+    assert user.username == "testuser"
+    assert sorted(musician.musicianinstrument_set.values_list("instrument__instrument", "years_played")) == [("Guitar", 3), ("Piano", 2)]
+    assert list(musician.genres.values_list("genre", flat=True)) == ["Rock"]
+    # Nothing was saved, so there is no search document refresh to run
+    assert callbacks == []
+    assert not MusicianSearchDocument.objects.filter(user=user).exists()
+
 @pytest.mark.django_db
 def test_patch_business(api_client, create_business):
     """Test updating business profile."""
@@ -6,7 +6,7 @@ from pages.views.follow_views import FollowingView, FollowListView, FollowToggle
 from pages.views.post_views import *
 from pages.views.blocked_views import BlockUserView, BlockedListView
 from pages.views.dropdown_views import get_instruments, get_genres
-from pages.views.listing_views import CreateJobListingView, GetJobListingsView, GetAllJobListingsView, GetJobListingView, GetUserFromBusinessView
+from pages.views.listing_views import CreateJobListingView, GetJobListingsView, GetAllJobListingsView, GetJobListingView, GetUserFromBusinessView, RecommendedGigsView, RecommendedApplicantsView
 from pages.views.application_views import CreateApplicationView, ApplicationsForListingView, AutofillResumeView, GetApplication, SubmitExperiencesView, PatchApplication, SendAcceptanceEmail, SendRejectionEmail, UserApplicationsView
 from pages.views.message_views import *
 from django.http import JsonResponse
@@ -22,8 +22,11 @@ urlpatterns = [
         path('auth/', include("pages.authentication.urls", namespace="authentication")),
         path('stripe/', include("pages.stripe.urls", namespace="stripe")),
         path('discover/', GetUsersView.as_view(), name="get_users"),
+        path('discover/profiles/', ProfileCardsView.as_view(), name="profile_cards"),
         path('post/', include([
             path('create/', CreatePostView.as_view(), name='create_post'),
+            path('upload-url/', PresignPostUploadView.as_view(), name='presign_post_upload'),
+            path('finalize/', FinalizePostUploadView.as_view(), name='finalize_post_upload'),
             path('fetch/', GetPostsView.as_view(), name="get_posts"),
             path('like/', LikeToggleView.as_view(), name="like_post"),
             path('ban/', BanView.as_view(), name="ban"),
@@ -53,11 +56,18 @@ urlpatterns = [
         path('fetch-jobs/', GetJobListingsView.as_view(), name='fetch-listing'),
         path('message/create/', CreateMessageView.as_view(), name='create-message'),
         path('message/get/', GetMessagesView.as_view(), name='get-messages'),
+        path('message/since/', GetMessagesSinceView.as_view(), name='messages-since'),
+        path('message/search/', SearchMessagesView.as_view(), name='search-messages'),
+        path('message/read/', MarkConversationReadView.as_view(), name='mark-conversation-read'),
+        path('message/unread/', GetUnreadCountView.as_view(), name='unread-count'),
+        path('presence/', GetPresenceView.as_view(), name='presence'),
         path('active-conversations/', GetActiveConversationsView.as_view(), name='active-conversations'),
         path('potential-conversations/', GetPotentialConversationsView.as_view(), name='potential-conversations'),
         path('liked-users/', GetLikedUsersView.as_view(), name='liked-users'),
         path('fetch-all-jobs/', GetAllJobListingsView.as_view(), name='fetch-listing'),
         path('fetch-job/', GetJobListingView.as_view(), name='fetch-single-listing'),
+        path('jobs/recommended/', RecommendedGigsView.as_view(), name='recommended-gigs'),
+        path('jobs/<int:listing_id>/recommended-applicants/', RecommendedApplicantsView.as_view(), name='recommended-applicants'),
         path("submit-application/", CreateApplicationView.as_view(), name="submit-application"),
         path("applications/listing/<int:listing_id>/", ApplicationsForListingView.as_view(), name="get-applications"),
         path("patch-application/<uuid:app_id>/", PatchApplication.as_view(), name="patch-applications"), 
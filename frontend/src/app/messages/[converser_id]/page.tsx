@@ -135,7 +135,9 @@ export default function Feed() {
         const backendHost = process.env.NEXT_PUBLIC_BACKEND_API;
         const protocol = backendHost?.startsWith('https') ? 'wss' : 'ws';
         const wsHost = backendHost?.replace(/^https?:\/\//, '');
-        const newSocket = new WebSocket(`${protocol}://${wsHost}/ws/chat/${chatRoom}/`);
+        // The access token travels as a subprotocol so it stays out of URLs and access logs
+        const token = Cookies.get("access_token");
+        const newSocket = new WebSocket(`${protocol}://${wsHost}/ws/chat/${chatRoom}/`, ["bearer", String(token)]);
     
         setSocket(newSocket);
     
@@ -166,9 +168,18 @@ export default function Feed() {
                         clearTimeout(typingTimeoutRef.current);
                     }
     
+                    // The server re-sends "typing" while the user keeps typing and sends
+                    // "stop_typing" when they pause; this only covers a lost stop event
                     typingTimeoutRef.current = window.setTimeout(() => {
                         setIsTyping(false);
-                    }, 500);
+                    }, 5000);
+                }
+            } else if (data.type === 'stop_typing') {
+                if (data.username !== profile?.username) {
+                    if (typingTimeoutRef.current) {
+                        clearTimeout(typingTimeoutRef.current);
+                    }
+                    setIsTyping(false);
                 }
             }
         };
@@ -193,10 +204,10 @@ export default function Feed() {
 
     function sendTyping(username: String) {
         if (socket == null) return;
-        sendWithRetry(socket, JSON.stringify({
+        sendWithRetry(socket, {
             type: 'typing',
             username
-        }));
+        });
     }
 
     useEffect(() => {
@@ -205,6 +216,18 @@ export default function Feed() {
 
     const sendMessage = async () => {
         if (!profile) return;
+
+        // Text-only messages are saved and broadcast by the socket; HTTP is only needed for attachments
+        if (files.length === 0 && socket?.readyState === WebSocket.OPEN) {
+            if (!message.trim()) return;
+            sendWithRetry(socket, {
+                type: 'send_message',
+                message
+            });
+            setMessage('');
+            return;
+        }
+
         const formData = new FormData();
 
         try {
@@ -228,10 +251,10 @@ export default function Feed() {
             );
             
             if (socket==null) return;
-            sendWithRetry(socket, JSON.stringify({
+            sendWithRetry(socket, {
                 type: 'chat_message',
                 message_object: response.data.message_object
-            }));
+            });
 
             if (response.status >= 200 && response.status < 300) {
                 setMessages((prevMessages) => [response.data.message_object, ...prevMessages]);